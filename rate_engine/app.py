@@ -1,17 +1,55 @@
 from __future__ import annotations
 
-from pathlib import Path
-import importlib.util
-from typing import Any, Dict, List, Optional
-
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+import hashlib
+import itertools
+import os
+import time
+import uuid
+from typing import Any, Dict, Iterator, List, Literal, Optional, Sequence, Tuple
+
+from fastapi import FastAPI, Header, HTTPException, Request, Response, WebSocket
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
+import engine
+from rate_engine_core import (
+    codec,
+    experiments,
+    grid,
+    idempotency,
+    memo,
+    portfolio,
+    pricing,
+    promo,
+    quote_token,
+    schedule,
+    travel,
+    zones,
+)
+from rate_engine_core.registry import ServiceEntry, ServiceWatcher
+
+
+@asynccontextmanager
+async def _lifespan(_app: FastAPI):
+    # Opt-in hot reload of individual service modules: RATE_ENGINE_HOT_RELOAD=<poll seconds>
+    watcher = None
+    interval = float(os.getenv("RATE_ENGINE_HOT_RELOAD") or 0)
+    if interval > 0:
+        watcher = ServiceWatcher(_REGISTRY, interval=interval)
+        watcher.start()
+    try:
+        yield
+    finally:
+        if watcher is not None:
+            watcher.stop()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=_lifespan)
 
 
 class QuoteRequest(BaseModel):
+    # Documents the estimate request body; parsing itself happens in _decode_payload
     service: str
 
     class Config:
@@ -23,227 +61,691 @@ class StagePrice(BaseModel):
     price: int
 
 
+class BundleItem(BaseModel):
+    name: str
+    discount: int
+
+
 class QuoteResponse(BaseModel):
     # Keep stage breakdown before the final quote for readability
     stage_prices: Optional[List[StagePrice]] = None
+    # Stage bundle deals applied to the selected stages and their combined discount
+    bundles: Optional[List[BundleItem]] = None
+    bundle_discount: Optional[int] = None
     quote_price: int
+    # Promo code applied to the quote, the whole-dollar discount it gave and the price after it
+    promo_code: Optional[str] = None
+    promo_discount: Optional[int] = None
+    payable_price: Optional[int] = None
     note: str = "this is a test note"
+    # Pricing experiment and variant the quote's customer was assigned to; null when not enrolled
+    experiment: Optional[str] = None
+    variant: Optional[str] = None
+    # Regional pricing zone the property's postcode priced in; null when flat pricing applied
+    zone: Optional[str] = None
+    # HMAC-signed token over the params and this result; null unless token signing is configured
+    quote_token: Optional[str] = None
 
 
-_SERVICE_MODULE_CACHE: Dict[str, Any] = {}
-_SERVICE_ALIASES = {
-    "oi-950-1": "pre_purchase",
-    # Backward-compatible alias: old service key points to new module name
-    "oi-950-3": "new_construction_stages",
-    "prepurchase": "pre_purchase",
-    "pre-purchase": "pre_purchase",
-    "pre_purchase": "pre_purchase",
-    "pre-sales": "pre_sales",
-    "presales": "pre_sales",
-    "pre_sales": "pre_sales",
-    "dilapidation": "dilapidation",
-    "construction_stages": "new_construction_stages",
-    "new_construction_stages": "new_construction_stages",
-    # Apartment pre-settlement aliases
-    "apartment-pre-settlement": "apartment_pre_settlement",
-    "apartment_pre_settlement": "apartment_pre_settlement",
-    # Insurance Report aliases
-    "insurance_report": "insurance_report",
-    "insurance-report": "insurance_report",
-    # Defects Investigation aliases
-    "defects_investigation": "defects_investigation",
-    "defects-investigation": "defects_investigation",
-    # Expert Witness Report aliases
-    "expert_witness_report": "expert_witness_report",
-    "expert-witness-report": "expert_witness_report",
-}
+class QuoteVerifyRequest(BaseModel):
+    quote_token: str
+
+
+class QuoteVerifyResponse(BaseModel):
+    service: str
+    params: Dict[str, Any]
+    result: Dict[str, Any]
+    pricing_version: Optional[str] = None
+    # Whether the quote was priced against the currently cached pricing; null when unknown
+    pricing_current: Optional[bool] = None
+    issued_at: int
+    expires_at: int
+
 
-# Per-service notes for API responses
-_SERVICE_NOTES: Dict[str, str] = {
-    "pre_purchase": "this is a test note for pre_purchase",
-    "pre_sales": "this is a test note for pre_sales",
-    "dilapidation": "this is a test note for dilapidation",
-    "new_construction_stages": "this is a test note for new construction stages",
-    "apartment_pre_settlement": "this is a test note for apartment pre-settlement",
-    "insurance_report": "this is a test note for insurance report",
-    "defects_investigation": "this is a test note for defects investigation",
-    "expert_witness_report": "this is a test note for expert witness report",
+class QuoteGridRequest(BaseModel):
+    service: str
+    # Params shared by every cell
+    params: Dict[str, Any] = {}
+    # Swept params: a list of values or an inclusive {"start", "stop", "step"} integer range each
+    dimensions: Dict[str, Any]
+    format: Literal["json", "csv"] = "json"
+    # ISO 8601 date the grid is priced for (scheduled pricing); defaults to now
+    quote_date: Optional[str] = None
+
+
+class PortfolioRequest(BaseModel):
+    # Service of the job's properties (e.g. dilapidation); a property may name its own
+    service: Optional[str] = None
+    # Job reference echoed back in the response
+    job: Optional[str] = None
+    # Params shared by every property
+    params: Dict[str, Any] = {}
+    # One params object per property, with an optional 'label' (defaults to its position)
+    properties: List[Dict[str, Any]]
+    # ISO 8601 date the job is priced for (scheduled pricing); defaults to now
+    quote_date: Optional[str] = None
+
+
+class PortfolioLine(BaseModel):
+    label: str
+    service: Optional[str] = None
+    quote: Optional[QuoteResponse] = None
+    volume_discount: Optional[int] = None
+    line_total: Optional[int] = None
+    # {"status", "detail"} for a property that could not be priced
+    error: Optional[Dict[str, Any]] = None
+
+
+class PortfolioResponse(BaseModel):
+    job: Optional[str] = None
+    pricing_version: Optional[str] = None
+    lines: List[PortfolioLine]
+    properties: int
+    priced: int
+    subtotal: int
+    volume_discount_percent: float
+    volume_discount: int
+    total: int
+
+
+# Response keys in QuoteResponse field order; the estimate route renders these directly
+_RESPONSE_FIELDS = tuple(QuoteResponse.model_fields)
+# Per-cell fields of a price grid (the note is shared and cells carry no tokens or promos)
+_GRID_FIELDS = tuple(
+    field
+    for field in _RESPONSE_FIELDS
+    if field not in ("promo_code", "promo_discount", "payable_price", "note", "experiment", "variant", "zone", "quote_token")
+)
+
+
+def _render_response(result: Dict[str, Any]) -> bytes:
+    """Serialize an already-normalized result in the documented QuoteResponse shape.
+
+    `_run_service_calculation` has already coerced every field, so the result is
+    encoded as-is instead of being validated again through the response model.
+    """
+    return codec.dumps(_response_body(result))
+
+
+def _response_body(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {field: result.get(field) for field in _RESPONSE_FIELDS}
+
+
+_REGISTRY = engine.registry()
+# Opt-in shared pricing: RATE_ENGINE_PRICING_TTL=<seconds> reuses one snapshot per process
+# instead of fetching pricing on every call
+_PRICING = pricing.SnapshotStore(
+    lambda: {name: entry.module for name, entry in _REGISTRY.load_all().items()},
+    ttl=float(os.getenv("RATE_ENGINE_PRICING_TTL") or 0),
+)
+# Effective-dated price changes from RATE_ENGINE_PRICING_SCHEDULE, resolved per quote date
+pricing.set_schedule(schedule.from_env())
+# A/B price tests from RATE_ENGINE_EXPERIMENTS, assigned per customer or session
+pricing.set_experiments(experiments.from_env())
+# Regional pricing zones from RATE_ENGINE_PRICING_ZONES, resolved per property postcode
+_ZONES = zones.from_env()
+pricing.set_zones(_ZONES)
+# Inspector bases from RATE_ENGINE_INSPECTOR_BASES, loaded now so a bad bases file or a
+# missing postcode centroid table fails startup rather than quotes
+travel.current()
+# Promo codes from RATE_ENGINE_PROMO_CODES; None rejects every code
+_PROMOS = promo.codes_from_env(_REGISTRY.canonical_name)
+# Responses replayed for retried requests carrying an Idempotency-Key header
+_IDEMPOTENCY = idempotency.store_from_env()
+# Signs quote tokens when RATE_ENGINE_QUOTE_TOKEN_SECRET is set; None disables them
+_QUOTE_TOKENS = quote_token.signer_from_env()
+# Results of repeated quotes priced against a pinned snapshot (sessions, reprice runs,
+# RATE_ENGINE_PRICING_TTL); RATE_ENGINE_QUOTE_MEMO_SIZE=0 disables it
+_MEMO = memo.QuoteMemo(max_entries=int(os.getenv("RATE_ENGINE_QUOTE_MEMO_SIZE") or 4096))
+# Largest price grid one request may ask for, and how many cells are priced per kernel call
+_GRID_MAX_CELLS = int(os.getenv("RATE_ENGINE_GRID_MAX_CELLS") or 100000)
+_GRID_BLOCK = 4096
+# Largest job a portfolio request may price
+_PORTFOLIO_MAX_PROPERTIES = int(os.getenv("RATE_ENGINE_PORTFOLIO_MAX_PROPERTIES") or 500)
+# Volume discount tiers for portfolio quotes from RATE_ENGINE_PORTFOLIO_DISCOUNTS
+_PORTFOLIO_DISCOUNTS = portfolio.discounts_from_env()
+# Estimate keys a portfolio's params may not carry, with the error reported for them
+_PORTFOLIO_REJECTED_PARAMS = {
+    "quote_date": "'quote_date' applies to the whole portfolio and cannot be set per property",
+    "promo_code": "'promo_code' is not supported in portfolio quotes",
+    "customer_id": "'customer_id' is not supported in portfolio quotes",
 }
 
 
-def _load_service_module(service_name: str):
-    """Dynamically load a service module by its file name (without .py).
+def _http_error(exc: engine.QuoteError) -> HTTPException:
+    return HTTPException(status_code=exc.status, detail=exc.detail)
+
+
+def _get_service(service_name: str) -> ServiceEntry:
+    """Resolve any accepted service name or alias to its canonical registry entry."""
+    try:
+        return engine.get_service(service_name)
+    except engine.QuoteError as exc:
+        raise _http_error(exc) from None
+
 
-    The module file is expected to live next to this app file, e.g. `oi-950-1.py`.
+def _run_service_calculation(service: ServiceEntry, params: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        return engine.run_calculation(service, params)
+    except engine.QuoteError as exc:
+        raise _http_error(exc) from exc.__cause__
+
+
+def _price(params: Dict[str, Any]) -> Tuple[ServiceEntry, Dict[str, Any], Dict[str, Any]]:
+    """Price one estimate payload (including its 'service' key); return its entry, normalized params and response."""
+    entry, normalized_params = _resolve(params)
+    return entry, normalized_params, _quote_entry(entry, normalized_params)
+
+
+def _resolve(params: Dict[str, Any]) -> Tuple[ServiceEntry, Dict[str, Any]]:
+    """Pop the payload's 'service' and return its entry with the normalized params."""
+    try:
+        return engine.resolve(params)
+    except engine.QuoteError as exc:
+        raise _http_error(exc) from None
+
+
+def _estimate_batch(payloads: Sequence[Dict[str, Any]]) -> List[Any]:
+    """Price many estimate payloads at once.
+
+    Payloads are grouped per service and pricing zone. Memoized quotes are answered
+    from the memo and the rest of each group is priced by `_quote_rows`. Each item is the
+    response dict `_price` would return for that payload, or the
+    HTTPException it would raise.
+    """
+    results: List[Any] = [None] * len(payloads)
+    groups: Dict[Tuple[str, Optional[str]], Tuple[ServiceEntry, Any, List[Tuple[int, Any, Dict[str, Any]]]]] = {}
+    for index, params in enumerate(payloads):
+        try:
+            entry, normalized_params = _resolve(params)
+        except HTTPException as exc:
+            results[index] = exc
+            continue
+        postcode = normalized_params.get("postcode")
+        zone = pricing.zone_for(postcode)
+        zone_id = zone.id if zone is not None and zone.overrides_for(entry.name) is not None else None
+        with pricing.located(postcode):
+            memo_key = _MEMO.key(
+                entry.name, entry.mtime_ns, pricing.pinned_config_version(entry.name), normalized_params
+            )
+        if memo_key is not None:
+            cached = _MEMO.get(memo_key)
+            if cached is not None:
+                if zone_id is not None:
+                    cached["zone"] = zone_id
+                results[index] = cached
+                continue
+        # Rows of one group share a zone, so any of their postcodes prices them all
+        group = groups.setdefault((entry.name, zone_id), (entry, postcode, []))
+        group[2].append((index, memo_key, normalized_params))
+
+    for (_, zone_id), (entry, postcode, pending) in groups.items():
+        with pricing.located(postcode):
+            outcomes = _quote_rows(entry, [normalized_params for _, _, normalized_params in pending])
+        for (index, memo_key, _), outcome in zip(pending, outcomes):
+            if not isinstance(outcome, HTTPException):
+                if zone_id is not None:
+                    outcome["zone"] = zone_id
+                if memo_key is not None:
+                    _MEMO.put(memo_key, outcome)
+            results[index] = outcome
+    return results
+
+
+def _quote_rows(entry: ServiceEntry, rows: Sequence[Dict[str, Any]]) -> List[Any]:
+    """Price normalized params for one service; items are response dicts or HTTPExceptions.
+
+    See `engine.quote_rows`; the memo is not consulted.
     """
-    if not service_name or "/" in service_name or service_name.startswith("."):
-        raise HTTPException(status_code=400, detail="Invalid service name")
+    return [
+        _http_error(outcome) if isinstance(outcome, engine.QuoteError) else outcome
+        for outcome in engine.quote_rows(entry, rows)
+    ]
+
 
-    # Cache hit
-    if service_name in _SERVICE_MODULE_CACHE:
-        return _SERVICE_MODULE_CACHE[service_name]
+def _quote_entry(entry: ServiceEntry, normalized_params: Dict[str, Any]) -> Dict[str, Any]:
+    memo_key = _MEMO.key(
+        entry.name, entry.mtime_ns, pricing.pinned_config_version(entry.name), normalized_params
+    )
+    if memo_key is not None:
+        cached = _MEMO.get(memo_key)
+        if cached is not None:
+            return cached
 
-    # Resolve aliases (backward compatibility)
-    resolved_service_name = _SERVICE_ALIASES.get(service_name, service_name)
+    result = engine.with_note(entry, _run_service_calculation(entry, normalized_params))
+    if memo_key is not None:
+        _MEMO.put(memo_key, result)
+    return result
 
-    module_filename = f"{resolved_service_name}.py"
-    module_path = Path(__file__).with_name(module_filename)
-    if not module_path.exists():
-        raise HTTPException(status_code=404, detail="Service not found")
 
-    # Use a safe module name replacing dashes with underscores for Python
-    module_name = resolved_service_name.replace("-", "_")
-    spec = importlib.util.spec_from_file_location(module_name, str(module_path))
-    if spec is None or spec.loader is None:
-        raise HTTPException(status_code=500, detail="Unable to load service module")
+def _issue_quote_token(entry: ServiceEntry, params: Dict[str, Any], result: Dict[str, Any]) -> str:
+    signed_result = {field: result.get(field) for field in _RESPONSE_FIELDS if field != "quote_token"}
+    return _QUOTE_TOKENS.sign(entry.name, params, signed_result, pricing.used_config_version(entry.name))
 
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)  # type: ignore[assignment]
 
-    # Ensure the module exposes a callable `calculate`
-    calculate = getattr(module, "calculate", None)
-    if not callable(calculate):
-        raise HTTPException(status_code=500, detail="Service module missing callable 'calculate'")
+def _quote_date(value: Any) -> Optional[float]:
+    """Epoch seconds for a request's optional 'quote_date'; None prices at the current time."""
+    if value is None:
+        return None
+    try:
+        return schedule.parse_time(value)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=f"'quote_date': {exc}")
+
 
-    _SERVICE_MODULE_CACHE[service_name] = module
-    return module
+def _experiment_subject(value: Any) -> Optional[str]:
+    """A request's optional 'customer_id', which enrolls its quotes in pricing experiments."""
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (str, int)) or not str(value):
+        raise HTTPException(status_code=400, detail="'customer_id' must be a non-empty string or integer")
+    return str(value)
 
 
-def _run_service_calculation(service_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
-    module = _load_service_module(service_name)
-    calculate = getattr(module, "calculate")
+def _with_variant(entry: ServiceEntry, result: Dict[str, Any]) -> Dict[str, Any]:
+    """Record the experiment variant (if any) the quote was priced with."""
+    variant = pricing.assigned_variant(entry.name)
+    if variant is not None:
+        result["experiment"] = variant.experiment
+        result["variant"] = variant.id
+    return result
+
+
+def _promo_code(value: Any) -> promo.PromoCode:
+    """The live promo code named by a request's 'promo_code'."""
+    if _PROMOS is None:
+        raise HTTPException(status_code=400, detail="Unknown promo code")
     try:
-        result = calculate(**params)
-    except TypeError as exc:
-        # Likely unexpected or missing parameters for the service
+        return _PROMOS.lookup(value)
+    except promo.PromoError as exc:
         raise HTTPException(status_code=400, detail=str(exc))
-    except ValueError as exc:
-        # Validation error raised by the service
+
+
+def _with_promo(entry: ServiceEntry, result: Dict[str, Any], promo_code: promo.PromoCode) -> Dict[str, Any]:
+    """Discount the quote by `promo_code`; its use is only counted when the quote is accepted."""
+    try:
+        _PROMOS.check(promo_code, entry.name)
+    except promo.PromoError as exc:
         raise HTTPException(status_code=400, detail=str(exc))
-    except Exception as exc:  # pragma: no cover - safeguard for unknown errors
-        raise HTTPException(status_code=500, detail="Calculation failed") from exc
+    promo.apply(promo_code, result)
+    return result
+
+
+def _with_zone(entry: ServiceEntry, result: Dict[str, Any]) -> Dict[str, Any]:
+    """Record the pricing zone (if any) whose overlay the quote was priced with."""
+    zone = pricing.located_zone()
+    if zone is not None and zone.overrides_for(entry.name) is not None:
+        result["zone"] = zone.id
+    return result
 
-    if not isinstance(result, dict):
-        raise HTTPException(status_code=500, detail="Service did not return a breakdown dictionary")
-    if "quote_price" not in result:
-        raise HTTPException(status_code=500, detail="Service result missing 'quote_price'")
+
+def _decode_payload(body: bytes) -> Dict[str, Any]:
+    """Decode a raw estimate request body into a plain params dict."""
     try:
-        result["quote_price"] = int(result["quote_price"]) 
-    except Exception as exc:  # pragma: no cover - enforce numeric breakdown
-        raise HTTPException(status_code=500, detail="Service field 'quote_price' is not numeric") from exc
-
-    response: Dict[str, Any] = {"quote_price": result["quote_price"]}
-    # Pass through stage_prices if provided by the calculator (e.g., new construction stages)
-    if isinstance(result.get("stage_prices"), list):
-        normalized_stage_prices: List[Dict[str, int]] = []
-        for item in result["stage_prices"]:
-            try:
-                stage_num = int(item.get("stage"))
-                stage_price = int(item.get("price"))
-                normalized_stage_prices.append({"stage": stage_num, "price": stage_price})
-            except Exception:
-                continue
-        if normalized_stage_prices:
-            response["stage_prices"] = normalized_stage_prices
-
-    # Pass through service-provided note if any; final decision done in route handler
-    svc_note = result.get("note")
-    if isinstance(svc_note, str) and svc_note.strip():
-        response["note"] = svc_note
-
-    return response
-
-
-@app.post("/api/v1/quotes/estimate", response_model=QuoteResponse)
-async def post_quote_estimate(payload: QuoteRequest) -> QuoteResponse:
-    params = payload.model_dump()
-    service = params.pop("service", None)
-    if not service:
-        raise HTTPException(status_code=400, detail="Missing required 'service' in payload")
-
-    normalized_params = _normalize_params(params)
-    # Resolve to canonical service key for consistent behavior
-    canonical_service = _SERVICE_ALIASES.get(service, service)
-    # Service-specific param adjustments: none required for levels handling.
-    result = _run_service_calculation(service, normalized_params)
-    # Attach service-provided note if available; otherwise fallback to static mapping
-    note_from_service = result.get("note")
-    if isinstance(note_from_service, str) and note_from_service.strip():
-        result_note = note_from_service
-    else:
-        result_note = _SERVICE_NOTES.get(canonical_service, "this is a test note")
-    result["note"] = result_note
-    return QuoteResponse(**result)
-
-
-def _normalize_params(params: Dict[str, Any]) -> Dict[str, Any]:
-    """Generic normalization for request parameters sent to service modules.
-
-    - Convert 'yes'/'no' (case-insensitive) and 'true'/'false' strings to booleans
-    - Convert numeric-looking strings to integers
-    - Rename legacy keys to current naming (e.g., 'extra_levels' -> 'levels')
-    """
-    normalized: Dict[str, Any] = {}
-    for key, value in params.items():
-        # yes/no or true/false strings to bool
-        if isinstance(value, str):
-            lowered = value.strip().lower()
-            if lowered in {"yes", "true"}:
-                value = True
-            elif lowered in {"no", "false"}:
-                value = False
-            else:
-                # convert pure integer strings to ints
-                stripped = value.strip()
-                if stripped.isdigit() or (stripped.startswith("-") and stripped[1:].isdigit()):
-                    try:
-                        value = int(stripped)
-                    except Exception:
-                        pass
-
-        normalized[key] = value
-
-    # Key renames
-    # Consolidate to 'levels' as the canonical key (no support for extra_levels/extra_level)
-    if "levels" not in normalized:
-        if "number_of_levels" in normalized:
-            normalized["levels"] = normalized.pop("number_of_levels")
-        elif "level" in normalized:
-            normalized["levels"] = normalized.pop("level")
-    # pest_inspection removed from payload support
-
-    # Normalize alias for owner neighbor access key
-    if "owner_inspection_arranging_to_access_neighbors" in normalized and "owner_access_neighbors" not in normalized:
-        normalized["owner_access_neighbors"] = normalized.pop(
-            "owner_inspection_arranging_to_access_neighbors"
-        )
+        payload = codec.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Request body is not valid JSON")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=422, detail="Request body must be a JSON object")
+    service = payload.get("service")
+    if service is None:
+        raise HTTPException(status_code=422, detail="Missing required 'service' in payload")
+    if not isinstance(service, str):
+        raise HTTPException(status_code=422, detail="'service' must be a string")
+    return payload
+
+
+@app.post(
+    "/api/v1/quotes/estimate",
+    response_model=QuoteResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": QuoteRequest.model_json_schema()}},
+        }
+    },
+)
+async def post_quote_estimate(
+    request: Request,
+    idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key"),
+) -> Response:
+    body = await request.body()
+    request_fingerprint = None
+    if idempotency_key is not None:
+        try:
+            idempotency_key = idempotency.validate_key(idempotency_key)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        request_fingerprint = idempotency.fingerprint(body)
+        stored = _IDEMPOTENCY.get(idempotency_key)
+        if stored is not None:
+            if stored.fingerprint != request_fingerprint:
+                raise HTTPException(
+                    status_code=422, detail="Idempotency-Key was already used with a different payload"
+                )
+            # Replay the original bytes so retries see exactly the same quote
+            return Response(
+                content=stored.body, media_type="application/json", headers={"Idempotent-Replayed": "true"}
+            )
+
+    # Decode the body once and hand the dict straight to the service, instead of
+    # round-tripping it through QuoteRequest/model_dump
+    params = _decode_payload(body)
+    # Optional ISO 8601 date to price at under scheduled pricing (e.g. to reproduce a past quote)
+    quote_date = _quote_date(params.pop("quote_date", None))
+    subject = _experiment_subject(params.pop("customer_id", None))
+    promo_code = params.pop("promo_code", None)
+    promo_code = _promo_code(promo_code) if promo_code is not None else None
+    with pricing.using(_PRICING.current(), at=quote_date, subject=subject, postcode=params.get("postcode")):
+        entry, quote_params, result = _price(params)
+        _with_variant(entry, result)
+        _with_zone(entry, result)
+        # Checked only once the quote itself has priced successfully
+        if promo_code is not None:
+            _with_promo(entry, result, promo_code)
+        if _QUOTE_TOKENS is not None:
+            result["quote_token"] = _issue_quote_token(entry, quote_params, result)
+        content = _render_response(result)
+    # Only successful quotes are stored; errors are cheap to recompute and may be transient
+    if request_fingerprint is not None:
+        _IDEMPOTENCY.put(idempotency_key, idempotency.StoredResponse(request_fingerprint, content))
+    # Returning a Response skips response_model validation; the model stays for the docs
+    return Response(content=content, media_type="application/json")
+
+
+def _verify_quote_token(token: str) -> Dict[str, Any]:
+    """The claims of a trusted quote token, as the verify and accept routes answer them."""
+    if _QUOTE_TOKENS is None:
+        raise HTTPException(status_code=501, detail="Quote tokens are not enabled")
+    try:
+        claims = _QUOTE_TOKENS.verify(token)
+    except quote_token.InvalidQuoteToken as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
 
-    # Accept common typo for granny flat
-    if "granny_flate" in normalized and "granny_flat" not in normalized:
-        normalized["granny_flat"] = normalized.pop("granny_flate")
+    pricing_current = None
+    snapshot = _PRICING.current()
+    if snapshot is not None and claims.get("pricing_version") is not None:
+        with pricing.using(snapshot, postcode=claims["params"].get("postcode")):
+            current_version = pricing.pinned_config_version(claims["service"])
+        if current_version is not None:
+            pricing_current = current_version == claims["pricing_version"]
+    return {
+        "service": claims["service"],
+        "params": claims["params"],
+        "result": claims["result"],
+        "pricing_version": claims.get("pricing_version"),
+        "pricing_current": pricing_current,
+        "issued_at": claims["iat"],
+        "expires_at": claims["exp"],
+    }
+
+
+@app.post("/api/v1/quotes/verify", response_model=QuoteVerifyResponse)
+async def post_quote_verify(payload: QuoteVerifyRequest) -> Dict[str, Any]:
+    """Check a quote token's signature and expiry without recalculating the quote."""
+    return _verify_quote_token(payload.quote_token)
+
+
+@app.post("/api/v1/quotes/accept", response_model=QuoteVerifyResponse)
+async def post_quote_accept(payload: QuoteVerifyRequest) -> Dict[str, Any]:
+    """Accept a quote by its token, counting a use of its promo code (once per token)."""
+    verified = _verify_quote_token(payload.quote_token)
+    code = verified["result"].get("promo_code")
+    if code is not None:
+        if _PROMOS is None:
+            raise HTTPException(status_code=400, detail="Unknown promo code")
+        try:
+            # The code only had to be live when the quote was issued
+            promo_code = _PROMOS.lookup(code, now=verified["issued_at"])
+            _PROMOS.claim(promo_code, hashlib.sha256(payload.quote_token.encode("ascii")).hexdigest())
+        except promo.PromoError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+    return verified
+
+
+def _snapshot_for(entry: ServiceEntry, shared: Optional[pricing.PricingSnapshot]) -> pricing.PricingSnapshot:
+    """`shared` when it covers the service, otherwise a snapshot captured for the service alone."""
+    if shared is not None and entry.name in shared.configs:
+        return shared
+    try:
+        return pricing.capture_snapshot({entry.name: entry.module})
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
 
-    # Backward compat: video_23 -> video
-    if "video_23" in normalized and "video" not in normalized:
-        normalized["video"] = normalized.pop("video_23")
 
-    # Normalize property category key aliases/typos
-    if "property_category" not in normalized:
-        if "usage_type" in normalized:
-            normalized["property_category"] = normalized.pop("usage_type")
-        elif "property_usage" in normalized:
-            normalized["property_category"] = normalized.pop("property_usage")
-        elif "propert_usage" in normalized:
-            normalized["property_category"] = normalized.pop("propert_usage")
+@app.post("/api/v1/quotes/grid")
+async def post_quote_grid(payload: QuoteGridRequest) -> StreamingResponse:
+    """Price the cartesian grid of the given dimensions for one service.
 
-    # Accept Swimming_pool as alias for swimming_pool param
-    if "Swimming_pool" in normalized and "swimming_pool" not in normalized:
-        normalized["swimming_pool"] = normalized.pop("Swimming_pool")
+    Every cell is priced against the same pricing snapshot. The response streams
+    as JSON (`{"service", "pricing_version", "note", "dimensions", "cells": [...]}`)
+    or as CSV with one row per cell; failed cells carry their error instead of prices.
+    """
+    entry = _get_service(payload.service)
+    try:
+        expanded = grid.expand(payload.dimensions, _GRID_MAX_CELLS)
+        base = engine.coerce_params(payload.params, entry.schema)
+        # Coerce each dimension value once; aliases resolve to the current param name
+        names = [engine.PARAM_ALIASES.get(name, (name,))[0] for name, _ in expanded]
+        columns = [[engine.coerce_params({name: value}, entry.schema) for value in values] for name, values in expanded]
+        entry.schema.check_required({**base, **dict.fromkeys(names)})
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    # The whole grid is priced in the zone of the shared params' postcode
+    if _ZONES is not None and "postcode" in names:
+        raise HTTPException(status_code=400, detail="'postcode' selects a pricing zone and cannot be a grid dimension")
+    postcode = base.get("postcode")
+
+    snapshot = _snapshot_for(entry, _PRICING.current())
+    # Every block is priced for the same date, even if the stream outlives a schedule boundary
+    quote_date = _quote_date(payload.quote_date)
+    if quote_date is None:
+        quote_date = time.time()
+    values_by_dimension = [values for _, values in expanded]
+    index_grid = grid.combinations([(name, range(len(values))) for name, values in expanded])
+
+    def cells() -> Iterator[grid.Cell]:
+        while block := list(itertools.islice(index_grid, _GRID_BLOCK)):
+            rows = []
+            for indexes in block:
+                row = dict(base)
+                for column, index in zip(columns, indexes):
+                    row.update(column[index])
+                rows.append(row)
+            with pricing.using(snapshot, at=quote_date, postcode=postcode):
+                outcomes = _quote_rows(entry, rows)
+            for indexes, outcome in zip(block, outcomes):
+                values = tuple(dimension[index] for dimension, index in zip(values_by_dimension, indexes))
+                if isinstance(outcome, HTTPException):
+                    yield values, (outcome.status_code, outcome.detail)
+                else:
+                    yield values, {field: outcome[field] for field in _GRID_FIELDS if outcome.get(field) is not None}
+
+    if payload.format == "csv":
+        return StreamingResponse(grid.csv_chunks(names, _GRID_FIELDS, cells()), media_type="text/csv")
+    with pricing.using(snapshot, at=quote_date, postcode=postcode):
+        pricing_version = pricing.pinned_config_version(entry.name)
+    header = {
+        "service": entry.name,
+        "pricing_version": pricing_version,
+        "note": engine.with_note(entry, {"note": str(snapshot.configs[entry.name].get("note") or "")})["note"],
+        "dimensions": {name: values for name, values in zip(names, values_by_dimension)},
+    }
+    return StreamingResponse(grid.json_chunks(header, names, cells()), media_type="application/json")
+
+
+@app.post("/api/v1/quotes/portfolio", response_model=PortfolioResponse)
+async def post_quote_portfolio(payload: PortfolioRequest) -> Dict[str, Any]:
+    """Price every property of a job in one pass and apply the job's volume discount.
+
+    Each property is priced like an estimate of the shared params merged with its
+    own, all against one pricing snapshot. A property that fails carries its error
+    and is left out of the totals. Promo codes and experiments do not apply, and
+    the quote date is the job's.
+    """
+    if not payload.properties:
+        raise HTTPException(status_code=400, detail="At least one property is required")
+    if len(payload.properties) > _PORTFOLIO_MAX_PROPERTIES:
+        raise HTTPException(
+            status_code=400, detail=f"At most {_PORTFOLIO_MAX_PROPERTIES} properties are allowed per portfolio"
+        )
+    for key, detail in _PORTFOLIO_REJECTED_PARAMS.items():
+        if key in payload.params:
+            raise HTTPException(status_code=400, detail=detail)
+    labels: List[str] = []
+    services: List[Any] = []
+    payloads: List[Dict[str, Any]] = []
+    # Position -> error of a property rejected before pricing
+    rejected: Dict[int, HTTPException] = {}
+    for position, item in enumerate(payload.properties, start=1):
+        params = {"service": payload.service, **payload.params, **item}
+        label = params.pop("label", None)
+        labels.append(str(position) if label is None else str(label))
+        services.append(params["service"] if isinstance(params["service"], str) else None)
+        for key, detail in _PORTFOLIO_REJECTED_PARAMS.items():
+            if key in params:
+                rejected[position] = HTTPException(status_code=400, detail=detail)
+                break
+        else:
+            payloads.append(params)
+
+    # One snapshot for the whole job: the shared one if it covers every service
+    entries: Dict[str, ServiceEntry] = {}
+    for service in set(services):
+        if isinstance(service, str):
+            try:
+                entry = _get_service(service)
+            except HTTPException:
+                continue  # Reported on the properties that named it
+            entries[entry.name] = entry
+    snapshot = _PRICING.current()
+    if snapshot is None or any(name not in snapshot.configs for name in entries):
+        try:
+            snapshot = pricing.capture_snapshot({name: entry.module for name, entry in entries.items()})
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+
+    with pricing.using(snapshot, at=_quote_date(payload.quote_date)):
+        priced = iter(_estimate_batch(payloads))
+    outcomes = [rejected.get(position) or next(priced) for position in range(1, len(labels) + 1)]
+    lines: List[Dict[str, Any]] = []
+    for label, service, outcome in zip(labels, services, outcomes):
+        if isinstance(outcome, HTTPException):
+            error = {"status": outcome.status_code, "detail": outcome.detail}
+            lines.append({"label": label, "service": service, "error": error})
+        else:
+            lines.append({"label": label, "service": service, "quote": _response_body(outcome)})
+    totals = portfolio.apply_volume_discount(_PORTFOLIO_DISCOUNTS, lines)
+    return {"job": payload.job, "pricing_version": snapshot.version, "lines": lines, **totals}
+
+
+class _QuoteSession:
+    """State of one live quote session: the current service, its normalized params and pricing.
+
+    Deltas are merged into the stored params and only the changed keys are coerced
+    again; switching service (or a hot-reloaded module) renormalizes from the merged
+    raw params. Pricing is pinned for the session's lifetime: the shared snapshot if
+    one is enabled, otherwise one captured per service on first use. Pricing
+    experiments assign variants by the 'customer_id' sent in a message, or by the
+    session itself until one is sent. A 'promo_code' stays applied until a message
+    sets it to null.
+    """
 
-    return normalized
+    def __init__(self, snapshot: Optional[pricing.PricingSnapshot]) -> None:
+        self.entry: Optional[ServiceEntry] = None
+        self.raw: Dict[str, Any] = {}
+        self.params: Dict[str, Any] = {}
+        self.subject = f"session:{uuid.uuid4().hex}"
+        self.promo_code: Optional[promo.PromoCode] = None
+        self._shared_snapshot = snapshot
+        self._snapshots: Dict[str, pricing.PricingSnapshot] = {}
+
+    def apply(self, delta: Dict[str, Any]) -> None:
+        """Merge a params delta; null values remove a parameter. Invalid deltas change nothing."""
+        service = delta.pop("service", None)
+        if service is not None and not isinstance(service, str):
+            raise HTTPException(status_code=422, detail="'service' must be a string")
+        subject = _experiment_subject(delta.pop("customer_id", None))
+        promo_changed = "promo_code" in delta
+        promo_code = delta.pop("promo_code", None)
+        promo_code = _promo_code(promo_code) if promo_code is not None else None
+        if service is None and self.entry is None:
+            raise HTTPException(status_code=400, detail="Missing required 'service' in payload")
+        # Looked up on every delta so a hot-reloaded module is picked up mid-session
+        entry = _get_service(service or self.entry.name)
+
+        raw = {key: value for key, value in {**self.raw, **delta}.items() if value is not None}
+        try:
+            if entry is not self.entry:
+                params = engine.coerce_params(raw, entry.schema)
+            else:
+                params = dict(self.params)
+                for key, value in delta.items():
+                    if value is None:
+                        params.pop(engine.PARAM_ALIASES.get(key, (key,))[0], None)
+                        params.pop(key, None)
+                params.update(engine.coerce_params(delta, entry.schema))
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        self.entry, self.raw, self.params = entry, raw, params
+        if subject is not None:
+            self.subject = subject
+        if promo_changed:
+            self.promo_code = promo_code
+
+    def _snapshot_for(self, entry: ServiceEntry) -> pricing.PricingSnapshot:
+        snapshot = self._snapshots.get(entry.name)
+        if snapshot is None:
+            snapshot = _snapshot_for(entry, self._shared_snapshot)
+            self._snapshots[entry.name] = snapshot
+        return snapshot
+
+    def quote(self) -> Dict[str, Any]:
+        entry = self.entry
+        try:
+            entry.schema.check_required(self.params)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        with pricing.using(self._snapshot_for(entry), subject=self.subject, postcode=self.params.get("postcode")):
+            result = _with_zone(entry, _with_variant(entry, _quote_entry(entry, dict(self.params))))
+            if self.promo_code is not None:
+                _with_promo(entry, result, self.promo_code)
+            if _QUOTE_TOKENS is not None:
+                result["quote_token"] = _issue_quote_token(entry, self.params, result)
+        return _response_body(result)
+
+
+@app.websocket("/api/v1/quotes/session")
+async def quote_session(websocket: WebSocket) -> None:
+    """Live quote session for multi-step forms.
+
+    Each text message is a JSON object of parameter changes in the estimate payload
+    shape (the first one must include 'service'; null removes a parameter). Every
+    message is answered with `{"seq": n, "quote": {...}}` or
+    `{"seq": n, "error": {"status": ..., "detail": ...}}`; errors keep the session open.
+    """
+    await websocket.accept()
+    session = _QuoteSession(_PRICING.current())
+    seq = 0
+    async for message in websocket.iter_text():
+        seq += 1
+        try:
+            try:
+                delta = codec.loads(message)
+            except ValueError:
+                raise HTTPException(status_code=422, detail="Message is not valid JSON")
+            if not isinstance(delta, dict):
+                raise HTTPException(status_code=422, detail="Message must be a JSON object")
+            session.apply(delta)
+            reply: Dict[str, Any] = {"seq": seq, "quote": session.quote()}
+        except HTTPException as exc:
+            reply = {"seq": seq, "error": {"status": exc.status_code, "detail": exc.detail}}
+        await websocket.send_text(codec.dumps(reply).decode("utf-8"))
 
 
 if __name__ == "__main__":
     # Run: uvicorn app:app --reload
+    # Development server with the auto-reloader; production uses serve.py
     import uvicorn
 
     uvicorn.run("app:app", host="0.0.0.0", port=8020, reload=True)
@@ -0,0 +1,196 @@
+"""Offline bulk repricer for JSONL files of quote payloads.
+
+Each input line is a payload as accepted by `POST /api/v1/quotes/estimate`.
+Lines are priced through the headless `engine` module, the same service
+modules as the API but without loading the web app, spread over a process pool
+whose workers are primed once with a single pricing snapshot, so a run never
+refetches pricing per line. Within each chunk, the lines of every spec-defined
+service are priced together by its vectorized kernel.
+
+Usage:
+    python reprice.py payloads.jsonl -o results.jsonl --workers 8
+
+With `--as-of 2026-07-01` every line is priced under the scheduled pricing
+(see `rate_engine_core/schedule.py`) in effect at that date instead of now.
+
+Results are written as JSONL in input order; throughput stats go to stderr.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from itertools import islice
+from multiprocessing import get_context
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import engine
+from rate_engine_core import codec, pricing, schedule
+
+
+# The run's pricing snapshot and pricing date, set in each worker
+_PRICING: Tuple[Optional[pricing.PricingSnapshot], Optional[float]] = (None, None)
+
+
+def _init_worker(snapshot: pricing.PricingSnapshot, as_of: Optional[float], spawned: bool = False) -> None:
+    global _PRICING
+    # Under fork the modules and pricing sources are inherited already loaded; under spawn they load here
+    if spawned:
+        engine.configure_from_env()
+    engine.registry().load_all()
+    _PRICING = (snapshot, as_of)
+
+
+def _compile_kernels(snapshot: pricing.PricingSnapshot) -> None:
+    """Compile each spec-defined service's batch kernel for the snapshot's config.
+
+    Run before the pool forks, so workers inherit NumPy and the compiled kernels.
+    """
+    for name, entry in engine.registry().load_all().items():
+        service_rules = getattr(entry.module, "RULES", None)
+        if service_rules is not None and name in snapshot.configs:
+            service_rules.batch_kernel(snapshot.configs[name])
+
+
+def _reprice_chunk(items: List[Tuple[int, str]]) -> List[Tuple[bool, str]]:
+    """Price one chunk of lines; spec-defined services are priced in a vectorized pass."""
+    records: List[Dict[str, Any]] = []
+    payloads: List[Dict[str, Any]] = []
+    pending: List[Dict[str, Any]] = []
+    for line_no, raw in items:
+        record: Dict[str, Any] = {"line": line_no}
+        records.append(record)
+        try:
+            payload = codec.loads(raw)
+        except ValueError:
+            payload = None
+        if not isinstance(payload, dict):
+            record.update(status=400, error="Invalid JSON payload")
+            continue
+
+        service = payload.get("service")
+        record["service"] = service
+        if service and not isinstance(service, str):
+            record.update(status=400, error="'service' must be a string")
+            continue
+        payloads.append(payload)
+        pending.append(record)
+
+    snapshot, as_of = _PRICING
+    for record, outcome in zip(pending, engine.quote_batch(payloads, snapshot, at=as_of)):
+        if isinstance(outcome, engine.QuoteError):
+            record.update(status=outcome.status, error=outcome.detail)
+        else:
+            record["result"] = outcome
+            record["status"] = 200
+    return [(record.get("status") == 200, json.dumps(record)) for record in records]
+
+
+def _chunks(items: Iterable[Tuple[int, str]], size: int) -> Iterator[List[Tuple[int, str]]]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _numbered_lines(stream: Iterable[str]) -> Iterator[Tuple[int, str]]:
+    for line_no, line in enumerate(stream, start=1):
+        if line.strip():
+            yield line_no, line
+
+
+def run(
+    source: Iterable[str],
+    sink,
+    workers: int,
+    chunk_size: int,
+    snapshot: pricing.PricingSnapshot,
+    as_of: Optional[float] = None,
+) -> Dict[str, Any]:
+    lines = _numbered_lines(source)
+    # Bound memory by feeding the pool one window of lines at a time
+    window = max(1, workers * chunk_size * 4)
+    total = ok = 0
+    started = time.perf_counter()
+
+    _compile_kernels(snapshot)
+    pool = None
+    if workers > 1:
+        context = get_context()
+        spawned = context.get_start_method() != "fork"
+        pool = context.Pool(workers, initializer=_init_worker, initargs=(snapshot, as_of, spawned))
+    else:
+        _init_worker(snapshot, as_of)
+    try:
+        while True:
+            batch = list(islice(lines, window))
+            if not batch:
+                break
+            if pool is not None:
+                results = pool.imap(_reprice_chunk, _chunks(batch, chunk_size))
+            else:
+                results = map(_reprice_chunk, _chunks(batch, chunk_size))
+            for chunk in results:
+                for succeeded, text in chunk:
+                    sink.write(text)
+                    sink.write("\n")
+                    total += 1
+                    ok += succeeded
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    elapsed = time.perf_counter() - started
+    return {
+        "lines": total,
+        "ok": ok,
+        "failed": total - ok,
+        "workers": workers,
+        "pricing_version": snapshot.version,
+        "elapsed_s": round(elapsed, 3),
+        "quotes_per_s": round(total / elapsed, 1) if elapsed > 0 else None,
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Reprice a JSONL file of quote payloads.")
+    parser.add_argument("input", help="JSONL file of estimate payloads ('-' for stdin)")
+    parser.add_argument("-o", "--output", default="-", help="JSONL results file ('-' for stdout)")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=256, help="payloads handed to a worker and priced together")
+    parser.add_argument("--as-of", help="ISO 8601 date to resolve scheduled pricing at (default: now)")
+    args = parser.parse_args(argv)
+
+    # One pricing date for the whole run, even if it outlives a schedule boundary
+    as_of = time.time()
+    if args.as_of is not None:
+        try:
+            as_of = schedule.parse_time(args.as_of)
+        except ValueError as exc:
+            parser.error(str(exc))
+
+    engine.configure_from_env()
+    try:
+        snapshot = engine.capture()
+    except engine.QuoteError as exc:
+        parser.exit(2, f"reprice: could not capture pricing snapshot: {exc.detail}\n")
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    sink = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        stats = run(source, sink, max(1, args.workers), max(1, args.chunk_size), snapshot, as_of)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+    print(json.dumps(stats), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""Production entry point: gunicorn master with preforked uvicorn workers.
+
+The app, every service module and (when `RATE_ENGINE_PRICING_TTL` is set)
+the pricing snapshot, with its compiled formulas and lookup tables, are
+loaded once in the master before forking, so workers share them
+copy-on-write instead of each rebuilding them. Workers are
+recycled gracefully after `--max-requests` requests.
+
+Usage:
+    python serve.py                  # one worker per available core on :8020
+    python serve.py --workers 4 --port 8020
+
+Every option can also be set through the environment (`WEB_CONCURRENCY`,
+`PORT`, `HOST`, `RATE_ENGINE_MAX_REQUESTS`, ...); see `--help`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from typing import Any, Dict, Optional
+
+from gunicorn.app.base import BaseApplication
+
+
+def _available_cores() -> int:
+    # Honour CPU affinity/cpusets so a container only counts the cores it was given
+    try:
+        return len(os.sched_getaffinity(0)) or 1
+    except AttributeError:  # pragma: no cover - platforms without sched_getaffinity
+        return os.cpu_count() or 1
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+class EngineServer(BaseApplication):
+    """Embedded gunicorn application serving `app:app`."""
+
+    def __init__(self, options: Dict[str, Any]) -> None:
+        self._options = options
+        super().__init__()
+
+    def load_config(self) -> None:
+        for key, value in self._options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        # With preload_app this runs once in the master, before the workers fork
+        import app as engine
+
+        entries = engine._REGISTRY.load_all()
+        snapshot = engine._PRICING.current()
+        if snapshot is not None:
+            # Compile the snapshot's configs and wait for their lookup tables before forking,
+            # so every worker inherits them (a build still pending at a fork restarts in the worker)
+            for name, entry in entries.items():
+                service_rules = getattr(entry.module, "RULES", None)
+                if service_rules is not None and name in snapshot.configs:
+                    service_rules.warm(snapshot.configs[name])
+        return engine.app
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve the rate engine with preforked workers.")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=_env_int("PORT", 8020))
+    parser.add_argument(
+        "-w", "--workers", type=int, default=_env_int("WEB_CONCURRENCY", _available_cores()),
+        help="worker processes (default: available cores)",
+    )
+    parser.add_argument(
+        "--max-requests", type=int, default=_env_int("RATE_ENGINE_MAX_REQUESTS", 10000),
+        help="recycle a worker after this many requests (0 disables)",
+    )
+    parser.add_argument(
+        "--max-requests-jitter", type=int, default=_env_int("RATE_ENGINE_MAX_REQUESTS_JITTER", 1000),
+        help="random extra requests so workers do not all recycle at once",
+    )
+    parser.add_argument("--timeout", type=int, default=_env_int("RATE_ENGINE_WORKER_TIMEOUT", 30))
+    parser.add_argument(
+        "--graceful-timeout", type=int, default=_env_int("RATE_ENGINE_GRACEFUL_TIMEOUT", 30),
+        help="seconds a recycled or stopping worker gets to finish in-flight requests",
+    )
+    args = parser.parse_args(argv)
+    if args.workers > 1 and not os.getenv("RATE_ENGINE_IDEMPOTENCY_REDIS_URL"):
+        # Each worker keeps its own in-process store, so a retry may reach a worker that never saw the key
+        print(
+            "serve: warning: idempotent replays are per worker; set RATE_ENGINE_IDEMPOTENCY_REDIS_URL "
+            "to replay retries that reach another worker",
+            file=sys.stderr,
+        )
+
+    options = {
+        "bind": f"{args.host}:{args.port}",
+        "workers": max(1, args.workers),
+        "worker_class": "uvicorn_worker.UvicornWorker",
+        "preload_app": True,
+        "max_requests": max(0, args.max_requests),
+        "max_requests_jitter": max(0, args.max_requests_jitter),
+        "timeout": args.timeout,
+        "graceful_timeout": args.graceful_timeout,
+        "accesslog": os.getenv("RATE_ENGINE_ACCESS_LOG") or None,
+    }
+    EngineServer(options).run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
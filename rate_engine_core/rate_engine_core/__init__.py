@@ -0,0 +1,5 @@
+"""Pricing core shared by `rate_engine` and `rate_engine_internal`.
+
+Each engine keeps its own app, service specs (`services/*.json`), aliases and
+`.env`; everything that compiles, prices, caches and serves quotes lives here.
+"""
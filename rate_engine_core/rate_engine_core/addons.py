@@ -3,15 +3,13 @@ Addon pricing module for Owner Inspections services.
 This module handles all addon calculations that can be applied across different services.
 """
 
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
+from . import money
+from .rules import read_env_value
 
 
 def _get_addon_price(key: str):
     """Helper function to get addon price from environment variable."""
-    value = os.getenv(key)
+    value = read_env_value(key)
     if value is None or value.upper() == "XXX":
         return None
     try:
@@ -42,6 +40,11 @@ ADDON_PRICES = {
     "video": ADDON_VIDEO,
 }
 
+# The same prices in integer cents; addon totals are summed in cents
+ADDON_PRICE_CENTS = {
+    name: None if price is None else money.to_cents(price) for name, price in ADDON_PRICES.items()
+}
+
 
 def calculate_addons(selected_addons: dict) -> dict:
     """
@@ -55,7 +58,8 @@ def calculate_addons(selected_addons: dict) -> dict:
     Returns:
         Dictionary containing:
         - total: Total addon cost
-        - breakdown: List of applied addons with individual costs
+        - total_cents: Total addon cost in integer cents (exact)
+        - breakdown: List of applied addons with individual costs (and cost_cents)
         - unavailable: List of addons that were requested but have no pricing
     
     Example:
@@ -65,7 +69,7 @@ def calculate_addons(selected_addons: dict) -> dict:
             "out_of_area_travel_surcharge_per_km": 50  # 50km distance
         }
     """
-    total = 0
+    total_cents = 0
     breakdown = []
     unavailable = []
     
@@ -77,6 +81,7 @@ def calculate_addons(selected_addons: dict) -> dict:
             continue
             
         price = ADDON_PRICES[addon_name]
+        price_cents = ADDON_PRICE_CENTS[addon_name]
         
         if price is None:
             unavailable.append(addon_name)
@@ -84,26 +89,29 @@ def calculate_addons(selected_addons: dict) -> dict:
         
         # Handle distance-based pricing (e.g., per km surcharge)
         if addon_name == "out_of_area_travel_surcharge_per_km" and isinstance(addon_value, (int, float)):
-            cost = price * addon_value
+            cost_cents = money.times(price_cents, addon_value)
             breakdown.append({
                 "name": addon_name,
                 "unit_price": price,
                 "quantity": addon_value,
-                "cost": cost
+                "cost": cost_cents / money.CENTS_PER_DOLLAR,
+                "cost_cents": cost_cents
             })
-            total += cost
+            total_cents += cost_cents
         else:
             # Standard boolean addon
             breakdown.append({
                 "name": addon_name,
                 "unit_price": price,
                 "quantity": 1,
-                "cost": price
+                "cost": price_cents / money.CENTS_PER_DOLLAR,
+                "cost_cents": price_cents
             })
-            total += price
+            total_cents += price_cents
     
     return {
-        "total": total,
+        "total": total_cents / money.CENTS_PER_DOLLAR,
+        "total_cents": total_cents,
         "breakdown": breakdown,
         "unavailable": unavailable
     }
@@ -0,0 +1,36 @@
+"""JSON encode/decode helpers for the request and response hot paths.
+
+Uses orjson when it is installed and falls back to the standard library
+otherwise, so the engine keeps working in minimal environments.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:  # pragma: no cover - exercised implicitly depending on the environment
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+
+if orjson is not None:
+
+    def loads(data: bytes | str) -> Any:
+        """Decode a JSON document; raises ValueError on malformed input."""
+        return orjson.loads(data)
+
+    def dumps(obj: Any) -> bytes:
+        """Encode `obj` as compact UTF-8 JSON bytes."""
+        return orjson.dumps(obj)
+
+else:
+
+    def loads(data: bytes | str) -> Any:
+        """Decode a JSON document; raises ValueError on malformed input."""
+        return json.loads(data)
+
+    def dumps(obj: Any) -> bytes:
+        """Encode `obj` as compact UTF-8 JSON bytes."""
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
@@ -0,0 +1,398 @@
+"""Headless pricing core: service lookup, param normalization and quoting.
+
+Each engine's `engine.py` builds an `Engine` over its own service directory,
+aliases and notes; scripts, cron jobs and the web app price through it. Nothing
+here imports FastAPI, Pydantic or uvicorn. The service registry is built on
+first use, service modules are loaded when first quoted, and NumPy is only
+imported by batch pricing.
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from . import pricing
+
+if TYPE_CHECKING:
+    from .registry import ServiceEntry, ServiceRegistry
+    from .service_schema import ServiceSchema
+
+
+class QuoteError(Exception):
+    """A quote that could not be priced; `status` is the HTTP status the API answers with."""
+
+    def __init__(self, status: int, detail: str) -> None:
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+def run_calculation(service: ServiceEntry, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Run a service's calculate() on normalized params and normalize its breakdown."""
+    try:
+        result = service.calculate(**params)
+    except Exception as exc:
+        raise calculation_error(exc) from exc
+    return service_response(result)
+
+
+def calculation_error(exc: Exception) -> QuoteError:
+    """The QuoteError a failed calculate() call is reported as."""
+    if isinstance(exc, TypeError):
+        # Likely unexpected or missing parameters for the service
+        return QuoteError(400, str(exc))
+    if isinstance(exc, ValueError):
+        # Validation error raised by the service
+        return QuoteError(400, str(exc))
+    # Safeguard for unknown errors
+    return QuoteError(500, "Calculation failed")
+
+
+def service_response(result: Any) -> Dict[str, Any]:
+    """Check a calculator's breakdown and normalize it into response fields."""
+    if not isinstance(result, dict):
+        raise QuoteError(500, "Service did not return a breakdown dictionary")
+    if "quote_price" not in result:
+        raise QuoteError(500, "Service result missing 'quote_price'")
+    try:
+        result["quote_price"] = int(result["quote_price"])
+    except Exception as exc:  # pragma: no cover - enforce numeric breakdown
+        raise QuoteError(500, "Service field 'quote_price' is not numeric") from exc
+
+    response: Dict[str, Any] = {"quote_price": result["quote_price"]}
+
+    # Pass through gst if provided by the calculator
+    if "gst" in result:
+        try:
+            response["gst"] = int(result["gst"])
+        except Exception:
+            pass
+
+    # Pass through price_including_gst if provided by the calculator
+    if "price_including_gst" in result:
+        try:
+            response["price_including_gst"] = int(result["price_including_gst"])
+        except Exception:
+            pass
+
+    # Pass through discount if provided by the calculator
+    if "discount" in result:
+        try:
+            response["discount"] = int(result["discount"])
+        except Exception:
+            pass
+
+    # Pass through payable_price if provided by the calculator
+    if "payable_price" in result:
+        try:
+            response["payable_price"] = int(result["payable_price"])
+        except Exception:
+            pass
+
+    # Pass through stage_prices if provided by the calculator (e.g., new construction stages)
+    if isinstance(result.get("stage_prices"), list):
+        normalized_stage_prices: List[Dict[str, int]] = []
+        for item in result["stage_prices"]:
+            try:
+                stage_num = int(item.get("stage"))
+                stage_price = int(item.get("price"))
+                normalized_stage_prices.append({"stage": stage_num, "price": stage_price})
+            except Exception:
+                continue
+        if normalized_stage_prices:
+            response["stage_prices"] = normalized_stage_prices
+
+    # Pass through applied stage bundles (e.g., new construction stage packages)
+    if isinstance(result.get("bundles"), list):
+        normalized_bundles: List[Dict[str, Any]] = []
+        for item in result["bundles"]:
+            try:
+                normalized_bundles.append({"name": str(item["name"]), "discount": int(item["discount"])})
+            except Exception:
+                continue
+        if normalized_bundles:
+            response["bundles"] = normalized_bundles
+            response["bundle_discount"] = sum(item["discount"] for item in normalized_bundles)
+
+    # Pass through addons if provided by the calculator
+    if isinstance(result.get("addons"), list):
+        normalized_addons: List[Dict[str, Any]] = []
+        for item in result["addons"]:
+            try:
+                addon_name = str(item.get("name", ""))
+                # The addon breakdown uses 'cost' field, map it to 'price' for the response
+                addon_price = int(item.get("cost", 0) or item.get("price", 0))
+                if addon_name:  # Only include addons with valid names
+                    normalized_addons.append({"name": addon_name, "price": addon_price})
+            except Exception:
+                continue
+        if normalized_addons:
+            response["addons"] = normalized_addons
+
+    # Pass through addons_total if provided by the calculator
+    if "addons_total" in result:
+        try:
+            response["addons_total"] = int(result["addons_total"])
+        except Exception:
+            pass
+
+    # Pass through service-provided note if any; final decision done in route handler
+    svc_note = result.get("note")
+    if isinstance(svc_note, str) and svc_note.strip():
+        response["note"] = svc_note
+
+    return response
+
+
+# Legacy/typo parameter keys -> (current key, keys that take precedence over this alias).
+# An alias is only renamed when none of its preempting keys is present in the payload;
+# otherwise it is passed through untouched.
+PARAM_ALIASES: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    # Consolidate to 'levels' as the canonical key (no support for extra_levels/extra_level)
+    "number_of_levels": ("levels", ("levels",)),
+    "level": ("levels", ("levels", "number_of_levels")),
+    # Normalize alias for owner neighbor access key
+    "owner_inspection_arranging_to_access_neighbors": ("owner_access_neighbors", ("owner_access_neighbors",)),
+    # Accept common typo for granny flat
+    "granny_flate": ("granny_flat", ("granny_flat",)),
+    # Backward compat: video_23 -> video
+    "video_23": ("video", ("video",)),
+    # Normalize property category key aliases/typos
+    "usage_type": ("property_category", ("property_category",)),
+    "property_usage": ("property_category", ("property_category", "usage_type")),
+    "propert_usage": ("property_category", ("property_category", "usage_type", "property_usage")),
+    # Accept Swimming_pool as alias for swimming_pool param
+    "Swimming_pool": ("swimming_pool", ("swimming_pool",)),
+}
+
+
+def normalize_params(params: Dict[str, Any], schema: ServiceSchema) -> Dict[str, Any]:
+    """Normalize and validate request parameters for one service in a single pass.
+
+    - Rename legacy keys to current naming (see `PARAM_ALIASES`)
+    - Coerce every parameter the service's calculate() declares according to its
+      schema: 'yes'/'no' and 'true'/'false' strings to booleans, numeric strings to
+      ints, stage lists to lists of ints
+    - Treat null values as omitted so the service default applies
+
+    Raises ValueError when a value cannot be coerced or a required parameter is missing.
+    """
+    normalized = coerce_params(params, schema)
+    schema.check_required(normalized)
+    return normalized
+
+
+def coerce_params(params: Dict[str, Any], schema: ServiceSchema) -> Dict[str, Any]:
+    """`normalize_params` without the required-parameter check (used for session deltas)."""
+    coercers = schema.coercers
+    normalized: Dict[str, Any] = {}
+    for key, value in params.items():
+        alias = PARAM_ALIASES.get(key)
+        if alias is not None:
+            target, preempted_by = alias
+            if not any(k in params for k in preempted_by):
+                key = target
+
+        if value is None:
+            continue
+        coercer = coercers.get(key)
+        if coercer is not None:
+            value = coercer(key, value)
+        normalized[key] = value
+    return normalized
+
+
+class Engine:
+    """One engine's services: the specs under `directory`, their aliases and static notes."""
+
+    def __init__(self, directory: Path, aliases: Mapping[str, str], notes: Mapping[str, str]) -> None:
+        self.directory = directory
+        self.aliases = dict(aliases)
+        self.notes = dict(notes)
+        self._registry: Optional[ServiceRegistry] = None
+
+    def registry(self) -> ServiceRegistry:
+        """The engine's service registry, built on first use."""
+        if self._registry is None:
+            from .registry import ServiceRegistry
+
+            self._registry = ServiceRegistry(self.directory, self.aliases)
+        return self._registry
+
+    def get_service(self, service_name: str) -> ServiceEntry:
+        """Resolve any accepted service name or alias to its canonical registry entry."""
+        if not service_name or "/" in service_name or service_name.startswith("."):
+            raise QuoteError(400, "Invalid service name")
+        services = self.registry()
+        from .registry import ServiceLoadError, UnknownServiceError
+
+        try:
+            return services.get(service_name)
+        except UnknownServiceError:
+            raise QuoteError(404, "Service not found")
+        except ServiceLoadError as exc:
+            raise QuoteError(500, str(exc))
+
+    def with_note(self, entry: ServiceEntry, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Set the response note: the service's own, else its static one."""
+        note_from_service = result.get("note")
+        if isinstance(note_from_service, str) and note_from_service.strip():
+            result_note = note_from_service
+        else:
+            result_note = self.notes.get(entry.name, "this is a test note")
+        result["note"] = result_note
+        return result
+
+    def capture(self, services: Optional[Iterable[str]] = None) -> pricing.PricingSnapshot:
+        """Fetch pricing once for the given services (default: every service) into a snapshot."""
+        if services is None:
+            modules = {name: entry.module for name, entry in self.registry().load_all().items()}
+        else:
+            entries = [self.get_service(service) for service in services]
+            modules = {entry.name: entry.module for entry in entries}
+        try:
+            return pricing.capture_snapshot(modules)
+        except ValueError as exc:
+            raise QuoteError(400, str(exc)) from exc
+
+    def resolve(self, payload: Dict[str, Any]) -> Tuple[ServiceEntry, Dict[str, Any]]:
+        """Pop an estimate payload's 'service' and return its entry with the normalized params."""
+        service = payload.pop("service", None)
+        if not service:
+            raise QuoteError(400, "Missing required 'service' in payload")
+        if not isinstance(service, str):
+            raise QuoteError(422, "'service' must be a string")
+
+        # Every alias resolves to one canonical entry sharing a single loaded module
+        entry = self.get_service(service)
+        # Validate and coerce against the service's schema before any pricing work
+        try:
+            normalized_params = normalize_params(payload, entry.schema)
+        except ValueError as exc:
+            raise QuoteError(400, str(exc)) from None
+        return entry, normalized_params
+
+    def quote_rows(self, entry: ServiceEntry, rows: Sequence[Dict[str, Any]]) -> List[Any]:
+        """Price normalized params for one service; items are response dicts or QuoteErrors.
+
+        Spec-defined services price all rows in one vectorized pass (`calculate_batch`)
+        against one pricing fetch; other modules are called row by row.
+        """
+        calculate_batch = getattr(entry.module, "calculate_batch", None)
+        results: List[Any] = []
+        if calculate_batch is None:
+            for normalized_params in rows:
+                try:
+                    results.append(self.with_note(entry, run_calculation(entry, normalized_params)))
+                except QuoteError as exc:
+                    results.append(exc)
+            return results
+        for outcome in calculate_batch(rows):
+            if isinstance(outcome, Exception):
+                results.append(calculation_error(outcome))
+                continue
+            try:
+                results.append(self.with_note(entry, service_response(outcome)))
+            except QuoteError as exc:
+                results.append(exc)
+        return results
+
+    def quote_batch(
+        self,
+        payloads: Sequence[Dict[str, Any]],
+        snapshot: Optional[pricing.PricingSnapshot] = None,
+        at: Optional[float] = None,
+    ) -> List[Any]:
+        """Price many estimate payloads (each including its 'service' key) at once.
+
+        Payloads are grouped per service and pricing zone and each group is priced by
+        `quote_rows`. Each item is the response dict for that payload, or the
+        QuoteError it failed with. `snapshot` and `at` are as for `quote`.
+        """
+        results: List[Any] = [None] * len(payloads)
+        groups: Dict[Tuple[str, Optional[str]], Tuple[ServiceEntry, Any, List[Tuple[int, Dict[str, Any]]]]] = {}
+        for index, payload in enumerate(payloads):
+            try:
+                entry, normalized_params = self.resolve(payload)
+            except QuoteError as exc:
+                results[index] = exc
+                continue
+            postcode = normalized_params.get("postcode")
+            zone = pricing.zone_for(postcode)
+            zone_id = zone.id if zone is not None and zone.overrides_for(entry.name) is not None else None
+            # Rows of one group share a zone, so any of their postcodes prices them all
+            group = groups.setdefault((entry.name, zone_id), (entry, postcode, []))
+            group[2].append((index, normalized_params))
+
+        with pricing.using(snapshot, at=at):
+            for (_, zone_id), (entry, postcode, pending) in groups.items():
+                with pricing.located(postcode):
+                    outcomes = self.quote_rows(entry, [normalized_params for _, normalized_params in pending])
+                for (index, _), outcome in zip(pending, outcomes):
+                    if zone_id is not None and not isinstance(outcome, QuoteError):
+                        outcome["zone"] = zone_id
+                    results[index] = outcome
+        return results
+
+    def quote(
+        self,
+        service: str,
+        params: Mapping[str, Any],
+        snapshot: Optional[pricing.PricingSnapshot] = None,
+        at: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Price one quote of `service` and return its response dict.
+
+        `snapshot` pins the pricing (see `capture`); None fetches pricing live. `at`
+        is the quote date (epoch seconds) for scheduled pricing; None means now.
+        Raises QuoteError when the service is unknown or the params are invalid.
+        """
+        entry = self.get_service(service)
+        try:
+            normalized_params = normalize_params(dict(params), entry.schema)
+        except ValueError as exc:
+            raise QuoteError(400, str(exc)) from None
+        with pricing.using(snapshot, at=at, postcode=normalized_params.get("postcode")):
+            result = self.with_note(entry, run_calculation(entry, normalized_params))
+            zone = pricing.located_zone()
+            if zone is not None and zone.overrides_for(entry.name) is not None:
+                result["zone"] = zone.id
+        return result
+
+    def main(self, argv: Optional[List[str]] = None) -> int:
+        """Command line: price one quote given as `SERVICE '{"param": value, ...}'`."""
+        import argparse
+
+        from . import codec
+
+        parser = argparse.ArgumentParser(description="Price one quote without the web app.")
+        parser.add_argument("service")
+        parser.add_argument("params", nargs="?", default="{}", help="JSON object of quote params")
+        args = parser.parse_args(argv)
+        try:
+            params = codec.loads(args.params)
+        except ValueError:
+            parser.error("params must be a JSON object")
+        if not isinstance(params, dict):
+            parser.error("params must be a JSON object")
+        configure_from_env()
+        try:
+            result = self.quote(args.service, params)
+        except QuoteError as exc:
+            print(f"error {exc.status}: {exc.detail}", file=sys.stderr)
+            return 1
+        print(codec.dumps(result).decode("utf-8"))
+        return 0
+
+
+def configure_from_env() -> None:
+    """Install the pricing schedule, experiments and zones named by the environment, and load the
+    inspector bases, as the app does."""
+    from . import experiments, schedule, travel, zones
+
+    pricing.set_schedule(schedule.from_env())
+    pricing.set_experiments(experiments.from_env())
+    pricing.set_zones(zones.from_env())
+    travel.current()
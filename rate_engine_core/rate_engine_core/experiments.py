@@ -0,0 +1,156 @@
+"""Deterministic A/B pricing experiments.
+
+An experiments file (`RATE_ENGINE_EXPERIMENTS`) defines at most one live
+experiment per service:
+
+    {"experiments": [
+      {"id": "pp-base-2026q4", "service": "pre_purchase",
+       "variants": [
+         {"id": "control", "weight": 50},
+         {"id": "base_480", "weight": 50, "fields": {"base_price": 480}}
+       ]}
+    ]}
+
+A quote that carries a subject (a customer id, or the session id of a live
+quote session) is assigned to a variant by hashing the experiment id with the
+subject. The hash picks a point in the cumulative variant weights, so the same
+subject always gets the same variant and changing the experiment id reshuffles
+everyone. A variant's `fields` override the service's pricing config like a
+schedule window does (see `pricing.ConfigOverrides`). Each variant's config
+is therefore built and compiled once. A quote pays for one hash and one
+bisect, and only the first time its subject is seen. Quotes without a subject
+are not enrolled.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from bisect import bisect_right
+from itertools import accumulate
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional
+
+from . import pricing
+from .reloading import ReloadingFile
+
+
+# Assignments remembered per experiment before the cache starts over
+_ASSIGNMENT_CACHE_SIZE = 4096
+
+
+class ExperimentError(ValueError):
+    """Raised for malformed experiment definitions."""
+
+
+class Variant:
+    def __init__(self, experiment: str, variant_id: str, overrides: Optional[pricing.ConfigOverrides]) -> None:
+        self.experiment = experiment
+        self.id = variant_id
+        # None for a variant priced with the service's own config (e.g. the control)
+        self.overrides = overrides
+
+
+class Experiment:
+    def __init__(self, experiment_id: str, service: str, variants: List[Variant], weights: List[int]) -> None:
+        self.id = experiment_id
+        self.service = service
+        self.variants = variants
+        self._bounds = list(accumulate(weights))
+        self._salt = f"{experiment_id}:".encode("utf-8")
+        # Recent subjects -> variant; a quote consults its assignment several times
+        self._assigned: Dict[str, Variant] = {}
+
+    def assign(self, subject: str) -> Variant:
+        """The variant for `subject`; stable for as long as the experiment id and weights are."""
+        variant = self._assigned.get(subject)
+        if variant is None:
+            digest = hashlib.blake2b(self._salt + subject.encode("utf-8"), digest_size=8).digest()
+            point = int.from_bytes(digest, "big") % self._bounds[-1]
+            variant = self.variants[bisect_right(self._bounds, point)]
+            if len(self._assigned) >= _ASSIGNMENT_CACHE_SIZE:
+                self._assigned.clear()
+            self._assigned[subject] = variant
+        return variant
+
+
+class Experiments:
+    """Live experiments by service."""
+
+    def __init__(self, experiments: List[Experiment]) -> None:
+        self._by_service: Dict[str, Experiment] = {}
+        for experiment in experiments:
+            if experiment.service in self._by_service:
+                raise ExperimentError(f"Service '{experiment.service}' has more than one experiment")
+            self._by_service[experiment.service] = experiment
+
+    def assign(self, service: str, subject: str) -> Optional[Variant]:
+        experiment = self._by_service.get(service)
+        return None if experiment is None else experiment.assign(subject)
+
+    def overlay_count(self, service: str) -> int:
+        """Number of variants of `service`'s experiment that override its pricing."""
+        experiment = self._by_service.get(service)
+        if experiment is None:
+            return 0
+        return sum(1 for variant in experiment.variants if variant.overrides is not None)
+
+
+def _experiment(item: Any) -> Experiment:
+    if not isinstance(item, Mapping):
+        raise ExperimentError("Each experiment must be an object")
+    experiment_id, service, variants = item.get("id"), item.get("service"), item.get("variants")
+    if not isinstance(experiment_id, str) or not experiment_id or not isinstance(service, str) or not service:
+        raise ExperimentError("Each experiment needs an 'id' and a 'service'")
+    if not isinstance(variants, list) or len(variants) < 2:
+        raise ExperimentError(f"Experiment '{experiment_id}' needs at least two variants")
+
+    parsed: List[Variant] = []
+    weights: List[int] = []
+    for variant in variants:
+        variant_id = variant.get("id") if isinstance(variant, Mapping) else None
+        weight = variant.get("weight", 1) if isinstance(variant, Mapping) else None
+        fields = variant.get("fields") if isinstance(variant, Mapping) else None
+        if not isinstance(variant_id, str) or not variant_id:
+            raise ExperimentError(f"Experiment '{experiment_id}' has a variant without an 'id'")
+        if not isinstance(weight, int) or isinstance(weight, bool) or weight <= 0:
+            raise ExperimentError(f"Variant '{variant_id}' of '{experiment_id}' needs a positive integer 'weight'")
+        if fields is not None and not isinstance(fields, Mapping):
+            raise ExperimentError(f"Variant '{variant_id}' of '{experiment_id}' has invalid 'fields'")
+        overrides = pricing.ConfigOverrides(service, fields) if fields else None
+        parsed.append(Variant(experiment_id, variant_id, overrides))
+        weights.append(weight)
+    if len({variant.id for variant in parsed}) != len(parsed):
+        raise ExperimentError(f"Experiment '{experiment_id}' has duplicate variant ids")
+    return Experiment(experiment_id, service, parsed, weights)
+
+
+def load(path: Path) -> Experiments:
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        raise ExperimentError(f"Unable to read experiments {path}: {exc}") from exc
+    experiments = payload.get("experiments") if isinstance(payload, dict) else None
+    if not isinstance(experiments, list):
+        raise ExperimentError("Experiments file must be an object with an 'experiments' list")
+    return Experiments([_experiment(item) for item in experiments])
+
+
+class ExperimentsFile(ReloadingFile[Experiments]):
+    """An experiments file, reloaded when it changes."""
+
+    def __init__(self, path: Path, interval: float = 5.0) -> None:
+        super().__init__(path, load, Experiments([]), interval)
+
+    def assign(self, service: str, subject: str) -> Optional[Variant]:
+        return self.current().assign(service, subject)
+
+    def overlay_count(self, service: str) -> int:
+        return self.current().overlay_count(service)
+
+
+def from_env() -> Optional[ExperimentsFile]:
+    """The experiments named by RATE_ENGINE_EXPERIMENTS, or None when it is unset."""
+    path = os.getenv("RATE_ENGINE_EXPERIMENTS")
+    return ExperimentsFile(Path(path)) if path else None
@@ -0,0 +1,118 @@
+"""Cartesian price grids for price tables and what-if sweeps.
+
+A grid request names a service, fixed params and a list of values (or an
+inclusive `{"start", "stop", "step"}` range) per swept dimension. Every
+combination of dimension values is one cell. The route prices the cells in
+blocks through the service's vectorized kernel against one pricing snapshot,
+and the helpers here stream the cells out as JSON or CSV.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import itertools
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Sequence, Tuple
+
+from . import codec
+
+
+# Outcome of one cell: the priced response body, or (status, detail) when it failed
+Cell = Tuple[Tuple[Any, ...], Any]
+
+# Streamed output is flushed in chunks of roughly this size
+_CHUNK_BYTES = 65536
+
+
+class GridError(ValueError):
+    """Raised for malformed dimensions or grids over the cell limit."""
+
+
+def _values(name: str, spec: Any) -> Sequence[Any]:
+    """A dimension's values; a range stays a lazy `range` until the grid size is checked."""
+    if isinstance(spec, list):
+        values = spec
+    elif isinstance(spec, Mapping):
+        try:
+            start, stop, step = spec["start"], spec["stop"], spec.get("step", 1)
+        except KeyError:
+            raise GridError(f"Range for '{name}' needs 'start' and 'stop'") from None
+        if not all(isinstance(v, int) and not isinstance(v, bool) for v in (start, stop, step)) or step <= 0:
+            raise GridError(f"Range for '{name}' must use integers with a positive 'step'")
+        values = range(start, stop + 1, step)
+    else:
+        raise GridError(f"Dimension '{name}' must be a list of values or a start/stop range")
+    if not _count(values):
+        raise GridError(f"Dimension '{name}' has no values")
+    return values
+
+
+def _count(values: Sequence[Any]) -> int:
+    if isinstance(values, range):
+        # len() of a range is capped at sys.maxsize; count it arithmetically (step is positive)
+        return max(0, (values.stop - values.start + values.step - 1) // values.step)
+    return len(values)
+
+
+def expand(dimensions: Mapping[str, Any], max_cells: int) -> List[Tuple[str, List[Any]]]:
+    """Resolve every dimension to its value list; raises GridError past `max_cells` cells."""
+    if not dimensions:
+        raise GridError("At least one dimension is required")
+    resolved = [(name, _values(name, spec)) for name, spec in dimensions.items()]
+    count = 1
+    for _, values in resolved:
+        count *= _count(values)
+    if count > max_cells:
+        raise GridError(f"Grid has {count} cells; at most {max_cells} are allowed")
+    return [(name, list(values)) for name, values in resolved]
+
+
+def combinations(expanded: Sequence[Tuple[str, Sequence[Any]]]) -> Iterator[Tuple[Any, ...]]:
+    """Cell coordinates in row-major order (the last dimension varies fastest)."""
+    return itertools.product(*(values for _, values in expanded))
+
+
+def json_chunks(header: Dict[str, Any], names: Sequence[str], cells: Iterable[Cell]) -> Iterator[bytes]:
+    """Stream `{...header, "cells": [{"params": {...}, ...result} | {"params", "error"}]}`."""
+    chunk = bytearray(codec.dumps(header)[:-1] + b',"cells":[')
+    separator = b""
+    for values, outcome in cells:
+        cell: Dict[str, Any] = {"params": dict(zip(names, values))}
+        if isinstance(outcome, tuple):
+            cell["error"] = {"status": outcome[0], "detail": outcome[1]}
+        else:
+            cell.update(outcome)
+        chunk += separator + codec.dumps(cell)
+        separator = b","
+        if len(chunk) >= _CHUNK_BYTES:
+            yield bytes(chunk)
+            chunk.clear()
+    yield bytes(chunk + b"]}")
+
+
+def csv_chunks(names: Sequence[str], fields: Sequence[str], cells: Iterable[Cell]) -> Iterator[bytes]:
+    """Stream one CSV row per cell: dimension values, result fields, then 'error'.
+
+    List-valued fields (stage and addon breakdowns) are written as JSON. A
+    dimension named like a result field gets a 'param.' prefix in the header.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    columns = [f"param.{name}" if name in fields or name == "error" else name for name in names]
+    writer.writerow([*columns, *fields, "error"])
+    for values, outcome in cells:
+        if isinstance(outcome, tuple):
+            writer.writerow([*values, *([""] * len(fields)), outcome[1]])
+        else:
+            row = []
+            for field in fields:
+                value = outcome.get(field)
+                if isinstance(value, (list, dict)):
+                    value = codec.dumps(value).decode("utf-8")
+                row.append("" if value is None else value)
+            writer.writerow([*values, *row, ""])
+        if buffer.tell() >= _CHUNK_BYTES:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
@@ -0,0 +1,133 @@
+"""Idempotency-Key support for the estimate endpoint.
+
+The first successful response for a key is stored together with a
+fingerprint of the request body; a retry with the same key and body replays
+the stored bytes without recomputing the quote. The in-process store is
+bounded (LRU) with a TTL. It is only correct with a single worker: behind
+preforked workers, a retry that lands on another worker is priced again. Set
+`RATE_ENGINE_IDEMPOTENCY_REDIS_URL` to share replays across workers and
+instances through Redis instead.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+MAX_KEY_LENGTH = 255
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    fingerprint: str
+    body: bytes
+
+
+def fingerprint(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+def validate_key(key: str) -> str:
+    """Return the stripped key; raises ValueError when it is empty or too long."""
+    key = key.strip()
+    if not key:
+        raise ValueError("Idempotency-Key must not be empty")
+    if len(key) > MAX_KEY_LENGTH:
+        raise ValueError(f"Idempotency-Key must be at most {MAX_KEY_LENGTH} characters")
+    return key
+
+
+class IdempotencyStore(ABC):
+    """Idempotency store; lookups and writes must never raise."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[StoredResponse]:
+        """The response stored for `key`, or None."""
+
+    @abstractmethod
+    def put(self, key: str, response: StoredResponse) -> None:
+        """Store `response` for `key`."""
+
+
+class MemoryIdempotencyStore(IdempotencyStore):
+    """Process-local store holding at most `max_entries` responses for `ttl` seconds (single worker only)."""
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 600.0) -> None:
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[str, Tuple[float, StoredResponse]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[StoredResponse]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            expires_at, response = item
+            if expires_at <= time.monotonic():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return response
+
+    def put(self, key: str, response: StoredResponse) -> None:
+        with self._lock:
+            self._items[key] = (time.monotonic() + self._ttl, response)
+            self._items.move_to_end(key)
+            while len(self._items) > self._max_entries:
+                self._items.popitem(last=False)
+
+
+class RedisIdempotencyStore(IdempotencyStore):
+    """Store shared through Redis; entries expire server-side after `ttl` seconds.
+
+    Redis errors are logged and treated as a miss so a Redis outage only costs
+    recomputation, never a failed quote.
+    """
+
+    def __init__(self, url: str, ttl: float = 600.0, prefix: str = "rate-engine:idempotency:") -> None:
+        try:
+            import redis
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError("RATE_ENGINE_IDEMPOTENCY_REDIS_URL is set but the 'redis' package is not installed") from exc
+        self._client = redis.Redis.from_url(url)
+        self._ttl = max(1, int(ttl))
+        self._prefix = prefix
+
+    def get(self, key: str) -> Optional[StoredResponse]:
+        try:
+            raw = self._client.get(self._prefix + key)
+        except Exception:
+            logger.exception("Idempotency lookup failed")
+            return None
+        if not raw:
+            return None
+        digest, _, body = raw.partition(b"\n")
+        return StoredResponse(fingerprint=digest.decode("ascii"), body=body)
+
+    def put(self, key: str, response: StoredResponse) -> None:
+        value = response.fingerprint.encode("ascii") + b"\n" + response.body
+        try:
+            # NX keeps the first stored response if two retries race
+            self._client.set(self._prefix + key, value, ex=self._ttl, nx=True)
+        except Exception:
+            logger.exception("Idempotency write failed")
+
+
+def store_from_env() -> IdempotencyStore:
+    ttl = float(os.getenv("RATE_ENGINE_IDEMPOTENCY_TTL") or 600)
+    redis_url = os.getenv("RATE_ENGINE_IDEMPOTENCY_REDIS_URL")
+    if redis_url:
+        return RedisIdempotencyStore(redis_url, ttl=ttl)
+    max_entries = int(os.getenv("RATE_ENGINE_IDEMPOTENCY_MAX_ENTRIES") or 10000)
+    return MemoryIdempotencyStore(max_entries=max_entries, ttl=ttl)
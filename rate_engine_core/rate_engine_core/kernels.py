@@ -0,0 +1,378 @@
+"""Vectorized batch kernels for spec-defined services.
+
+`rules.ServiceRules` prices one quote per call. Batch paths (bulk repricing
+and the like) compile the same spec here into a kernel that prices a whole
+column of prepared params with NumPy. Every charge, stage sum, addon total and
+the GST/discount tail is one array expression over all rows, so there is no
+Python-level branching per quote; only the result dicts are assembled per row.
+
+Kernels must match scalar `calculate()` exactly. The formulas run in int64,
+and addons, GST and discounts use the integer-cents arithmetic of `money.py`
+with the same rounding points as the scalar path. Batches holding values int64
+cannot price exactly raise `UnsupportedBatch`, and the caller then falls back
+to the scalar evaluator. `tests/test_kernels.py` asserts that parity for
+every service spec of both engines.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import money, rules
+
+
+Params = Dict[str, Any]
+Config = Dict[str, Any]
+VectorCharge = Callable[["Columns"], Any]
+
+# Inputs at or beyond this magnitude could overflow int64 once multiplied by a price
+_LIMIT = 1 << 31
+# Largest cent magnitude whose products stay clear of int64 overflow
+_MAX_CENTS = 1 << 62
+
+
+class UnsupportedBatch(Exception):
+    """Raised when a batch holds values the int64 kernels cannot price exactly."""
+
+
+class Columns:
+    """Column view of a list of prepared params, materialized per param on first use."""
+
+    def __init__(self, rows: Sequence[Params]) -> None:
+        self.rows = rows
+        self.size = len(rows)
+        self._columns: Dict[str, np.ndarray] = {}
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        column = self._columns.get(name)
+        if column is None:
+            try:
+                column = np.array([p[name] for p in self.rows])
+            except (OverflowError, ValueError) as exc:
+                raise UnsupportedBatch(name) from exc
+            # Only bools and ints are priced vectorially; anything else goes through the scalar path
+            if column.dtype.kind not in "biu" or column.ndim != 1:
+                raise UnsupportedBatch(name)
+            column = column.astype(np.int64)
+            if column.size and np.abs(column).max() >= _LIMIT:
+                raise UnsupportedBatch(name)
+            self._columns[name] = column
+        return column
+
+    def stage_mask(self, name: str, max_stage: int) -> np.ndarray:
+        """Boolean matrix with mask[row, stage] set for every selected stage."""
+        mask = np.zeros((self.size, max_stage + 1), dtype=bool)
+        try:
+            for row, p in enumerate(self.rows):
+                mask[row, p[name]] = True
+        except (IndexError, TypeError) as exc:
+            raise UnsupportedBatch(name) from exc
+        return mask
+
+
+def _to_int(values: Any) -> np.ndarray:
+    # int() truncates toward zero; integer arrays are already exact
+    values = np.asarray(values)
+    if values.dtype.kind == "f":
+        return np.trunc(values).astype(np.int64)
+    return values
+
+
+def _column_of(value: Any, size: int) -> np.ndarray:
+    return np.broadcast_to(np.asarray(value), (size,))
+
+
+# --- Charges ---------------------------------------------------------------
+
+
+def _compile_charge(charge: Dict[str, Any], cfg: Config) -> VectorCharge:
+    """Vector counterpart of `rules._compile_charge`; returns cols -> amounts."""
+    if "fixed" in charge:
+        amount = cfg[charge["fixed"]]
+        return lambda cols: amount
+
+    if "flag" in charge:
+        names, amount = tuple(charge["flag"]), cfg[charge["price"]]
+
+        def flag(cols: Columns) -> np.ndarray:
+            selected = np.zeros(cols.size, dtype=bool)
+            for name in names:
+                selected |= cols[name] != 0
+            return np.where(selected, amount, 0)
+
+        return flag
+
+    if "steps" in charge:
+        name, size, unit = charge["steps"], charge.get("size", 1), cfg[charge["price"]]
+        over = charge.get("over", 0)
+        over = cfg[over] if isinstance(over, str) else over
+
+        def steps(cols: Columns) -> np.ndarray:
+            extra = cols[name] - over
+            # -(-a // b) is ceil(a / b) for ints, as in rules._ceil_div
+            return np.where(extra > 0, -(-extra // size) * unit, 0)
+
+        return steps
+
+    if "rooms" in charge:
+        included = charge.get("included", 0)
+        if charge["rooms"] == "combined":
+            unit = next((cfg.get(key) for key in charge["unit"] if cfg.get(key)), 0)
+
+            def combined(cols: Columns) -> np.ndarray:
+                rooms = np.maximum(0, cols["bedrooms"]) + np.maximum(0, cols["bathrooms"])
+                return np.maximum(0, rooms - included) * unit
+
+            return combined
+
+        if charge["rooms"] == "split":
+            bedroom_unit = cfg.get(charge["bedroom"], 0)
+            bathroom_unit = cfg.get(charge["bathroom"], 0)
+            bedrooms_first = bedroom_unit >= bathroom_unit
+
+            def split(cols: Columns) -> np.ndarray:
+                bedrooms = np.maximum(0, cols["bedrooms"])
+                bathrooms = np.maximum(0, cols["bathrooms"])
+                if bedrooms_first:
+                    free = np.minimum(bedrooms, included)
+                    bedrooms = bedrooms - free
+                    bathrooms = bathrooms - np.minimum(bathrooms, included - free)
+                else:
+                    free = np.minimum(bathrooms, included)
+                    bathrooms = bathrooms - free
+                    bedrooms = bedrooms - np.minimum(bedrooms, included - free)
+                return bedrooms * bedroom_unit + bathrooms * bathroom_unit
+
+            return split
+
+    if "addon_rate" in charge:
+        from . import addons
+
+        name = charge["quantity"]
+        rate_cents = addons.ADDON_PRICE_CENTS.get(charge["addon_rate"]) or 0
+        return lambda cols: money.to_dollars_array(rate_cents * cols[name])
+
+    raise rules.SpecError(f"Unknown charge {sorted(charge)}")
+
+
+def _sum_charges(charges: Sequence[VectorCharge]) -> VectorCharge:
+    if not charges:
+        return lambda cols: 0
+    if len(charges) == 1:
+        return charges[0]
+
+    def total(cols: Columns) -> Any:
+        amount = 0
+        for charge in charges:
+            amount = amount + charge(cols)
+        return amount
+
+    return total
+
+
+# --- Bodies ----------------------------------------------------------------
+
+# (stage param, {stage: per-row stage prices}, per-row applied bundles or None)
+Staged = Tuple[str, Dict[int, List[int]], Optional[List[List[Dict[str, Any]]]]]
+BodyKernel = Callable[[Columns], Tuple[np.ndarray, Optional[Staged]]]
+
+
+def _compile_body(body: rules._Body, cfg: Config) -> BodyKernel:
+    """Vector counterpart of `rules._Body.compile`.
+
+    Returns cols -> (quote amounts, None) or, for staged bodies,
+    (quote amounts, (stage param, {stage: per-row stage prices}, per-row bundles)).
+    """
+    charges = _sum_charges([_compile_charge(charge, cfg) for charge in body.charges])
+    stages = body.stages
+    if stages is None:
+        return lambda cols: (_column_of(charges(cols), cols.size), None)
+
+    param = stages.get("param", "stages")
+    base = {int(stage): cfg[key] for stage, key in stages["prices"].items()}
+    each = _sum_charges([_compile_charge(charge, cfg) for charge in stages.get("each", ())])
+    extra = {
+        int(stage): _sum_charges([_compile_charge(charge, cfg) for charge in stage_charges])
+        for stage, stage_charges in stages.get("extra", {}).items()
+    }
+    hours = {int(stage): name for stage, name in stages.get("hours", {}).items()}
+    quote_stage = stages.get("quote_stage")
+    fixed_quote = int(base[quote_stage]) if quote_stage is not None else None
+    max_stage = max(base)
+    bundles = rules.bundle_table(body.bundles, base, cfg) if body.bundles else None
+    if bundles is not None:
+        bundle_discounts = np.array([discount for discount, _ in bundles])
+        stage_bits = 1 << np.arange(max_stage + 1, dtype=np.int64)
+
+    def evaluate(cols: Columns) -> Tuple[np.ndarray, Optional[Staged]]:
+        mask = cols.stage_mask(param, max_stage)
+        shared = each(cols)
+        stage_prices: Dict[int, List[int]] = {}
+        stages_total: Any = 0
+        for stage, base_price in base.items():
+            price = base_price + shared
+            if stage in extra:
+                price = price + extra[stage](cols)
+            if stage in hours:
+                price = price * cols[hours[stage]]
+            price = _to_int(_column_of(price, cols.size))
+            stage_prices[stage] = price.tolist()
+            if fixed_quote is None:
+                stages_total = stages_total + np.where(mask[:, stage], price, 0)
+        if fixed_quote is not None:
+            stages_total = fixed_quote
+        amounts = _column_of(charges(cols) + stages_total, cols.size)
+        if bundles is None:
+            return amounts, (param, stage_prices, None)
+        masks = mask.astype(np.int64) @ stage_bits
+        applied = [
+            [{"name": name, "discount": discount} for name, discount in bundles[row_mask][1]]
+            for row_mask in masks.tolist()
+        ]
+        return amounts - bundle_discounts[masks], (param, stage_prices, applied)
+
+    return evaluate
+
+
+# --- Whole-service kernels -------------------------------------------------
+
+
+def _addon_specs(service: rules.ServiceRules) -> List[Tuple[str, float, int]]:
+    """(name, unit price, unit price in cents) of every priced addon the service accepts, in breakdown order."""
+    if not service.addon_params:
+        return []
+    from . import addons
+
+    return [
+        (name, addons.ADDON_PRICES[name], addons.ADDON_PRICE_CENTS[name])
+        for name in service.addon_params
+        if addons.ADDON_PRICES.get(name) is not None
+    ]
+
+
+def _to_cents(amounts: np.ndarray) -> np.ndarray:
+    """Quote amounts in integer cents, exactly as `money.to_cents` converts each one."""
+    if amounts.dtype.kind in "iu":
+        if amounts.size and int(np.abs(amounts).max()) > _MAX_CENTS // money.CENTS_PER_DOLLAR:
+            raise UnsupportedBatch("quote_price")
+        return amounts.astype(np.int64) * money.CENTS_PER_DOLLAR
+    # Fractional amounts round through Decimal, one value at a time
+    try:
+        return np.array([money.to_cents(amount) for amount in amounts.tolist()], dtype=np.int64)
+    except OverflowError as exc:
+        raise UnsupportedBatch("quote_price") from exc
+
+
+def compile_kernel(
+    service: rules.ServiceRules, cfg: Config
+) -> Callable[[Sequence[Params], Sequence[rules._Body]], List[Dict[str, Any]]]:
+    """Compile `service` against `cfg` into rows, bodies -> result dicts.
+
+    Rows must already be prepared (`ServiceRules.prepare`), with the body each
+    one selected.
+    """
+    bodies = {id(body): _compile_body(body, cfg) for body in [service.body, *service.variants.values()]}
+    note = str(cfg.get("note", ""))
+    tax = None
+    if service.gst:
+        from . import tax
+    tax_config = cfg.get("tax")
+    with_addons = bool(service.addons)
+    addon_specs = _addon_specs(service) if with_addons else []
+
+    def run(rows: Sequence[Params], row_bodies: Sequence[rules._Body]) -> List[Dict[str, Any]]:
+        size = len(rows)
+        groups: Dict[int, List[int]] = defaultdict(list)
+        for index, body in enumerate(row_bodies):
+            groups[id(body)].append(index)
+
+        all_columns = Columns(rows)
+        quote_parts = []
+        stage_prices: List[Optional[List[Dict[str, int]]]] = [None] * size
+        bundles: List[Optional[List[Dict[str, Any]]]] = [None] * size
+        for body_id, indexes in groups.items():
+            cols = all_columns if len(groups) == 1 else Columns([rows[index] for index in indexes])
+            amounts, staged = bodies[body_id](cols)
+            quote_parts.append((indexes, amounts))
+            if staged is not None:
+                param, prices, applied = staged
+                for position, index in enumerate(indexes):
+                    stage_prices[index] = [
+                        {"stage": stage, "price": prices[stage][position]} for stage in rows[index][param]
+                    ]
+                    if applied is not None:
+                        bundles[index] = applied[position]
+
+        if len(quote_parts) == 1:
+            quote = quote_parts[0][1]
+        else:
+            quote = np.empty(size, dtype=np.result_type(*(amounts for _, amounts in quote_parts)))
+            for indexes, amounts in quote_parts:
+                quote[indexes] = amounts
+
+        breakdowns: List[List[Dict[str, Any]]] = [[] for _ in range(size)]
+        # Integer cents from here on, with the same rounding as the scalar path (see money.py)
+        quote_cents = _to_cents(quote)
+        addons_cents: Any = None
+        if with_addons:
+            addons_cents = np.zeros(size, dtype=np.int64)
+            for name, price, price_cents in addon_specs:
+                values = all_columns[name]
+                selected = values != 0
+                if name == "out_of_area_travel_surcharge_per_km":
+                    cost_cents = price_cents * values
+                    addons_cents = addons_cents + np.where(selected, cost_cents, 0)
+                    for index in np.flatnonzero(selected).tolist():
+                        cents = int(cost_cents[index])
+                        breakdowns[index].append(
+                            {
+                                "name": name,
+                                "unit_price": price,
+                                "quantity": rows[index][name],
+                                "cost": cents / money.CENTS_PER_DOLLAR,
+                                "cost_cents": cents,
+                            }
+                        )
+                else:
+                    addons_cents = addons_cents + np.where(selected, price_cents, 0)
+                    cost = price_cents / money.CENTS_PER_DOLLAR
+                    for index in np.flatnonzero(selected).tolist():
+                        breakdowns[index].append(
+                            {"name": name, "unit_price": price, "quantity": 1, "cost": cost, "cost_cents": price_cents}
+                        )
+            quote_cents = quote_cents + addons_cents
+
+        columns: Dict[str, List[Any]] = {"quote_price": money.to_dollars_array(quote_cents).tolist()}
+        if tax is not None:
+            if size and int(np.abs(quote_cents).max()) > _MAX_CENTS // max(tax_config.gst_points, 1):
+                raise UnsupportedBatch("quote_price")
+            tax.apply_batch(tax_config, columns, quote_cents, all_columns["discount"])
+        if with_addons:
+            columns["addons_total"] = money.to_dollars_array(addons_cents).tolist()
+
+        results: List[Dict[str, Any]] = []
+        for index in range(size):
+            result: Dict[str, Any] = {}
+            if stage_prices[index] is not None:
+                result["stage_prices"] = stage_prices[index]
+            if bundles[index]:
+                result["bundles"] = bundles[index]
+                result["bundle_discount"] = sum(item["discount"] for item in bundles[index])
+            result["quote_price"] = columns["quote_price"][index]
+            if tax is not None:
+                result["gst"] = columns["gst"][index]
+                result["price_including_gst"] = columns["price_including_gst"][index]
+                result["discount"] = columns["discount"][index]
+                result["payable_price"] = columns["payable_price"][index]
+            if with_addons:
+                result["addons"] = breakdowns[index]
+                result["addons_total"] = columns["addons_total"][index]
+            result["note"] = note
+            results.append(result)
+        return results
+
+    return run
+
@@ -0,0 +1,73 @@
+"""Memoization of priced results for repeated quotes.
+
+Interactive sessions and what-if batches requote the same inputs over and
+over. A result is fully determined by the service module, the pricing config
+it prices against and the normalized params, so it is cached under exactly
+that key. Results are only memoized while a pricing snapshot pins the config;
+live-fetched pricing may change between calls and is never cached.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    # bool and int compare equal; keep them apart so True never reuses a result for 1
+    return (type(value).__name__, value)
+
+
+def copy_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy a result dict deep enough that callers may mutate it (lists of dicts)."""
+    return {
+        key: [dict(item) if isinstance(item, dict) else item for item in value] if isinstance(value, list) else value
+        for key, value in result.items()
+    }
+
+
+class QuoteMemo:
+    """Bounded LRU of results keyed by (service, module version, pricing version, params)."""
+
+    def __init__(self, max_entries: int = 4096) -> None:
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_entries > 0
+
+    def key(
+        self, service: str, module_version: int, pricing_version: Optional[str], params: Dict[str, Any]
+    ) -> Optional[Hashable]:
+        """Cache key for one quote, or None when it must not be memoized."""
+        if not self.enabled or pricing_version is None:
+            return None
+        try:
+            frozen = _freeze(params)
+            hash(frozen)
+        except TypeError:
+            return None
+        return (service, module_version, pricing_version, frozen)
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            result = self._items.get(key)
+            if result is None:
+                return None
+            self._items.move_to_end(key)
+        return copy_result(result)
+
+    def put(self, key: Hashable, result: Dict[str, Any]) -> None:
+        stored = copy_result(result)
+        with self._lock:
+            self._items[key] = stored
+            self._items.move_to_end(key)
+            while len(self._items) > self._max_entries:
+                self._items.popitem(last=False)
@@ -0,0 +1,104 @@
+"""Fixed-point money: amounts as integer cents with explicit rounding.
+
+Configured prices may be fractional dollars (addon rates, per-km surcharges,
+GST percentages). They are converted to integer cents once, when pricing is
+compiled. Quotes, addon totals, GST and discounts are then summed and
+multiplied as integers, and rounded only at two explicit points:
+
+- a percentage of an amount (GST, percentage discounts) is rounded to the
+  cent with `TAX_ROUNDING`;
+- a response amount in whole dollars is rounded with `DOLLAR_ROUNDING`
+  (truncation, as the engine has always reported whole dollars).
+
+The array helpers apply the same integer arithmetic to NumPy int64 columns,
+so the batch kernels produce exactly what the scalar path does.
+"""
+
+from __future__ import annotations
+
+from decimal import ROUND_DOWN, ROUND_HALF_EVEN, ROUND_HALF_UP, Decimal
+from typing import Any
+
+
+CENTS_PER_DOLLAR = 100
+# Percentages are held in basis points (hundredths of a percent)
+BASIS_POINTS_PER_PERCENT = 100
+
+# Rounding modes (the `decimal` module's names)
+DOWN = ROUND_DOWN  # toward zero
+HALF_UP = ROUND_HALF_UP  # nearest, ties away from zero
+HALF_EVEN = ROUND_HALF_EVEN  # nearest, ties to even
+
+TAX_ROUNDING = HALF_UP
+DOLLAR_ROUNDING = DOWN
+
+
+def _round(value: Decimal, rounding: str) -> int:
+    return int(value.quantize(Decimal(1), rounding=rounding))
+
+
+def to_cents(amount: Any, rounding: str = HALF_UP) -> int:
+    """Cents for a dollar amount given as an int, float, str or Decimal."""
+    if isinstance(amount, int):
+        return amount * CENTS_PER_DOLLAR
+    # str() gives a float's shortest round-tripping form, so 1.35 becomes exactly 135 cents
+    return _round(Decimal(str(amount)) * CENTS_PER_DOLLAR, rounding)
+
+
+def to_basis_points(percent: Any) -> int:
+    """Basis points for a percentage, e.g. 12.5 -> 1250."""
+    if isinstance(percent, int):
+        return percent * BASIS_POINTS_PER_PERCENT
+    return _round(Decimal(str(percent)) * BASIS_POINTS_PER_PERCENT, HALF_UP)
+
+
+def divide(numerator: int, denominator: int, rounding: str) -> int:
+    """`numerator / denominator` rounded with `rounding`, in integer arithmetic (denominator > 0)."""
+    quotient, remainder = divmod(abs(numerator), denominator)
+    if remainder and (
+        (rounding == HALF_UP and 2 * remainder >= denominator)
+        or (rounding == HALF_EVEN and (2 * remainder > denominator or (2 * remainder == denominator and quotient % 2)))
+    ):
+        quotient += 1
+    return -quotient if numerator < 0 else quotient
+
+
+def times(cents: int, quantity: Any, rounding: str = HALF_UP) -> int:
+    """Cents for `quantity` units at `cents` each; exact for integer quantities."""
+    if isinstance(quantity, int):
+        return cents * quantity
+    return _round(Decimal(cents) * Decimal(str(quantity)), rounding)
+
+
+def percent_of(cents: int, basis_points: int, rounding: str = TAX_ROUNDING) -> int:
+    """`basis_points` of `cents`, rounded to the cent."""
+    return divide(cents * basis_points, 100 * BASIS_POINTS_PER_PERCENT, rounding)
+
+
+def to_dollars(cents: int, rounding: str = DOLLAR_ROUNDING) -> int:
+    """Whole dollars for a response field."""
+    return divide(cents, CENTS_PER_DOLLAR, rounding)
+
+
+# --- NumPy int64 columns ----------------------------------------------------
+
+
+def divide_array(numerators: Any, denominator: int, rounding: str) -> Any:
+    """Elementwise `divide` over an integer array."""
+    import numpy as np
+
+    magnitude = np.abs(numerators)
+    quotient, remainder = np.divmod(magnitude, denominator)
+    if rounding == HALF_UP:
+        quotient = quotient + (2 * remainder >= denominator)
+    elif rounding == HALF_EVEN:
+        quotient = quotient + ((2 * remainder > denominator) | ((2 * remainder == denominator) & (quotient % 2 == 1)))
+    return np.where(numerators < 0, -quotient, quotient)
+
+
+def percent_of_array(cents: Any, basis_points: int, rounding: str = TAX_ROUNDING) -> Any:
+    return divide_array(cents * basis_points, 100 * BASIS_POINTS_PER_PERCENT, rounding)
+
+
+def to_dollars_array(cents: Any, rounding: str = DOLLAR_ROUNDING) -> Any:
+    return divide_array(cents, CENTS_PER_DOLLAR, rounding)
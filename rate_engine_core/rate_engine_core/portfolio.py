@@ -0,0 +1,95 @@
+"""Portfolio quotes: many properties under one job, priced in one pass.
+
+A builder ordering dilapidation reports for a street of neighbours sends one
+portfolio request instead of one estimate per property. The route prices
+every property through the batch path against one pricing snapshot. This
+module then applies the job's volume discount and totals the lines.
+
+Volume discounts are tiers of `min_properties:percent_off`, read from
+`RATE_ENGINE_PORTFOLIO_DISCOUNTS` (e.g. `"5:5,10:10"`: 5% off from five
+priced properties, 10% from ten). The tier is chosen by the number of
+properties that priced successfully. The percentage comes off each line's
+payable amount (`payable_price` when the service reports one, otherwise
+`quote_price`) in integer cents (see `money.py`).
+"""
+
+from __future__ import annotations
+
+import os
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from . import money
+
+
+class PortfolioError(ValueError):
+    """Raised for malformed volume discount tiers."""
+
+
+class VolumeDiscounts:
+    """Percent-off tiers by minimum property count."""
+
+    def __init__(self, tiers: Sequence[Tuple[int, float]]) -> None:
+        ordered = sorted(tiers)
+        counts = [count for count, _ in ordered]
+        if len(set(counts)) != len(counts):
+            raise PortfolioError("Volume discount tiers must have distinct property counts")
+        self._counts = counts
+        self._percents = [percent for _, percent in ordered]
+
+    def percent_for(self, count: int) -> float:
+        position = bisect_right(self._counts, count) - 1
+        return self._percents[position] if position >= 0 else 0.0
+
+
+def parse_tiers(raw: Optional[str]) -> VolumeDiscounts:
+    """Tiers from `"count:percent,..."`; empty or unset means no volume discount."""
+    tiers: List[Tuple[int, float]] = []
+    for item in (raw or "").split(","):
+        if not item.strip():
+            continue
+        try:
+            count, percent = item.split(":")
+            tier = (int(count), float(percent))
+        except ValueError:
+            raise PortfolioError(f"Invalid volume discount tier '{item.strip()}'; expected 'count:percent'") from None
+        if tier[0] < 1 or not 0 <= tier[1] <= 100:
+            raise PortfolioError(f"Volume discount tier '{item.strip()}' is out of range")
+        tiers.append(tier)
+    return VolumeDiscounts(tiers)
+
+
+def discounts_from_env() -> VolumeDiscounts:
+    return parse_tiers(os.getenv("RATE_ENGINE_PORTFOLIO_DISCOUNTS"))
+
+
+def payable(result: Dict[str, Any]) -> int:
+    """What the customer pays for one property before any volume discount."""
+    amount = result.get("payable_price")
+    return int(result["quote_price"] if amount is None else amount)
+
+
+def apply_volume_discount(discounts: VolumeDiscounts, lines: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Fill each priced line's volume_discount and line_total; returns the job totals.
+
+    Lines carrying an `error` are left as they are and count toward nothing.
+    """
+    priced = [line for line in lines if "error" not in line]
+    percent = discounts.percent_for(len(priced))
+    points = money.to_basis_points(percent)
+    subtotal = discount_total = 0
+    for line in priced:
+        amount = payable(line["quote"])
+        discount = money.to_dollars(money.percent_of(money.to_cents(amount), points)) if points else 0
+        line["volume_discount"] = discount
+        line["line_total"] = amount - discount
+        subtotal += amount
+        discount_total += discount
+    return {
+        "properties": len(lines),
+        "priced": len(priced),
+        "subtotal": subtotal,
+        "volume_discount_percent": percent,
+        "volume_discount": discount_total,
+        "total": subtotal - discount_total,
+    }
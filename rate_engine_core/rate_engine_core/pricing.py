@@ -0,0 +1,335 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from types import ModuleType
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PricingSnapshot:
+    """Pricing configs of every service captured at one point in time.
+
+    `configs` maps a canonical service name to the dict its module's
+    `_fetch_pricing_config()` returned. Configs are shared between calls and
+    must be treated as read-only.
+    """
+
+    configs: Dict[str, Dict[Any, Any]]
+    version: str
+    captured_at: float = field(default_factory=time.time)
+    # Per-service fingerprints, computed on first use
+    _service_versions: Dict[str, str] = field(default_factory=dict, repr=False, compare=False)
+
+    def service_version(self, service: str) -> Optional[str]:
+        """Fingerprint of one service's config, comparable with `used_config_version`."""
+        version = self._service_versions.get(service)
+        if version is None:
+            cfg = self.configs.get(service)
+            if cfg is None:
+                return None
+            version = self._service_versions[service] = _config_fingerprint({service: cfg})
+        return version
+
+
+# Snapshot that bound service modules price against; None means "fetch live"
+_ACTIVE_SNAPSHOT: ContextVar[Optional[PricingSnapshot]] = ContextVar("active_pricing_snapshot", default=None)
+# (service, config) most recently returned by a bound fetcher in this context
+_LAST_USED_CONFIG: ContextVar[Optional[Tuple[str, Dict[Any, Any]]]] = ContextVar("last_used_pricing_config", default=None)
+# Quote date (epoch seconds) that scheduled pricing is resolved for; None means now
+_PRICING_DATE: ContextVar[Optional[float]] = ContextVar("pricing_date", default=None)
+# Customer or session id that experiment variants are assigned by; None means no experiment
+_SUBJECT: ContextVar[Optional[str]] = ContextVar("pricing_subject", default=None)
+# Property postcode that regional pricing zones are resolved by; None means no zone
+_POSTCODE: ContextVar[Optional[Any]] = ContextVar("pricing_postcode", default=None)
+# Effective-dated overrides (a `schedule.ScheduleFile`/`PricingSchedule`); None disables them
+_SCHEDULE: Optional[Any] = None
+# Live pricing experiments (an `experiments.ExperimentsFile`/`Experiments`); None disables them
+_EXPERIMENTS: Optional[Any] = None
+# Regional pricing zones (a `zones.ZonesFile`/`ZoneIndex`); None disables them
+_ZONES: Optional[Any] = None
+
+
+def _config_fingerprint(configs: Mapping[str, Mapping[Any, Any]]) -> str:
+    digest = hashlib.sha256()
+    for service in sorted(configs):
+        # Stage-based configs mix int and str keys, so sort on the string form
+        items = sorted((str(k), repr(v)) for k, v in configs[service].items())
+        digest.update(repr((service, items)).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _unbound_fetcher(module: ModuleType):
+    fetch = getattr(module, "_fetch_pricing_config")
+    return getattr(fetch, "__wrapped__", fetch)
+
+
+def capture_snapshot(modules: Mapping[str, ModuleType]) -> PricingSnapshot:
+    """Fetch pricing once for every given service module.
+
+    Always calls the module's own fetcher, even when the module is bound, so a
+    capture never returns a stale snapshot.
+    """
+    configs: Dict[str, Dict[Any, Any]] = {}
+    for service, module in modules.items():
+        configs[service] = dict(_unbound_fetcher(module)())
+    return PricingSnapshot(configs=configs, version=_config_fingerprint(configs))
+
+
+class ConfigOverrides:
+    """Fields laid over a service's pricing config (a zone overlay, a schedule window, an experiment variant).
+
+    The overridden dict is built once per base config and reused, so evaluators
+    compiled for it stay cached and its fingerprint is computed once.
+    """
+
+    def __init__(self, service: str, fields: Mapping[str, Any]) -> None:
+        self.service = service
+        self.fields = dict(fields)
+        # id(base config) -> (base config, overridden config, its fingerprint). Holding the
+        # base keeps its id from being reused while the entry lives.
+        self._derived: Dict[int, Tuple[Dict[Any, Any], Dict[Any, Any], str]] = {}
+        self._lock = threading.Lock()
+
+    def _resolve(self, cfg: Dict[Any, Any]) -> Tuple[Dict[Any, Any], Dict[Any, Any], str]:
+        cached = self._derived.get(id(cfg))
+        if cached is not None and cached[0] is cfg:
+            return cached
+        derived = {**cfg, **self.fields}
+        cached = (cfg, derived, _config_fingerprint({self.service: derived}))
+        with self._lock:
+            if len(self._derived) >= 8:
+                self._derived.clear()
+            self._derived[id(cfg)] = cached
+        return cached
+
+    def config_for(self, cfg: Dict[Any, Any]) -> Dict[Any, Any]:
+        """`cfg` with the fields applied; the same dict for the same `cfg`."""
+        return self._resolve(cfg)[1]
+
+    def version_for(self, cfg: Dict[Any, Any]) -> str:
+        """Fingerprint of `config_for(cfg)`, as `used_config_version` reports it."""
+        return self._resolve(cfg)[2]
+
+
+def set_schedule(schedule: Optional[Any]) -> None:
+    """Install the effective-dated pricing schedule bound modules apply (None removes it)."""
+    global _SCHEDULE
+    _SCHEDULE = schedule
+
+
+def set_experiments(experiments: Optional[Any]) -> None:
+    """Install the pricing experiments bound modules apply (None removes them)."""
+    global _EXPERIMENTS
+    _EXPERIMENTS = experiments
+
+
+def set_zones(zones: Optional[Any]) -> None:
+    """Install the regional pricing zones bound modules apply (None removes them)."""
+    global _ZONES
+    _ZONES = zones
+
+
+def zone_for(postcode: Any) -> Optional[Any]:
+    """The pricing zone containing `postcode`, if zones are enabled and one does."""
+    if _ZONES is None or postcode is None:
+        return None
+    return _ZONES.zone_for(postcode)
+
+
+def located_zone() -> Optional[Any]:
+    """The pricing zone of the context's postcode, if any."""
+    return zone_for(_POSTCODE.get())
+
+
+def assigned_variant(service: str) -> Optional[Any]:
+    """The experiment variant the context's subject is assigned for `service`, if any."""
+    subject = _SUBJECT.get()
+    if _EXPERIMENTS is None or subject is None:
+        return None
+    return _EXPERIMENTS.assign(service, subject)
+
+
+def overlay_count(service: str) -> int:
+    """Distinct override combinations `service` can be priced under, counting no override.
+
+    Each live zone overlay, schedule window and experiment variant derives its
+    own config from a base config, so this is how many configs per base config
+    can be in use at once.
+    """
+    count = 1
+    for source in (_ZONES, _SCHEDULE, _EXPERIMENTS):
+        if source is not None:
+            count *= 1 + source.overlay_count(service)
+    return count
+
+
+def _overrides_for(service: str) -> Tuple[ConfigOverrides, ...]:
+    """Overrides in effect for `service`: the zone overlay, the schedule window at the pricing date, then the variant."""
+    overrides: Tuple[ConfigOverrides, ...] = ()
+    zone = located_zone()
+    if zone is not None:
+        overlay = zone.overrides_for(service)
+        if overlay is not None:
+            overrides += (overlay,)
+    if _SCHEDULE is not None:
+        when = _PRICING_DATE.get()
+        window = _SCHEDULE.window_for(service, time.time() if when is None else when)
+        if window is not None:
+            overrides += (window.overrides,)
+    variant = assigned_variant(service)
+    if variant is not None and variant.overrides is not None:
+        overrides += (variant.overrides,)
+    return overrides
+
+
+def bind_module(service: str, module: ModuleType) -> None:
+    """Route a service module's pricing lookups through the active snapshot.
+
+    When no snapshot is active (or it has no entry for the service) the
+    module's original fetcher runs, so binding alone changes nothing. The
+    postcode's zone overlay, a schedule window in effect at the pricing date and
+    the subject's experiment variant are applied on top.
+    """
+    original = _unbound_fetcher(module)
+
+    def _fetch_pricing_config():
+        cfg = None
+        snapshot = _ACTIVE_SNAPSHOT.get()
+        if snapshot is not None:
+            cfg = snapshot.configs.get(service)
+        if cfg is None:
+            cfg = original()
+        for overrides in _overrides_for(service):
+            cfg = overrides.config_for(cfg)
+        _LAST_USED_CONFIG.set((service, cfg))
+        return cfg
+
+    _fetch_pricing_config.__wrapped__ = original  # type: ignore[attr-defined]
+    module._fetch_pricing_config = _fetch_pricing_config  # type: ignore[attr-defined]
+
+
+def activate(
+    snapshot: Optional[PricingSnapshot],
+    at: Optional[float] = None,
+    subject: Optional[str] = None,
+    postcode: Optional[Any] = None,
+):
+    """Make `snapshot` (priced at `at`, None meaning now) active for the current context; returns a reset token."""
+    _PRICING_DATE.set(at)
+    _SUBJECT.set(subject)
+    _POSTCODE.set(postcode)
+    return _ACTIVE_SNAPSHOT.set(snapshot)
+
+
+def active_snapshot() -> Optional[PricingSnapshot]:
+    return _ACTIVE_SNAPSHOT.get()
+
+
+def pinned_config_version(service: str) -> Optional[str]:
+    """Fingerprint of `service`'s config in the active snapshot; None when pricing is fetched live."""
+    snapshot = _ACTIVE_SNAPSHOT.get()
+    if snapshot is None:
+        return None
+    overrides = _overrides_for(service)
+    if not overrides:
+        return snapshot.service_version(service)
+    cfg = snapshot.configs.get(service)
+    if cfg is None:
+        return None
+    for layer in overrides[:-1]:
+        cfg = layer.config_for(cfg)
+    return overrides[-1].version_for(cfg)
+
+
+def used_config_version(service: str) -> Optional[str]:
+    """Fingerprint of the config `service` last priced against in this context, if any."""
+    used = _LAST_USED_CONFIG.get()
+    if used is None or used[0] != service:
+        # No fetch ran (e.g. a memoized result); the pinned snapshot is what it priced against
+        return pinned_config_version(service)
+    return _config_fingerprint({service: used[1]})
+
+
+@contextmanager
+def using(
+    snapshot: Optional[PricingSnapshot],
+    at: Optional[float] = None,
+    subject: Optional[str] = None,
+    postcode: Optional[Any] = None,
+) -> Iterator[Optional[PricingSnapshot]]:
+    """Activate `snapshot` for the duration of the block (None means fetch live).
+
+    `at` is the quote date (epoch seconds) scheduled pricing is resolved for;
+    None means the time of each fetch. `subject` (a customer or session id)
+    enrolls the quotes in live pricing experiments, and `postcode` selects the
+    property's regional pricing zone.
+    """
+    token = _ACTIVE_SNAPSHOT.set(snapshot)
+    date_token = _PRICING_DATE.set(at)
+    subject_token = _SUBJECT.set(subject)
+    postcode_token = _POSTCODE.set(postcode)
+    try:
+        yield snapshot
+    finally:
+        _POSTCODE.reset(postcode_token)
+        _SUBJECT.reset(subject_token)
+        _PRICING_DATE.reset(date_token)
+        _ACTIVE_SNAPSHOT.reset(token)
+
+
+@contextmanager
+def located(postcode: Optional[Any]) -> Iterator[None]:
+    """Price the block for a property at `postcode`, keeping the active snapshot, date and subject."""
+    token = _POSTCODE.set(postcode)
+    try:
+        yield
+    finally:
+        _POSTCODE.reset(token)
+
+
+class SnapshotStore:
+    """Process-wide pricing snapshot reused for `ttl` seconds.
+
+    With `ttl <= 0` the store is disabled and `current()` returns None, so
+    services keep fetching pricing on every call. When a refresh fails the
+    previous snapshot keeps serving until the next attempt, one `ttl` later.
+    """
+
+    def __init__(self, load_modules: Callable[[], Mapping[str, ModuleType]], ttl: float) -> None:
+        self._load_modules = load_modules
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._snapshot: Optional[PricingSnapshot] = None
+        self._checked_at = float("-inf")
+
+    @property
+    def enabled(self) -> bool:
+        return self._ttl > 0
+
+    def current(self) -> Optional[PricingSnapshot]:
+        if not self.enabled:
+            return None
+        if time.monotonic() - self._checked_at < self._ttl:
+            return self._snapshot
+        # Only one caller refreshes; the others keep pricing against the stale snapshot
+        if not self._lock.acquire(blocking=self._snapshot is None):
+            return self._snapshot
+        try:
+            if time.monotonic() - self._checked_at >= self._ttl:
+                try:
+                    self._snapshot = capture_snapshot(self._load_modules())
+                except ValueError:
+                    logger.exception("Pricing snapshot refresh failed; keeping the previous one")
+                self._checked_at = time.monotonic()
+            return self._snapshot
+        finally:
+            self._lock.release()
@@ -0,0 +1,308 @@
+"""Promo codes: percentage or fixed discounts applied by the engine.
+
+Codes are defined in a JSON file (`RATE_ENGINE_PROMO_CODES`):
+
+    {"codes": [
+      {"code": "SPRING10", "percent_off": 10, "services": ["pre_purchase"],
+       "expires": "2026-12-31T23:59:59+10:00", "max_uses": 500},
+      {"code": "WELCOME50", "amount_off": 50}
+    ]}
+
+A code gives either `percent_off` or a whole-dollar `amount_off`. It can be
+limited to some services (any accepted name or alias, resolved to the
+canonical service when the file loads), and it can expire. Codes are matched
+case-insensitively. They are held in a dict keyed by the normalized code,
+behind a Bloom filter, so most mistyped or guessed codes are rejected without
+touching the index. The file is re-read when it changes.
+
+`max_uses` caps how many accepted quotes a code may discount. Quoting only
+checks that a code has uses left; a use is claimed when a quote is accepted,
+once per claimant (the accepted quote's token), so repeated estimates and
+retried acceptances never burn uses. Claims are kept in process, or in Redis
+when `RATE_ENGINE_PROMO_REDIS_URL` is set so every worker and instance shares
+one count.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Mapping, Optional, Set
+
+from . import money
+from .reloading import ReloadingFile
+
+
+logger = logging.getLogger(__name__)
+
+MAX_CODE_LENGTH = 64
+
+
+class PromoError(ValueError):
+    """Raised for malformed promo code files, and for codes that cannot be applied."""
+
+
+def normalize(code: str) -> str:
+    return code.strip().upper()
+
+
+@dataclass(frozen=True)
+class PromoCode:
+    code: str
+    percent_off: Optional[float] = None
+    amount_off: Optional[int] = None
+    services: Optional[FrozenSet[str]] = None
+    expires_at: Optional[float] = None
+    max_uses: Optional[int] = None
+
+    def discount_for(self, amount: int) -> int:
+        """Whole-dollar discount off `amount`; never more than `amount`."""
+        if amount <= 0:
+            return 0
+        if self.percent_off is not None:
+            cents = money.percent_of(money.to_cents(amount), money.to_basis_points(self.percent_off))
+            return min(amount, money.to_dollars(cents))
+        return min(amount, self.amount_off or 0)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (false-positive rate about `error_rate` at `capacity`)."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01) -> None:
+        capacity = max(1, capacity)
+        self._size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self._hashes = max(1, round(self._size / capacity * math.log(2)))
+        self._bits = bytearray((self._size + 7) // 8)
+
+    def _positions(self, item: str) -> Iterable[int]:
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "big"), int.from_bytes(digest[8:], "big") | 1
+        return ((first + i * second) % self._size for i in range(self._hashes))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class PromoIndex:
+    """Codes by normalized code, fronted by a Bloom filter."""
+
+    def __init__(self, codes: Iterable[PromoCode]) -> None:
+        self._codes: Dict[str, PromoCode] = {}
+        for promo in codes:
+            if promo.code in self._codes:
+                raise PromoError(f"Promo code '{promo.code}' is defined twice")
+            self._codes[promo.code] = promo
+        self._filter = BloomFilter(len(self._codes))
+        for code in self._codes:
+            self._filter.add(code)
+
+    def get(self, code: str) -> Optional[PromoCode]:
+        """The code's definition; None for unknown codes (normally decided by the filter alone)."""
+        if code not in self._filter:
+            return None
+        return self._codes.get(code)
+
+
+def _promo(item: Any, canonical_name: Optional[Callable[[str], str]] = None) -> PromoCode:
+    if not isinstance(item, Mapping) or not isinstance(item.get("code"), str) or not normalize(item["code"]):
+        raise PromoError("Each promo code needs a 'code'")
+    code = normalize(item["code"])
+    percent_off, amount_off = item.get("percent_off"), item.get("amount_off")
+    if (percent_off is None) == (amount_off is None):
+        raise PromoError(f"Promo code '{code}' needs exactly one of 'percent_off' or 'amount_off'")
+    if percent_off is not None and (
+        isinstance(percent_off, bool) or not isinstance(percent_off, (int, float)) or not 0 < percent_off <= 100
+    ):
+        raise PromoError(f"Promo code '{code}': 'percent_off' must be in (0, 100]")
+    if amount_off is not None and (isinstance(amount_off, bool) or not isinstance(amount_off, int) or amount_off <= 0):
+        raise PromoError(f"Promo code '{code}': 'amount_off' must be a positive integer")
+    services = item.get("services")
+    if services is not None and (not isinstance(services, list) or not all(isinstance(s, str) for s in services)):
+        raise PromoError(f"Promo code '{code}': 'services' must be a list of service names")
+    if services is not None and canonical_name is not None:
+        try:
+            services = [canonical_name(service) for service in services]
+        except LookupError as exc:
+            raise PromoError(f"Promo code '{code}': unknown service '{exc.args[0]}'") from None
+    max_uses = item.get("max_uses")
+    if max_uses is not None and (isinstance(max_uses, bool) or not isinstance(max_uses, int) or max_uses < 0):
+        raise PromoError(f"Promo code '{code}': 'max_uses' must be a non-negative integer")
+    expires_at = None
+    if item.get("expires") is not None:
+        from . import schedule
+
+        try:
+            expires_at = schedule.parse_time(item["expires"])
+        except ValueError as exc:
+            raise PromoError(f"Promo code '{code}': {exc}") from None
+    return PromoCode(
+        code=code,
+        percent_off=percent_off,
+        amount_off=amount_off,
+        services=frozenset(services) if services is not None else None,
+        expires_at=expires_at,
+        max_uses=max_uses,
+    )
+
+
+def load(path: Path, canonical_name: Optional[Callable[[str], str]] = None) -> PromoIndex:
+    """Parse a promo code file; `canonical_name` resolves service names, raising LookupError for unknown ones."""
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        raise PromoError(f"Unable to read promo codes {path}: {exc}") from exc
+    codes = payload.get("codes") if isinstance(payload, dict) else None
+    if not isinstance(codes, list):
+        raise PromoError("Promo code file must be an object with a 'codes' list")
+    return PromoIndex([_promo(item, canonical_name) for item in codes])
+
+
+# --- Usage caps ---------------------------------------------------------------
+
+
+class UsageCounter(ABC):
+    """Promo use counter; each distinct claimant of a code is one use."""
+
+    @abstractmethod
+    def available(self, code: str, max_uses: int) -> bool:
+        """Whether `code` has uses left; nothing is counted."""
+
+    @abstractmethod
+    def claim(self, code: str, max_uses: int, claimant: str) -> bool:
+        """Count `claimant`'s use of `code` (once, however often it claims); False once `max_uses` are used."""
+
+
+class MemoryUsageCounter(UsageCounter):
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._claimants: Dict[str, Set[str]] = {}
+
+    def available(self, code: str, max_uses: int) -> bool:
+        return len(self._claimants.get(code, ())) < max_uses
+
+    def claim(self, code: str, max_uses: int, claimant: str) -> bool:
+        with self._lock:
+            claimants = self._claimants.setdefault(code, set())
+            if claimant in claimants:
+                return True
+            if len(claimants) >= max_uses:
+                return False
+            claimants.add(claimant)
+            return True
+
+
+class RedisUsageCounter(UsageCounter):
+    """Counts shared through Redis.
+
+    Redis errors are logged and the use is refused, so an outage can never
+    push a code past its cap.
+    """
+
+    def __init__(self, url: str, prefix: str = "rate-engine:promo-claims:") -> None:
+        try:
+            import redis
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError("RATE_ENGINE_PROMO_REDIS_URL is set but the 'redis' package is not installed") from exc
+        self._client = redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    def available(self, code: str, max_uses: int) -> bool:
+        try:
+            return self._client.scard(self._prefix + code) < max_uses
+        except Exception:
+            logger.exception("Promo use count failed")
+        return False
+
+    def claim(self, code: str, max_uses: int, claimant: str) -> bool:
+        # One set of claimants per code: its size is the use count
+        key = self._prefix + code
+        try:
+            if not self._client.sadd(key, claimant) or self._client.scard(key) <= max_uses:
+                return True
+            self._client.srem(key, claimant)
+        except Exception:
+            logger.exception("Promo use count failed")
+        return False
+
+
+# --- Engine-facing store ------------------------------------------------------
+
+
+class PromoCodes(ReloadingFile[PromoIndex]):
+    """Promo codes from a file (reloaded when it changes) with their use counter."""
+
+    def __init__(
+        self,
+        path: Path,
+        counter: UsageCounter,
+        canonical_name: Optional[Callable[[str], str]] = None,
+        interval: float = 5.0,
+    ) -> None:
+        self._counter = counter
+        super().__init__(path, functools.partial(load, canonical_name=canonical_name), PromoIndex([]), interval)
+
+    def lookup(self, code: Any, now: Optional[float] = None) -> PromoCode:
+        """The live definition of `code`; raises PromoError for unknown or expired codes."""
+        if not isinstance(code, str) or not code.strip() or len(code) > MAX_CODE_LENGTH:
+            raise PromoError("'promo_code' must be a non-empty string")
+        promo = self.current().get(normalize(code))
+        if promo is None:
+            raise PromoError("Unknown promo code")
+        if promo.expires_at is not None and (time.time() if now is None else now) >= promo.expires_at:
+            raise PromoError("Promo code has expired")
+        return promo
+
+    def check(self, promo: PromoCode, service: str) -> None:
+        """Raise PromoError unless `promo` can discount quotes for `service`; no use is counted."""
+        if promo.services is not None and service not in promo.services:
+            raise PromoError("Promo code does not apply to this service")
+        if promo.max_uses is not None and not self._counter.available(promo.code, promo.max_uses):
+            raise PromoError("Promo code has reached its usage limit")
+
+    def claim(self, promo: PromoCode, claimant: str) -> None:
+        """Count `claimant`'s use of `promo`, once; raises PromoError once its uses are exhausted."""
+        if promo.max_uses is not None and not self._counter.claim(promo.code, promo.max_uses, claimant):
+            raise PromoError("Promo code has reached its usage limit")
+
+
+def apply(promo: PromoCode, result: Dict[str, Any]) -> None:
+    """Discount a priced result: promo_code, promo_discount and the reduced payable_price.
+
+    The discount is taken off the price including GST when the service reports
+    one, otherwise off the quote price, and is stacked on any other discount.
+    """
+    base = result.get("price_including_gst")
+    if base is None:
+        base = result["quote_price"]
+    discount = promo.discount_for(base)
+    payable = result.get("payable_price")
+    result["promo_code"] = promo.code
+    result["promo_discount"] = discount
+    result["payable_price"] = max(0, (base if payable is None else payable) - discount)
+
+
+def codes_from_env(canonical_name: Optional[Callable[[str], str]] = None) -> Optional[PromoCodes]:
+    """Promo codes from RATE_ENGINE_PROMO_CODES, or None when it is unset.
+
+    `canonical_name` (normally the service registry's) resolves the services codes are limited to.
+    """
+    path = os.getenv("RATE_ENGINE_PROMO_CODES")
+    if not path:
+        return None
+    redis_url = os.getenv("RATE_ENGINE_PROMO_REDIS_URL")
+    counter: UsageCounter = RedisUsageCounter(redis_url) if redis_url else MemoryUsageCounter()
+    return PromoCodes(Path(path), counter, canonical_name)
@@ -0,0 +1,95 @@
+"""HMAC-signed quote tokens.
+
+A token carries the canonical service, the normalized params, the priced
+result and the version of the pricing config it was computed with, so later
+form steps can trust a quote instead of recomputing it. The format is
+
+    base64url(JSON claims) "." base64url(HMAC-SHA256(secret, first part))
+
+without padding, so any holder of the shared secret can verify a token
+locally; `POST /api/v1/quotes/verify` does the same over HTTP.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from . import codec
+
+
+TOKEN_VERSION = 1
+
+
+class InvalidQuoteToken(ValueError):
+    """Raised for tokens that are malformed, tampered with or expired."""
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+@dataclass(frozen=True)
+class QuoteTokenSigner:
+    secret: bytes
+    ttl: float = 86400.0
+
+    def _signature(self, body: str) -> str:
+        return _b64encode(hmac.new(self.secret, body.encode("ascii"), hashlib.sha256).digest())
+
+    def sign(
+        self,
+        service: str,
+        params: Dict[str, Any],
+        result: Dict[str, Any],
+        pricing_version: Optional[str],
+    ) -> str:
+        issued_at = int(time.time())
+        claims = {
+            "v": TOKEN_VERSION,
+            "service": service,
+            "params": params,
+            "result": result,
+            "pricing_version": pricing_version,
+            "iat": issued_at,
+            "exp": issued_at + int(self.ttl),
+        }
+        body = _b64encode(codec.dumps(claims))
+        return f"{body}.{self._signature(body)}"
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        """Return the token's claims; raises InvalidQuoteToken if it cannot be trusted."""
+        body, sep, signature = token.partition(".")
+        # Tokens are base64url; anything else cannot be encoded or compared as one
+        if not sep or not body or not signature or not token.isascii():
+            raise InvalidQuoteToken("Malformed quote token")
+        if not hmac.compare_digest(signature, self._signature(body)):
+            raise InvalidQuoteToken("Quote token signature mismatch")
+        try:
+            claims = codec.loads(_b64decode(body))
+        except ValueError:
+            raise InvalidQuoteToken("Malformed quote token") from None
+        if not isinstance(claims, dict) or claims.get("v") != TOKEN_VERSION:
+            raise InvalidQuoteToken("Unsupported quote token version")
+        expires_at = claims.get("exp")
+        if not isinstance(expires_at, int) or expires_at <= time.time():
+            raise InvalidQuoteToken("Quote token has expired")
+        return claims
+
+
+def signer_from_env() -> Optional[QuoteTokenSigner]:
+    """Signer configured by RATE_ENGINE_QUOTE_TOKEN_SECRET; None disables quote tokens."""
+    secret = os.getenv("RATE_ENGINE_QUOTE_TOKEN_SECRET")
+    if not secret:
+        return None
+    ttl = float(os.getenv("RATE_ENGINE_QUOTE_TOKEN_TTL") or 86400)
+    return QuoteTokenSigner(secret=secret.encode("utf-8"), ttl=ttl)
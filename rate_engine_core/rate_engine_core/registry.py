@@ -0,0 +1,213 @@
+"""Registry of pricing service modules.
+
+Services are the JSON specs in `services/` (built by `rules.load_module`) and
+any `.py` file next to the app that defines a top-level `calculate()`. The
+directories are scanned once; every accepted name (file stem or alias) maps
+to one canonical entry, and each canonical module is built at most once no
+matter which alias requests it. Any name missing from the
+table is unknown, and answering that never touches the filesystem.
+
+Loaded entries can be hot-reloaded: `ServiceWatcher` polls the mtime of each
+loaded spec or module file and swaps in a recompiled entry when it changes.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import logging
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, Dict, Mapping
+
+from . import pricing, rules
+from .service_schema import ServiceSchema
+
+
+logger = logging.getLogger(__name__)
+
+_CALCULATE_DEF = re.compile(r"^def calculate\(", re.MULTILINE)
+
+
+class UnknownServiceError(LookupError):
+    """Raised for service names that match no module or alias."""
+
+
+class ServiceLoadError(RuntimeError):
+    """Raised when a discovered service module cannot be loaded."""
+
+
+@dataclass(frozen=True)
+class ServiceEntry:
+    name: str
+    path: Path
+    module: ModuleType
+    calculate: Callable[..., Any]
+    schema: ServiceSchema
+    # st_mtime_ns of the file when it was loaded; compared by the hot-reload watcher
+    mtime_ns: int = 0
+
+
+def _exec_module(name: str, path: Path) -> ModuleType:
+    # Use a safe module name replacing dashes with underscores for Python
+    spec = importlib.util.spec_from_file_location(name.replace("-", "_"), str(path))
+    if spec is None or spec.loader is None:
+        raise ServiceLoadError("Unable to load service module")
+
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)  # type: ignore[assignment]
+    return module
+
+
+def load_entry(name: str, path: Path) -> ServiceEntry:
+    """Build a service module from the spec or source at `path` and wrap it in a fresh entry."""
+    try:
+        # Stat before loading so an edit made during the load triggers another reload
+        mtime_ns = path.stat().st_mtime_ns
+    except OSError as exc:
+        raise ServiceLoadError("Unable to load service module") from exc
+
+    if path.suffix == ".json":
+        try:
+            module = rules.load_module(name, path)
+        except rules.SpecError as exc:
+            raise ServiceLoadError(str(exc)) from exc
+    else:
+        module = _exec_module(name, path)
+
+    # Ensure the module exposes a callable `calculate`
+    calculate = getattr(module, "calculate", None)
+    if not callable(calculate):
+        raise ServiceLoadError("Service module missing callable 'calculate'")
+
+    pricing.bind_module(name, module)
+    return ServiceEntry(
+        name=name,
+        path=path,
+        module=module,
+        calculate=calculate,
+        schema=ServiceSchema.from_callable(calculate),
+        mtime_ns=mtime_ns,
+    )
+
+
+class ServiceRegistry:
+    def __init__(self, directory: Path, aliases: Mapping[str, str]) -> None:
+        self._directory = directory
+        self._aliases = dict(aliases)
+        # Pricing read from the environment falls back to the engine's .env
+        rules.add_env_file(directory / ".env")
+        self._lock = threading.Lock()
+        self._paths: Dict[str, Path] = {}
+        self._names: Dict[str, str] = {}
+        self._entries: Dict[str, ServiceEntry] = {}
+        # mtime of module versions that failed to reload, so they are not retried every poll
+        self._failed_mtimes: Dict[str, int] = {}
+        self.discover()
+
+    def discover(self) -> None:
+        """Scan the service directories and rebuild the name table."""
+        paths: Dict[str, Path] = {path.stem: path for path in sorted(self._directory.glob("services/*.json"))}
+        for path in sorted(self._directory.glob("*.py")):
+            try:
+                source = path.read_text(encoding="utf-8")
+            except OSError:
+                continue
+            if _CALCULATE_DEF.search(source):
+                paths[path.stem] = path
+
+        names = {stem: stem for stem in paths}
+        # Explicit aliases win over file stems (e.g. construction_stages -> new_construction_stages)
+        for alias, target in self._aliases.items():
+            if target in paths:
+                names[alias] = target
+
+        with self._lock:
+            self._paths = paths
+            self._names = names
+
+    def canonical_name(self, name: str) -> str:
+        try:
+            return self._names[name]
+        except KeyError:
+            raise UnknownServiceError(name) from None
+
+    def names(self) -> list[str]:
+        """Canonical names of every reachable service."""
+        return sorted(set(self._names.values()))
+
+    def get(self, name: str) -> ServiceEntry:
+        """Return the loaded entry for any accepted service name, loading it on first use."""
+        canonical = self.canonical_name(name)
+        entry = self._entries.get(canonical)
+        if entry is not None:
+            return entry
+        with self._lock:
+            entry = self._entries.get(canonical)
+            if entry is None:
+                entry = load_entry(canonical, self._paths[canonical])
+                self._entries[canonical] = entry
+        return entry
+
+    def load_all(self) -> Dict[str, ServiceEntry]:
+        return {name: self.get(name) for name in self.names()}
+
+    def reload_changed(self) -> list[str]:
+        """Recompile loaded modules whose file changed on disk; returns the reloaded names.
+
+        The new entry is built before the swap, so requests keep using the old one until
+        it is ready and in-flight calls finish on the entry they started with. Other
+        services are untouched. A module that fails to load keeps its previous entry.
+        """
+        reloaded: list[str] = []
+        for name, entry in list(self._entries.items()):
+            try:
+                mtime_ns = entry.path.stat().st_mtime_ns
+            except OSError:
+                continue  # file removed or unreadable: keep serving the loaded version
+            if mtime_ns == entry.mtime_ns or self._failed_mtimes.get(name) == mtime_ns:
+                continue
+            try:
+                new_entry = load_entry(name, entry.path)
+            except Exception:
+                self._failed_mtimes[name] = mtime_ns
+                logger.exception("Hot reload of service %r failed; keeping the loaded version", name)
+                continue
+            with self._lock:
+                self._entries[name] = new_entry
+            self._failed_mtimes.pop(name, None)
+            reloaded.append(name)
+            logger.info("Hot reloaded service %r from %s", name, entry.path.name)
+        return reloaded
+
+
+class ServiceWatcher:
+    """Background thread polling a registry for changed service modules."""
+
+    def __init__(self, registry: ServiceRegistry, interval: float = 2.0) -> None:
+        self._registry = registry
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="service-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self._interval + 1)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            try:
+                self._registry.reload_changed()
+            except Exception:  # pragma: no cover - never let the watcher die
+                logger.exception("Service watcher poll failed")
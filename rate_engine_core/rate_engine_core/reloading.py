@@ -0,0 +1,62 @@
+"""Definition files re-read when they change.
+
+Pricing schedules, experiments, zones and promo codes are each a JSON file
+parsed into an immutable index. `ReloadingFile` holds the current index and
+re-reads the file when its mtime changes, checking at most every `interval`
+seconds and only from the caller that wins the lock, so quoting never waits
+on a reload.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Generic, Optional, TypeVar
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class ReloadingFile(Generic[T]):
+    """A file parsed by `load`, reloaded when it changes (checked at most every `interval` seconds).
+
+    `load` raises ValueError (the module's own error type) for a malformed file.
+    A file that fails to load is logged and the previously loaded value stays in
+    effect; `empty` is used until the file first loads.
+    """
+
+    def __init__(self, path: Path, load: Callable[[Path], T], empty: T, interval: float = 5.0) -> None:
+        self.path = path
+        self._load = load
+        self._interval = interval
+        self._lock = threading.Lock()
+        self._value = empty
+        self._mtime_ns: Optional[int] = None
+        self._checked_at = float("-inf")
+        self._refresh()
+
+    def _refresh(self) -> None:
+        try:
+            mtime_ns = self.path.stat().st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        if mtime_ns is not None and mtime_ns != self._mtime_ns:
+            try:
+                self._value = self._load(self.path)
+            except ValueError:
+                logger.exception("Reloading %s failed; keeping the previous version", self.path)
+            self._mtime_ns = mtime_ns
+        self._checked_at = time.monotonic()
+
+    def current(self) -> T:
+        """The loaded value, after re-reading the file if it changed."""
+        if time.monotonic() - self._checked_at >= self._interval and self._lock.acquire(blocking=False):
+            try:
+                self._refresh()
+            finally:
+                self._lock.release()
+        return self._value
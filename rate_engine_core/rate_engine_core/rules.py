@@ -0,0 +1,769 @@
+"""Declarative pricing rules.
+
+Every service is described by a JSON spec in `services/<name>.json` instead of
+a hand-written module. A spec declares:
+
+- `params`: the `calculate()` parameters as `[name, type]` or
+  `[name, type, default]`, where type is one of int, bool, str, stages or any.
+  With `"addons": true` the shared addon flags are appended as well.
+- `pricing`: where the pricing config comes from, either a Kong services row
+  (`"source": "kong"`) or environment variables (`"source": "env"`), and how
+  each config field is read.
+- `checks`: input validation, run in order before any pricing fetch.
+- `charges`: quote-level components. They are fixed prices, included-room
+  extras, stepped surcharges (levels, area, loss bands) and flag surcharges.
+- `stages`: an optional per-stage price table, with surcharges added to every
+  stage (`each`), to specific stages (`extra`) and per-stage hour multipliers.
+  Its `bundles` offer package deals on stage combinations (see `bundle_table`).
+- `variants`: alternative checks/charges/stages selected by a param value.
+- `addons` / `gst`: addon totals, then the shared GST, discount and payable
+  price stage (tax.py).
+- `table`: an optional bounded input domain whose prices are materialized
+  into a lookup table per pricing config (see `tables`).
+
+`load_module` turns a spec into a module object exposing
+`_fetch_pricing_config()` and `calculate(**params)`, so the registry, pricing
+snapshots and schemas treat it like any service module. The charge formulas
+are compiled into closures once per distinct pricing config and reused for
+every quote priced against it. The module also exposes
+`calculate_batch(rows)`, which prices many quotes through the vectorized
+kernels in `kernels.py`.
+"""
+
+from __future__ import annotations
+
+import inspect
+import json
+import os
+import threading
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+from urllib.request import Request, urlopen
+
+from . import money, tables
+
+
+Params = Dict[str, Any]
+Config = Dict[str, Any]
+Charge = Callable[[Params], Any]
+
+_PARAM_TYPES: Dict[str, Any] = {"int": int, "bool": bool, "str": str, "stages": List[int], "any": Any}
+
+# Shared addon flags, in the order their breakdown is reported
+ADDON_PARAMS: Tuple[Tuple[str, Any, Any], ...] = (
+    ("shed_garage_carport_inspection", bool, False),
+    ("roof_void_inspection", bool, False),
+    ("express_report_delivery", bool, False),
+    ("out_of_area_travel_surcharge_per_km", int, 0),
+    ("pest_inspection", bool, False),
+    ("drug_residue", bool, False),
+    ("thermal_imaging_moisture_meter", bool, False),
+    ("drone_roof_inspection", bool, False),
+    ("video", bool, False),
+)
+# Params an addon service can locate the property by, for the travel distance (see `travel`)
+_TRAVEL_DISTANCE_PARAM = "out_of_area_travel_surcharge_per_km"
+_LOCATION_PARAMS = frozenset(("postcode", "latitude", "longitude"))
+
+# Distinct base pricing configs kept compiled per service (current plus a few recent ones),
+# each under every live override combination (see `pricing.overlay_count`)
+_COMPILED_PER_SERVICE = 4
+# .env files read for keys missing from the environment (see `add_env_file`)
+_ENV_FILES: List[Path] = []
+
+
+class SpecError(ValueError):
+    """Raised when a service spec is malformed."""
+
+
+def add_env_file(path: Path) -> None:
+    """Also look keys up in the .env file at `path` (each registry adds its engine's)."""
+    if path not in _ENV_FILES:
+        _ENV_FILES.append(path)
+
+
+def read_env_value(key: str) -> str | None:
+    """Read an environment variable. If missing, attempt to read from the engine's .env file.
+
+    This avoids introducing a runtime dependency on python-dotenv.
+    """
+    value = os.getenv(key)
+    if value:
+        return value
+
+    for env_path in _ENV_FILES:
+        if not env_path.exists():
+            continue
+        try:
+            for line in env_path.read_text(encoding="utf-8").splitlines():
+                line = line.strip()
+                if not line or line.startswith("#") or "=" not in line:
+                    continue
+                k, v = line.split("=", 1)
+                if k.strip() == key:
+                    return v.strip().strip('"').strip("'")
+        except Exception:
+            # Best-effort; try the next file
+            pass
+    return None
+
+
+def safe_to_int(value: Any, default: int = 0) -> int:
+    try:
+        if isinstance(value, bool):  # prevent True -> 1
+            return default
+        if isinstance(value, (int, float)):
+            return int(value)
+        if isinstance(value, str):
+            return int(value.strip())
+    except Exception:
+        return default
+    return default
+
+
+def _ceil_div(value: int, size: int) -> int:
+    return -(-value // size)
+
+
+# --- Pricing sources -------------------------------------------------------
+
+
+def _read_field(raw: Any, kind: str, default: Any) -> Any:
+    if kind == "int":
+        return safe_to_int(raw, default)
+    if kind == "float":
+        return float(raw or default)
+    if kind == "str":
+        return str(raw or "")
+    raise SpecError(f"Unknown pricing field type '{kind}'")
+
+
+def _fetch_services_row(service_type: str) -> Dict[str, Any]:
+    """Fetch the unified services endpoint and select the row for `service_type`."""
+    base_url = read_env_value("KONG_GATEWAY_URL")
+    if not base_url:
+        raise ValueError("KONG_GATEWAY_URL is not set in environment or .env")
+
+    url = f"{base_url.rstrip('/')}/items/services"
+
+    try:
+        req = Request(url, headers={"Accept": "application/json"})
+        with urlopen(req, timeout=5) as resp:  # nosec - internal trusted URL
+            raw = resp.read().decode("utf-8", errors="replace").strip()
+    except Exception as exc:
+        raise ValueError(f"Failed to fetch pricing from {url}") from exc
+
+    # Some environments may append stray characters after JSON (e.g., '%'). Try to be resilient.
+    try:
+        payload = json.loads(raw)
+    except json.JSONDecodeError:
+        if "}" in raw:
+            trimmed = raw[: raw.rfind("}") + 1]
+            payload = json.loads(trimmed)
+        else:
+            raise
+
+    items = payload.get("data") or []
+    if not isinstance(items, list):
+        raise ValueError("Invalid pricing payload: expected a list under 'data'")
+
+    for it in items:
+        try:
+            if str(it.get("service_type")).strip().lower() == service_type:
+                return it
+        except Exception:
+            continue
+    raise ValueError(f"Pricing for service '{service_type}' not found")
+
+
+def _pricing_fetcher(pricing: Mapping[str, Any]) -> Callable[[], Config]:
+    fields: Dict[str, Tuple[Tuple[str, ...], str, Any]] = {}
+    for name, field in pricing.get("fields", {}).items():
+        keys = field["key"]
+        keys = (keys,) if isinstance(keys, str) else tuple(keys)
+        fields[name] = (keys, field.get("type", "int"), field.get("default", 0))
+
+    source = pricing.get("source")
+    if source == "kong":
+        service_type = pricing["service_type"]
+
+        def _fetch_pricing_config() -> Config:
+            row = _fetch_services_row(service_type)
+            cfg: Config = {}
+            for name, (keys, kind, default) in fields.items():
+                # The first key present in the row wins, even when its value is null
+                raw = next((row.get(key) for key in keys if key in row), default)
+                cfg[name] = _read_field(raw, kind, default)
+            return cfg
+
+    elif source == "env":
+
+        def _fetch_pricing_config() -> Config:
+            return {name: _read_field(read_env_value(keys[0]), kind, default) for name, (keys, kind, default) in fields.items()}
+
+    else:
+        raise SpecError(f"Unknown pricing source '{source}'")
+    return _fetch_pricing_config
+
+
+def _with_tax(fetch: Callable[[], Config]) -> Callable[[], Config]:
+    """Attach the shared tax config (see tax.py) to every config `fetch` returns."""
+    from . import tax
+
+    def _fetch_pricing_config() -> Config:
+        cfg = fetch()
+        cfg["tax"] = tax.current()
+        return cfg
+
+    return _fetch_pricing_config
+
+
+# --- Checks ----------------------------------------------------------------
+
+
+def _validate_stages(stages: Any, max_stage: int) -> list[int]:
+    try:
+        stage_list = list(stages)
+    except TypeError as exc:  # not iterable
+        raise ValueError(f"'stages' must be a list of integers between 1 and {max_stage}") from exc
+
+    if not stage_list:
+        raise ValueError("'stages' must include at least one stage")
+
+    normalized: list[int] = []
+    seen: set[int] = set()
+    for s in stage_list:
+        if not isinstance(s, int):
+            raise ValueError("'stages' must contain integers only")
+        if s < 1 or s > max_stage:
+            raise ValueError(f"'stages' values must be between 1 and {max_stage}")
+        if s in seen:
+            continue
+        seen.add(s)
+        normalized.append(s)
+    return normalized
+
+
+def _compile_check(check: Mapping[str, Any]) -> Callable[[Params], None]:
+    message = check.get("message", "")
+    if "one_of" in check:
+        name, allowed = check["one_of"], frozenset(check["values"])
+
+        def one_of(p: Params) -> None:
+            if str(p[name]).strip().lower() not in allowed:
+                raise ValueError(message)
+
+        return one_of
+    if "non_negative" in check:
+        names = tuple(check["non_negative"])
+
+        def non_negative(p: Params) -> None:
+            if any(p[n] < 0 for n in names):
+                raise ValueError(message)
+
+        return non_negative
+    if "integer" in check:
+        name, minimum = check["integer"], check.get("min", 0)
+
+        def integer(p: Params) -> None:
+            value = p[name]
+            if not isinstance(value, int) or value < minimum:
+                raise ValueError(message)
+
+        return integer
+    if "stages" in check:
+        name, max_stage = check["stages"], check["max"]
+
+        def stages(p: Params) -> None:
+            p[name] = sorted(_validate_stages(p[name], max_stage))
+
+        return stages
+    raise SpecError(f"Unknown check {sorted(check)}")
+
+
+# --- Charges ---------------------------------------------------------------
+
+
+def _compile_charge(charge: Mapping[str, Any], cfg: Config) -> Charge:
+    """Bind one charge to a pricing config; returns p -> amount."""
+    if "fixed" in charge:
+        amount = cfg[charge["fixed"]]
+        return lambda p: amount
+
+    if "flag" in charge:
+        names, amount = tuple(charge["flag"]), cfg[charge["price"]]
+        return lambda p: amount if any(p[n] for n in names) else 0
+
+    if "steps" in charge:
+        # ceil(max(0, value - over) / size) steps of `price`; `over` may name a config field
+        name, size, unit = charge["steps"], charge.get("size", 1), cfg[charge["price"]]
+        over = charge.get("over", 0)
+        over = cfg[over] if isinstance(over, str) else over
+
+        def steps(p: Params) -> Any:
+            extra = p[name] - over
+            return _ceil_div(extra, size) * unit if extra > 0 else 0
+
+        return steps
+
+    if "rooms" in charge:
+        included = charge.get("included", 0)
+        if charge["rooms"] == "combined":
+            # One unit price for every room beyond the included count
+            unit = next((cfg.get(key) for key in charge["unit"] if cfg.get(key)), 0)
+            return lambda p: max(0, max(0, p["bedrooms"]) + max(0, p["bathrooms"]) - included) * unit
+
+        if charge["rooms"] == "split":
+            bedroom_unit = cfg.get(charge["bedroom"], 0)
+            bathroom_unit = cfg.get(charge["bathroom"], 0)
+            # Free rooms go to the higher-priced room type first
+            bedrooms_first = bedroom_unit >= bathroom_unit
+
+            def split(p: Params) -> Any:
+                bedrooms, bathrooms = max(0, p["bedrooms"]), max(0, p["bathrooms"])
+                if bedrooms_first:
+                    free = min(bedrooms, included)
+                    bedrooms -= free
+                    bathrooms -= min(bathrooms, included - free)
+                else:
+                    free = min(bathrooms, included)
+                    bathrooms -= free
+                    bedrooms -= min(bedrooms, included - free)
+                return bedrooms * bedroom_unit + bathrooms * bathroom_unit
+
+            return split
+
+    if "addon_rate" in charge:
+        # Quantity priced at an addon's unit rate, truncated to whole dollars
+        from . import addons
+
+        name = charge["quantity"]
+        rate_cents = addons.ADDON_PRICE_CENTS.get(charge["addon_rate"]) or 0
+        return lambda p: money.to_dollars(money.times(rate_cents, p[name]))
+
+    raise SpecError(f"Unknown charge {sorted(charge)}")
+
+
+def _charge_params(charge: Mapping[str, Any]) -> Tuple[str, ...]:
+    """Params a charge reads."""
+    if "flag" in charge:
+        return tuple(charge["flag"])
+    if "steps" in charge:
+        return (charge["steps"],)
+    if "rooms" in charge:
+        return ("bedrooms", "bathrooms")
+    if "addon_rate" in charge:
+        return (charge["quantity"],)
+    return ()
+
+
+def _sum_charges(charges: Sequence[Charge]) -> Charge:
+    if not charges:
+        return lambda p: 0
+    if len(charges) == 1:
+        return charges[0]
+    return lambda p: sum(charge(p) for charge in charges)
+
+
+# --- Bodies: checks + charges + stages, optionally per variant --------------
+
+
+def bundle_table(bundles: Sequence[Mapping[str, Any]], base: Mapping[int, Any], cfg: Config) -> List[Tuple[Any, Tuple[Tuple[str, Any], ...]]]:
+    """Best bundle discount for every stage subset, indexed by bitmask (bit s = stage s).
+
+    A bundle is either `percent_off` its stages' base prices or a fixed `price`
+    for them (both name config fields; 0 disables the bundle). Disjoint bundles
+    combine, and each subset gets the combination with the largest discount:
+    (total discount, ((bundle name, discount), ...)).
+    """
+    offers = []
+    for bundle in bundles:
+        stages = tuple(int(stage) for stage in bundle["stages"])
+        list_price = sum(base[stage] for stage in stages)
+        if "percent_off" in bundle:
+            percent = cfg[bundle["percent_off"]]
+            discount = (
+                money.to_dollars(money.percent_of(money.to_cents(list_price), money.to_basis_points(percent)))
+                if percent > 0
+                else 0
+            )
+        else:
+            price = cfg[bundle["price"]]
+            discount = list_price - price if price > 0 else 0
+        if discount > 0:
+            offers.append((sum(1 << stage for stage in stages), bundle["name"], discount))
+
+    table: List[Tuple[Any, Tuple[Tuple[str, Any], ...]]] = [(0, ())] * (1 << (max(base) + 1))
+    for mask in range(1, len(table)):
+        lowest = mask & -mask
+        # Either the lowest selected stage is bought on its own, or a bundle covering it is used
+        best = table[mask & ~lowest]
+        for offer_mask, name, discount in offers:
+            if offer_mask & lowest and offer_mask & mask == offer_mask:
+                total, applied = table[mask & ~offer_mask]
+                if total + discount > best[0]:
+                    best = (total + discount, applied + ((name, discount),))
+        table[mask] = best
+    return table
+
+
+class _Body:
+    def __init__(self, spec: Mapping[str, Any]) -> None:
+        self.checks = [_compile_check(check) for check in spec.get("checks", ())]
+        self.charges = spec.get("charges", ())
+        self.stages = spec.get("stages")
+        self.bundles = self.stages.get("bundles") if self.stages is not None else None
+        for bundle in self.bundles or ():
+            if "quote_stage" in self.stages:
+                raise SpecError("Stage bundles cannot be combined with 'quote_stage'")
+            if not set(map(str, bundle.get("stages", ()))) <= set(self.stages["prices"]) or ("percent_off" in bundle) == ("price" in bundle):
+                raise SpecError(f"Bundle {bundle.get('name')!r} needs priced 'stages' and one of 'percent_off' or 'price'")
+
+    def compile(self, cfg: Config) -> Callable[[Params], Tuple[Any, Optional[List[Dict[str, int]]], Optional[List[Dict[str, Any]]]]]:
+        """Bind the body to `cfg`; returns p -> (quote amount, stage prices, applied bundles)."""
+        charges = _sum_charges([_compile_charge(charge, cfg) for charge in self.charges])
+        stages = self.stages
+        if stages is None:
+            return lambda p: (charges(p), None, None)
+
+        param = stages.get("param", "stages")
+        base = {int(stage): cfg[key] for stage, key in stages["prices"].items()}
+        each = _sum_charges([_compile_charge(charge, cfg) for charge in stages.get("each", ())])
+        extra = {
+            int(stage): _sum_charges([_compile_charge(charge, cfg) for charge in stage_charges])
+            for stage, stage_charges in stages.get("extra", {}).items()
+        }
+        hours = {int(stage): name for stage, name in stages.get("hours", {}).items()}
+        quote_stage = stages.get("quote_stage")
+        fixed_quote = int(base[quote_stage]) if quote_stage is not None else None
+        bundles = bundle_table(self.bundles, base, cfg) if self.bundles else None
+
+        def evaluate(p: Params) -> Tuple[Any, Optional[List[Dict[str, int]]], Optional[List[Dict[str, Any]]]]:
+            shared = each(p)
+            stage_prices = []
+            mask = 0
+            for s in p[param]:
+                price = base[s] + shared
+                if s in extra:
+                    price += extra[s](p)
+                if s in hours:
+                    price *= p[hours[s]]
+                stage_prices.append({"stage": s, "price": int(price)})
+                mask |= 1 << s
+            if fixed_quote is not None:
+                # Only the configured stage's base price counts towards the quote
+                stages_total = fixed_quote
+            else:
+                stages_total = sum(item["price"] for item in stage_prices)
+            if bundles is None:
+                return charges(p) + stages_total, stage_prices, None
+            discount, applied = bundles[mask]
+            return (
+                charges(p) + stages_total - discount,
+                stage_prices,
+                [{"name": name, "discount": amount} for name, amount in applied],
+            )
+
+        return evaluate
+
+
+class ServiceRules:
+    """A parsed service spec; evaluators are compiled per pricing config."""
+
+    def __init__(self, name: str, spec: Mapping[str, Any]) -> None:
+        self.name = name
+        self.spec = spec
+        self.description = spec.get("description", "")
+        self.fetch_pricing_config = _pricing_fetcher(spec["pricing"])
+        self.checks = [_compile_check(check) for check in spec.get("checks", ())]
+        self.body = _Body(spec)
+
+        variants = spec.get("variants")
+        self.variant_param: Optional[str] = None
+        self.variants: Dict[str, _Body] = {}
+        if variants is not None:
+            self.variant_param = variants["param"]
+            self.variants = {value: _Body(body) for value, body in variants["cases"].items()}
+
+        self.addons = spec.get("addons")
+        self.addon_params = tuple(
+            name
+            for name, _, _ in ADDON_PARAMS
+            if self.addons and name not in (self.addons.get("exclude", ()) if isinstance(self.addons, dict) else ())
+        )
+        self.gst = bool(spec.get("gst"))
+        if self.gst:
+            self.fetch_pricing_config = _with_tax(self.fetch_pricing_config)
+        self.table_dimensions = self._table_dimensions(spec.get("table"))
+        self.signature = self._build_signature(spec.get("params", ()))
+        self.defaults = {
+            name: param.default for name, param in self.signature.parameters.items() if param.default is not param.empty
+        }
+        self.required = tuple(
+            name
+            for name, param in self.signature.parameters.items()
+            if param.default is param.empty and param.kind is param.KEYWORD_ONLY
+        )
+        self._lock = threading.Lock()
+        # Per kind ("scalar", "batch"): id(config) -> (config, compiled evaluator), oldest first.
+        # Holding the config keeps its id from being reused while the entry lives.
+        self._compiled: Dict[str, Dict[int, Tuple[Config, Any]]] = {}
+        # Lookup tables by config fingerprint (see `tables`), oldest first; an equal config
+        # compiled again reuses its table instead of building another
+        self._tables: Dict[str, tables.TableSlot] = {}
+
+    def _table_dimensions(self, table: Optional[Mapping[str, Any]]) -> Optional[List[Tuple[str, List[Any]]]]:
+        if table is None:
+            return None
+        if self.body.stages is not None or self.variants:
+            raise SpecError("A lookup table is only supported for services without stages or variants")
+        read = {name for charge in self.body.charges for name in _charge_params(charge)}
+        if read != set(table):
+            raise SpecError(f"Lookup table dimensions must be exactly the params the charges read: {sorted(read)}")
+        try:
+            return [(name, tables.domain_values(name, values)) for name, values in table.items()]
+        except ValueError as exc:
+            raise SpecError(str(exc)) from exc
+
+    def _build_signature(self, params: Sequence[Sequence[Any]]) -> inspect.Signature:
+        parameters = []
+        for item in params:
+            name, kind = item[0], item[1]
+            if kind not in _PARAM_TYPES:
+                raise SpecError(f"Unknown param type '{kind}' for '{name}'")
+            default = item[2] if len(item) > 2 else inspect.Parameter.empty
+            parameters.append(
+                inspect.Parameter(name, inspect.Parameter.KEYWORD_ONLY, default=default, annotation=_PARAM_TYPES[kind])
+            )
+        if self.addons:
+            declared = {param.name for param in parameters}
+            for name, annotation, default in ADDON_PARAMS:
+                if name not in declared:
+                    parameters.append(
+                        inspect.Parameter(name, inspect.Parameter.KEYWORD_ONLY, default=default, annotation=annotation)
+                    )
+        parameters.append(inspect.Parameter("_extras", inspect.Parameter.VAR_KEYWORD, annotation=Any))
+        return inspect.Signature(parameters, return_annotation=dict)
+
+    def prepare(self, params: Params) -> Tuple[Params, _Body]:
+        """Apply defaults and run every check; returns the params and the body to price."""
+        for name in self.required:
+            if name not in params:
+                raise TypeError(f"calculate() missing required keyword argument: '{name}'")
+        p = dict(self.defaults)
+        p.update(params)
+        # An explicit distance wins; otherwise it is derived from the property's location
+        if self.addons and _TRAVEL_DISTANCE_PARAM not in params and not _LOCATION_PARAMS.isdisjoint(params):
+            km = _travel_km(params)
+            if km is not None:
+                p[_TRAVEL_DISTANCE_PARAM] = km
+        for check in self.checks:
+            check(p)
+        body = self.body
+        if self.variant_param is not None:
+            body = self.variants[str(p[self.variant_param]).strip().lower()]
+        for check in body.checks:
+            check(p)
+        return p, body
+
+    def _capacity(self) -> int:
+        from . import pricing
+
+        return _COMPILED_PER_SERVICE * pricing.overlay_count(self.name)
+
+    def _cached(self, kind: str, cfg: Config, build: Callable[[Config], Any]) -> Any:
+        compiled = self._compiled.get(kind, {})
+        known = compiled.get(id(cfg))
+        if known is not None and known[0] is cfg:
+            return known[1]
+        # An equal config in a new dict (e.g. from a new snapshot) reuses its evaluator
+        evaluator = next((evaluator for config, evaluator in list(compiled.values()) if config == cfg), None)
+        if evaluator is None:
+            evaluator = build(cfg)
+        capacity = self._capacity()
+        with self._lock:
+            compiled = self._compiled.setdefault(kind, {})
+            compiled.pop(id(cfg), None)
+            compiled[id(cfg)] = (cfg, evaluator)
+            while len(compiled) > capacity:
+                del compiled[next(iter(compiled))]
+        return evaluator
+
+    def _table_slot(self, cfg: Config) -> tables.TableSlot:
+        """The lookup table slot for `cfg`; its build starts only the first time the config is seen."""
+        from . import pricing
+
+        key = pricing._config_fingerprint({self.name: cfg})
+        capacity = self._capacity()
+        with self._lock:
+            slot = self._tables.get(key)
+            if slot is not None:
+                return slot
+            slot = self._tables[key] = tables.TableSlot()
+            while len(self._tables) > capacity:
+                del self._tables[next(iter(self._tables))]
+        dimensions = self.table_dimensions
+        slot.build_in_background(self.name, lambda: tables.build(self.body, cfg, dimensions))
+        return slot
+
+    def compiled(self, cfg: Config) -> Callable[[Params], Dict[str, Any]]:
+        """Evaluator bound to `cfg`, compiled on first use of each distinct config."""
+        return self._cached("scalar", cfg, self._compile)
+
+    def warm(self, cfg: Config, timeout: Optional[float] = None) -> None:
+        """Compile `cfg` ahead of the first quote and wait for its lookup table, if any."""
+        self.compiled(cfg)
+        if self.table_dimensions is not None and tables.ENABLED:
+            self._table_slot(cfg).wait(timeout)
+
+    def batch_kernel(self, cfg: Config) -> Callable[[Sequence[Params], Sequence[_Body]], List[Dict[str, Any]]]:
+        """Vectorized evaluator bound to `cfg` (see `kernels`), compiled like `compiled`."""
+        from . import kernels
+
+        return self._cached("batch", cfg, lambda config: kernels.compile_kernel(self, config))
+
+    def price_batch(self, rows: Sequence[Params], fetch_pricing_config: Callable[[], Config]) -> List[Any]:
+        """Price many param dicts in one vectorized pass.
+
+        Each item is the result dict `calculate(**row)` would return, or the exception
+        it would raise. Pricing is fetched once for the whole batch.
+        """
+        from . import kernels
+
+        results: List[Any] = [None] * len(rows)
+        prepared: List[Tuple[int, Params, _Body]] = []
+        for index, params in enumerate(rows):
+            try:
+                p, body = self.prepare(params)
+            except Exception as exc:
+                results[index] = exc
+                continue
+            prepared.append((index, p, body))
+        if not prepared:
+            return results
+
+        try:
+            cfg = fetch_pricing_config()
+        except Exception as exc:
+            for index, _, _ in prepared:
+                results[index] = exc
+            return results
+
+        try:
+            priced = self.batch_kernel(cfg)([p for _, p, _ in prepared], [body for _, _, body in prepared])
+        except kernels.UnsupportedBatch:
+            # Values the int64 kernels cannot price exactly: use the scalar evaluator row by row
+            evaluate = self.compiled(cfg)
+            priced = []
+            for _, p, body in prepared:
+                try:
+                    priced.append(evaluate(p, body))
+                except Exception as exc:
+                    priced.append(exc)
+        for (index, _, _), result in zip(prepared, priced):
+            results[index] = result
+        return results
+
+    def _with_table(self, formula: Callable[[Params], Any], cfg: Config) -> Callable[[Params], Any]:
+        """Answer in-domain params from a lookup table once it is built, else use `formula`."""
+        slot = self._table_slot(cfg)
+
+        def lookup(p: Params) -> Any:
+            table = slot.table
+            if table is not None:
+                amount = table.get(p)
+                if amount is not None:
+                    return amount, None, None
+            return formula(p)
+
+        return lookup
+
+    def _compile(self, cfg: Config) -> Callable[[Params], Dict[str, Any]]:
+        bodies = {id(body): body.compile(cfg) for body in [self.body, *self.variants.values()]}
+        if self.table_dimensions is not None and tables.ENABLED:
+            bodies[id(self.body)] = self._with_table(bodies[id(self.body)], cfg)
+        note = str(cfg.get("note", ""))
+        addon_params = self.addon_params
+        calculate_addons = apply_tax = None
+        if self.addons:
+            from .addons import calculate_addons
+        if self.gst:
+            from .tax import apply as apply_tax
+        tax_config = cfg.get("tax")
+
+        def evaluate(p: Params, body: _Body) -> Dict[str, Any]:
+            quote_price, stage_prices, bundles = bodies[id(body)](p)
+            result: Dict[str, Any] = {}
+            if stage_prices is not None:
+                result["stage_prices"] = stage_prices
+            if bundles:
+                result["bundles"] = bundles
+                result["bundle_discount"] = sum(item["discount"] for item in bundles)
+
+            # Money is carried in integer cents from here on (see money.py)
+            quote_cents = money.to_cents(quote_price)
+            addons_result = None
+            if calculate_addons is not None:
+                addons_result = calculate_addons({name: p[name] for name in addon_params})
+                quote_cents += addons_result["total_cents"]
+            result["quote_price"] = money.to_dollars(quote_cents)
+
+            if apply_tax is not None:
+                apply_tax(tax_config, result, quote_cents, p.get("discount", 0))
+            if addons_result is not None:
+                result["addons"] = addons_result["breakdown"]
+                result["addons_total"] = money.to_dollars(addons_result["total_cents"])
+            result["note"] = note
+            return result
+
+        return evaluate
+
+
+def _travel_km(params: Params) -> Optional[int]:
+    from . import travel
+
+    index = travel.current()
+    return None if index is None else index.km_for(params)
+
+
+def load_spec(path: Path) -> Dict[str, Any]:
+    try:
+        spec = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        raise SpecError(f"Unable to read service spec {path.name}: {exc}") from exc
+    if not isinstance(spec, dict) or "pricing" not in spec:
+        raise SpecError(f"Service spec {path.name} must be an object with a 'pricing' section")
+    return spec
+
+
+def load_module(name: str, path: Path) -> ModuleType:
+    """Build a service module from the spec at `path`.
+
+    The module's `calculate` looks `_fetch_pricing_config` up on the module at
+    call time, so `pricing.bind_module` can route it through snapshots.
+    """
+    try:
+        rules = ServiceRules(name, load_spec(path))
+    except (KeyError, TypeError) as exc:
+        raise SpecError(f"Invalid service spec {path.name}: {exc!r}") from exc
+
+    module = ModuleType(name.replace("-", "_"), rules.description)
+    module.__file__ = str(path)
+    module.RULES = rules  # type: ignore[attr-defined]
+    module._fetch_pricing_config = rules.fetch_pricing_config  # type: ignore[attr-defined]
+
+    def calculate(**params: Any) -> dict:
+        p, body = rules.prepare(params)
+        cfg = module._fetch_pricing_config()  # type: ignore[attr-defined]
+        return rules.compiled(cfg)(p, body)
+
+    def calculate_batch(rows: Sequence[Params]) -> List[Any]:
+        return rules.price_batch(rows, module._fetch_pricing_config)  # type: ignore[attr-defined]
+
+    calculate.__signature__ = rules.signature  # type: ignore[attr-defined]
+    calculate.__doc__ = rules.description
+    calculate.__module__ = module.__name__
+    module.calculate = calculate  # type: ignore[attr-defined]
+    module.calculate_batch = calculate_batch  # type: ignore[attr-defined]
+    return module
@@ -0,0 +1,148 @@
+"""Effective-dated pricing schedules.
+
+A schedule file (`RATE_ENGINE_PRICING_SCHEDULE`) lists price changes together
+with the window in which they apply:
+
+    {"windows": [
+      {"service": "pre_purchase",
+       "effective_from": "2026-11-01T00:00:00+10:00",
+       "effective_to": "2027-07-01T00:00:00+10:00",
+       "fields": {"base_price": 480}}
+    ]}
+
+`fields` override keys of the service's pricing config (the names under its
+spec's `pricing.fields`) from `effective_from` (inclusive) until
+`effective_to` (exclusive; omit it for an open-ended change). Timestamps
+without a UTC offset are read as UTC, and a bare date means midnight. The
+windows of one service must not overlap.
+
+The windows of each service are kept sorted by start. The window covering a
+quote date is then found with one bisect. Quotes are priced at the current
+time unless a date is given (see `pricing.using`), so a scheduled change takes
+effect on its own without any cache flush, and past quotes can be reproduced.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from bisect import bisect_right
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from . import pricing
+from .reloading import ReloadingFile
+
+
+class ScheduleError(ValueError):
+    """Raised for malformed schedule files or overlapping windows."""
+
+
+def parse_time(value: Any) -> float:
+    """Epoch seconds for an ISO 8601 date or datetime (UTC when it has no offset)."""
+    if isinstance(value, datetime):
+        moment = value
+    elif isinstance(value, date):
+        moment = datetime(value.year, value.month, value.day)
+    elif isinstance(value, str):
+        try:
+            moment = datetime.fromisoformat(value.strip())
+        except ValueError:
+            raise ValueError(f"Invalid date '{value}'; expected ISO 8601") from None
+    else:
+        raise ValueError("Dates must be ISO 8601 strings")
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+class PricingWindow:
+    """One scheduled change: `fields` applied to a service's config in [start, end)."""
+
+    def __init__(self, service: str, start: float, end: Optional[float], fields: Mapping[str, Any]) -> None:
+        self.service = service
+        self.start = start
+        self.end = end
+        self.overrides = pricing.ConfigOverrides(service, fields)
+
+
+class PricingSchedule:
+    """Sorted per-service interval index over non-overlapping pricing windows."""
+
+    def __init__(self, windows: Sequence[PricingWindow]) -> None:
+        by_service: Dict[str, List[PricingWindow]] = {}
+        for window in windows:
+            by_service.setdefault(window.service, []).append(window)
+        self._index: Dict[str, Tuple[List[float], List[PricingWindow]]] = {}
+        for service, service_windows in by_service.items():
+            service_windows.sort(key=lambda window: window.start)
+            for previous, window in zip(service_windows, service_windows[1:]):
+                if previous.end is None or previous.end > window.start:
+                    raise ScheduleError(f"Pricing windows for '{service}' overlap")
+            self._index[service] = ([window.start for window in service_windows], service_windows)
+
+    def window_for(self, service: str, when: float) -> Optional[PricingWindow]:
+        """The window of `service` in effect at `when` (epoch seconds), if any."""
+        index = self._index.get(service)
+        if index is None:
+            return None
+        starts, windows = index
+        position = bisect_right(starts, when) - 1
+        if position < 0:
+            return None
+        window = windows[position]
+        return window if window.end is None or when < window.end else None
+
+    def overlay_count(self, service: str) -> int:
+        """Number of pricing windows scheduled for `service`."""
+        index = self._index.get(service)
+        return 0 if index is None else len(index[1])
+
+
+def _window(item: Any) -> PricingWindow:
+    if not isinstance(item, Mapping):
+        raise ScheduleError("Each schedule window must be an object")
+    service, fields = item.get("service"), item.get("fields")
+    if not isinstance(service, str) or not service or not isinstance(fields, Mapping) or not fields:
+        raise ScheduleError("Each schedule window needs a 'service' and non-empty 'fields'")
+    try:
+        start = parse_time(item["effective_from"])
+        end = parse_time(item["effective_to"]) if item.get("effective_to") is not None else None
+    except KeyError:
+        raise ScheduleError(f"Schedule window for '{service}' needs 'effective_from'") from None
+    except ValueError as exc:
+        raise ScheduleError(f"Schedule window for '{service}': {exc}") from None
+    if end is not None and end <= start:
+        raise ScheduleError(f"Schedule window for '{service}' ends before it starts")
+    return PricingWindow(service, start, end, fields)
+
+
+def load(path: Path) -> PricingSchedule:
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        raise ScheduleError(f"Unable to read pricing schedule {path}: {exc}") from exc
+    windows = payload.get("windows") if isinstance(payload, dict) else None
+    if not isinstance(windows, list):
+        raise ScheduleError("Pricing schedule must be an object with a 'windows' list")
+    return PricingSchedule([_window(item) for item in windows])
+
+
+class ScheduleFile(ReloadingFile[PricingSchedule]):
+    """A schedule file, reloaded when it changes."""
+
+    def __init__(self, path: Path, interval: float = 5.0) -> None:
+        super().__init__(path, load, PricingSchedule([]), interval)
+
+    def window_for(self, service: str, when: float) -> Optional[PricingWindow]:
+        return self.current().window_for(service, when)
+
+    def overlay_count(self, service: str) -> int:
+        return self.current().overlay_count(service)
+
+
+def from_env() -> Optional[ScheduleFile]:
+    """The schedule named by RATE_ENGINE_PRICING_SCHEDULE, or None when it is unset."""
+    path = os.getenv("RATE_ENGINE_PRICING_SCHEDULE")
+    return ScheduleFile(Path(path)) if path else None
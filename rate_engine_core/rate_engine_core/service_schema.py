@@ -0,0 +1,143 @@
+"""Typed request validators derived from each service's `calculate()` signature.
+
+A `ServiceSchema` is built once when a service is loaded. It knows which
+parameters `calculate` declares, which of them are required and how to
+coerce each one, so requests can be validated at the edge before any pricing
+fetch or calculation runs.
+"""
+
+from __future__ import annotations
+
+import collections.abc
+import inspect
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Tuple, get_args, get_origin
+
+
+Coercer = Callable[[str, Any], Any]
+
+_BOOL_STRINGS = {"yes": True, "true": True, "1": True, "no": False, "false": False, "0": False}
+
+
+def _parse_int_string(value: str) -> int | None:
+    stripped = value.strip()
+    if stripped.isdigit() or (stripped.startswith("-") and stripped[1:].isdigit()):
+        return int(stripped)
+    return None
+
+
+def coerce_bool(name: str, value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str):
+        parsed = _BOOL_STRINGS.get(value.strip().lower())
+        if parsed is not None:
+            return parsed
+    raise ValueError(f"'{name}' must be a boolean (true/false or yes/no)")
+
+
+def coerce_int(name: str, value: Any) -> int:
+    if isinstance(value, bool):  # prevent True -> 1
+        raise ValueError(f"'{name}' must be an integer")
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        parsed = _parse_int_string(value)
+        if parsed is not None:
+            return parsed
+    raise ValueError(f"'{name}' must be an integer")
+
+
+def coerce_float(name: str, value: Any) -> float:
+    if isinstance(value, bool):
+        raise ValueError(f"'{name}' must be a number")
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value.strip())
+        except ValueError:
+            pass
+    raise ValueError(f"'{name}' must be a number")
+
+
+def coerce_str(name: str, value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    raise ValueError(f"'{name}' must be a string")
+
+
+def coerce_int_list(name: str, value: Any) -> list[int]:
+    if not isinstance(value, (list, tuple)):
+        raise ValueError(f"'{name}' must be a list of integers")
+    items: list[int] = []
+    for item in value:
+        try:
+            items.append(coerce_int(name, item))
+        except ValueError:
+            raise ValueError(f"'{name}' must contain integers only") from None
+    return items
+
+
+_SCALAR_COERCERS: Dict[Any, Coercer] = {
+    bool: coerce_bool,
+    int: coerce_int,
+    float: coerce_float,
+    str: coerce_str,
+}
+_SEQUENCE_ORIGINS = {list, tuple, collections.abc.Iterable, collections.abc.Sequence}
+# Parameters whose annotation is too loose (e.g. `Any`) but whose shape is known
+_NAMED_COERCERS: Dict[str, Coercer] = {
+    "stages": coerce_int_list,
+}
+
+
+def _coercer_for(name: str, annotation: Any) -> Coercer | None:
+    coercer = _SCALAR_COERCERS.get(annotation)
+    if coercer is not None:
+        return coercer
+    if get_origin(annotation) in _SEQUENCE_ORIGINS and get_args(annotation)[:1] == (int,):
+        return coerce_int_list
+    return _NAMED_COERCERS.get(name)
+
+
+@dataclass(frozen=True)
+class ServiceSchema:
+    coercers: Dict[str, Coercer]
+    required: Tuple[str, ...]
+
+    @classmethod
+    def from_callable(cls, func: Callable[..., Any]) -> "ServiceSchema":
+        """Introspect `func`'s signature; string annotations are resolved against its module."""
+        try:
+            signature = inspect.signature(func, eval_str=True)
+        except (NameError, TypeError):
+            signature = inspect.signature(func)
+
+        coercers: Dict[str, Coercer] = {}
+        required: list[str] = []
+        for param in signature.parameters.values():
+            if param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD):
+                continue
+            coercer = _coercer_for(param.name, param.annotation)
+            if coercer is not None:
+                coercers[param.name] = coercer
+            if param.default is param.empty:
+                required.append(param.name)
+        return cls(coercers=coercers, required=tuple(required))
+
+    def coerce(self, name: str, value: Any) -> Any:
+        """Coerce one parameter value; unknown parameters pass through unchanged."""
+        coercer = self.coercers.get(name)
+        if coercer is None:
+            return value
+        return coercer(name, value)
+
+    def check_required(self, params: Dict[str, Any]) -> None:
+        for name in self.required:
+            if name not in params:
+                raise ValueError(f"Missing required parameter '{name}'")
@@ -0,0 +1,169 @@
+"""Materialized price tables for bounded input domains.
+
+Most residential services price a small practical domain: 0-10 bedrooms and
+bathrooms, a few levels and some boolean options. A spec can declare that
+domain in a `table` section:
+
+    "table": {"bedrooms": {"min": 0, "max": 10}, "levels": {"min": 0, "max": 5},
+              "basement": [false, true]}
+
+Every param the service's charges read must appear in it. For each pricing
+config the charge formulas are evaluated once over the whole domain with the
+vectorized kernels, and the results are stored in a dense `array("q")`. A
+request inside the domain then costs one index computation and one array read.
+Requests outside the domain, and every request made while the table is still
+being built, use the formula.
+
+Tables are built on one background thread, in the order their pricing
+configs were first compiled, so a pricing change never blocks quoting. A
+config compiled again (an equal one from a new snapshot, or one that was
+evicted) reuses its table. A process forked while builds are pending (e.g. a
+preforked worker) builds them again itself. Set
+`RATE_ENGINE_LOOKUP_TABLES=0` to disable them.
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import os
+import threading
+from array import array
+from collections import deque
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.getenv("RATE_ENGINE_LOOKUP_TABLES", "1") != "0"
+
+# Slots waiting for their table, oldest first; a slot stays queued until its build finishes
+_PENDING: "deque[TableSlot]" = deque()
+_PENDING_LOCK = threading.Lock()
+# The thread working through `_PENDING`, while there is one
+_BUILDER: Optional[threading.Thread] = None
+
+
+def domain_values(name: str, spec: Any) -> List[Any]:
+    """Values of one table dimension: a list, or an inclusive {"min", "max"} integer range."""
+    if isinstance(spec, list) and spec:
+        return list(spec)
+    if isinstance(spec, Mapping) and isinstance(spec.get("min"), int) and isinstance(spec.get("max"), int):
+        return list(range(spec["min"], spec["max"] + 1))
+    raise ValueError(f"Table dimension '{name}' must be a value list or a min/max range")
+
+
+class LookupTable:
+    """Dense table of amounts over the cartesian product of its dimensions."""
+
+    def __init__(self, dimensions: Sequence[Tuple[str, Sequence[Any]]], values: array) -> None:
+        # Per dimension: value -> its contribution to the flat index (position * stride)
+        strides = []
+        stride = 1
+        for _, domain in reversed(dimensions):
+            strides.append(stride)
+            stride *= len(domain)
+        self.offsets: Tuple[Tuple[str, Dict[Any, int]], ...] = tuple(
+            (name, {value: position * step for position, value in enumerate(domain)})
+            for (name, domain), step in zip(dimensions, reversed(strides))
+        )
+        self.values = values
+
+    def get(self, p: Mapping[str, Any]) -> Optional[int]:
+        """Amount for `p`, or None when any dimension is outside the table."""
+        index = 0
+        try:
+            for name, offsets in self.offsets:
+                offset = offsets.get(p[name])
+                if offset is None:
+                    return None
+                index += offset
+        except TypeError:  # unhashable value: never part of the domain
+            return None
+        return self.values[index]
+
+
+def build(body: Any, cfg: Dict[str, Any], dimensions: Sequence[Tuple[str, Sequence[Any]]]) -> Optional[LookupTable]:
+    """Evaluate `body`'s charges against `cfg` over the whole domain in one vectorized pass."""
+    from . import kernels
+
+    names = [name for name, _ in dimensions]
+    rows = [dict(zip(names, combination)) for combination in itertools.product(*(domain for _, domain in dimensions))]
+    amounts, _ = kernels._compile_body(body, cfg)(kernels.Columns(rows))
+    if amounts.dtype.kind not in "iu":
+        return None  # fractional prices are left to the formula
+    return LookupTable(dimensions, array("q", amounts.tolist()))
+
+
+class TableSlot:
+    """Holds the table for one pricing config once its background build finishes."""
+
+    def __init__(self) -> None:
+        self.table: Optional[LookupTable] = None
+        self._name = ""
+        self._build_table: Optional[Callable[[], Optional[LookupTable]]] = None
+        self._ready = threading.Event()
+
+    def build_in_background(self, name: str, build_table: Callable[[], Optional[LookupTable]]) -> None:
+        """Queue the build on the shared builder thread."""
+        self._name = name
+        self._build_table = build_table
+        with _PENDING_LOCK:
+            _PENDING.append(self)
+            _start_builder()
+
+    def _build(self) -> None:
+        try:
+            if self._build_table is not None:
+                self.table = self._build_table()
+        except Exception:
+            logger.exception("Building the lookup table for %r failed; using the formula", self._name)
+        finally:
+            # Drops the pricing config the build held
+            self._build_table = None
+            self._ready.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._ready.wait(timeout)
+
+
+def _start_builder() -> None:
+    """Start the builder thread unless it is running; call with `_PENDING_LOCK` held."""
+    global _BUILDER
+    if _BUILDER is None and _PENDING:
+        _BUILDER = threading.Thread(target=_build_pending, name="lookup-tables", daemon=True)
+        _BUILDER.start()
+
+
+def _build_pending() -> None:
+    global _BUILDER
+    while True:
+        with _PENDING_LOCK:
+            if not _PENDING:
+                _BUILDER = None
+                return
+            slot = _PENDING[0]
+        slot._build()
+        with _PENDING_LOCK:
+            _PENDING.popleft()
+
+
+def _rebuild_after_fork() -> None:
+    """In a forked child the builder thread is gone: restart every build it had not finished."""
+    global _PENDING_LOCK, _BUILDER
+    _PENDING_LOCK = threading.Lock()
+    _BUILDER = None
+    unfinished = [slot for slot in _PENDING if not slot._ready.is_set()]
+    _PENDING.clear()
+    for slot in unfinished:
+        # The parent's builder may have held the event's lock at the fork
+        slot._ready = threading.Event()
+        if slot._build_table is None:
+            slot._ready.set()  # forked between finishing the build and signalling it
+        else:
+            _PENDING.append(slot)
+    _start_builder()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_rebuild_after_fork)
@@ -0,0 +1,69 @@
+"""Shared tax and discount stage.
+
+Services whose spec sets `"gst": true` only compute their quote. This stage
+runs after the formula, in `rules` for single quotes and in `kernels` for
+batches. It adds GST, clamps the customer discount, and derives the payable
+price, all in integer cents (see `money.py`).
+
+The tax config comes from `GST_PERCENTAGE` (default 10). It is parsed once per
+distinct value and attached to each GST service's pricing config under
+`"tax"`, so pricing snapshots pin it and a change shows up in their versions.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from . import money
+
+
+GST_PERCENTAGE_KEY = "GST_PERCENTAGE"
+DEFAULT_GST_PERCENTAGE = 10.0
+
+
+@dataclass(frozen=True)
+class TaxConfig:
+    gst_percentage: float
+    # The same rate in basis points, for integer-cent arithmetic
+    gst_points: int
+
+
+@lru_cache(maxsize=8)
+def _parse(raw: Optional[str]) -> TaxConfig:
+    percentage = float(raw or DEFAULT_GST_PERCENTAGE)
+    return TaxConfig(gst_percentage=percentage, gst_points=money.to_basis_points(percentage))
+
+
+def current() -> TaxConfig:
+    """The tax config for the current environment; the same object while the value is unchanged."""
+    from .rules import read_env_value
+
+    return _parse(read_env_value(GST_PERCENTAGE_KEY))
+
+
+def apply(config: TaxConfig, result: Dict[str, Any], quote_cents: int, discount: Any) -> None:
+    """Add gst, price_including_gst, discount and payable_price for one quote to `result`."""
+    gst_cents = money.percent_of(quote_cents, config.gst_points)
+    including_cents = quote_cents + gst_cents
+    discount_amount = max(0, int(discount))  # Ensure non-negative
+    payable_cents = max(0, including_cents - money.to_cents(discount_amount))  # Cannot be negative
+    result["gst"] = money.to_dollars(gst_cents)
+    result["price_including_gst"] = money.to_dollars(including_cents)
+    result["discount"] = discount_amount
+    result["payable_price"] = money.to_dollars(payable_cents)
+
+
+def apply_batch(config: TaxConfig, columns: Dict[str, List[Any]], quote_cents: Any, discounts: Any) -> None:
+    """Vector `apply`: int64 quote cents and discount columns -> per-row result columns."""
+    import numpy as np
+
+    gst_cents = money.percent_of_array(quote_cents, config.gst_points)
+    including_cents = quote_cents + gst_cents
+    discount = np.maximum(0, discounts)
+    payable_cents = np.maximum(0, including_cents - discount * money.CENTS_PER_DOLLAR)
+    columns["gst"] = money.to_dollars_array(gst_cents).tolist()
+    columns["price_including_gst"] = money.to_dollars_array(including_cents).tolist()
+    columns["discount"] = discount.tolist()
+    columns["payable_price"] = money.to_dollars_array(payable_cents).tolist()
@@ -0,0 +1,203 @@
+"""Out-of-area travel distance from the property's postcode or coordinates.
+
+Inspector bases are listed in a JSON file named by `RATE_ENGINE_INSPECTOR_BASES`:
+
+    {"included_km": 30,
+     "bases": [
+       {"name": "Parramatta", "postcode": "2150"},
+       {"name": "Newcastle", "latitude": -32.9267, "longitude": 151.7789}
+     ]}
+
+Postcodes are located with a local postcode-centroid table. This is a CSV with
+`postcode,latitude,longitude` columns, read from `RATE_ENGINE_POSTCODE_CENTROIDS`
+(default `data/postcode_centroids.csv` next to this module). No external
+geocoding service is called. Bases without a readable, non-empty table fail
+to load, so a missing table stops the app at startup instead of quietly
+turning every postcode away. A postcode the table does not list is charged no
+travel surcharge.
+
+The charged distance is the great-circle distance to the nearest base, less
+`included_km`, rounded up to whole kilometres. Bases sit in a small KD-tree over
+unit vectors, where straight-line (chord) distance orders points the same way
+as great-circle distance. Every postcode's distance is worked out once when
+the table loads, so a postcode quote costs one dict lookup and a coordinate
+quote costs one tree search.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import math
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .zones import normalize_postcode
+
+EARTH_RADIUS_KM = 6371.0088
+
+DEFAULT_CENTROIDS = Path(__file__).resolve().parent / "data" / "postcode_centroids.csv"
+
+Point = Tuple[float, float, float]
+
+
+def _unit(latitude: float, longitude: float) -> Point:
+    lat, lon = math.radians(latitude), math.radians(longitude)
+    return (math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon), math.sin(lat))
+
+
+def _coordinate(value: Any, name: str, limit: float) -> float:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"'{name}' must be a number") from None
+    if isinstance(value, bool) or not -limit <= number <= limit:
+        raise ValueError(f"'{name}' must be between -{limit:g} and {limit:g}")
+    return number
+
+
+class _KDTree:
+    """Nearest-neighbour search over 3-d points; nodes are (point, index, axis, left, right)."""
+
+    def __init__(self, points: Sequence[Point]) -> None:
+        self._root = self._build([(point, index) for index, point in enumerate(points)], 0)
+
+    def _build(self, items: List[Tuple[Point, int]], depth: int) -> Optional[tuple]:
+        if not items:
+            return None
+        axis = depth % 3
+        items.sort(key=lambda item: item[0][axis])
+        middle = len(items) // 2
+        point, index = items[middle]
+        return (point, index, axis, self._build(items[:middle], depth + 1), self._build(items[middle + 1 :], depth + 1))
+
+    def nearest(self, query: Point) -> Tuple[float, int]:
+        """(squared chord distance, point index) of the point nearest `query`."""
+        best = [math.inf, -1]
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            point, index, axis, left, right = node
+            distance = (point[0] - query[0]) ** 2 + (point[1] - query[1]) ** 2 + (point[2] - query[2]) ** 2
+            if distance < best[0]:
+                best[0], best[1] = distance, index
+            offset = query[axis] - point[axis]
+            near, far = (left, right) if offset < 0 else (right, left)
+            # The far side can only hold a closer point if the splitting plane is within reach
+            if offset * offset < best[0]:
+                stack.append(far)
+            stack.append(near)
+        return best[0], best[1]
+
+
+class TravelIndex:
+    """Nearest inspector base for postcodes and coordinates."""
+
+    def __init__(
+        self,
+        bases: Sequence[Tuple[str, float, float]],
+        centroids: Mapping[str, Tuple[float, float]],
+        included_km: float = 0.0,
+    ) -> None:
+        if not bases:
+            raise ValueError("At least one inspector base is required")
+        self.base_names = [name for name, _, _ in bases]
+        self.included_km = included_km
+        self._tree = _KDTree([_unit(latitude, longitude) for _, latitude, longitude in bases])
+        # Charged kilometres per postcode, precomputed so postcode quotes skip the tree
+        self._postcode_km: Dict[str, int] = {
+            code: self._charged_km(_unit(*point)) for code, point in centroids.items()
+        }
+
+    def _charged_km(self, point: Point) -> int:
+        chord_squared, _ = self._tree.nearest(point)
+        distance = 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(chord_squared) / 2))
+        return max(0, math.ceil(distance - self.included_km - 1e-9))
+
+    def km_for_postcode(self, postcode: Any) -> Optional[int]:
+        """Charged km for `postcode`; None (no surcharge) when the centroid table does not list it."""
+        return self._postcode_km.get(normalize_postcode(postcode))
+
+    def km_for_coordinates(self, latitude: Any, longitude: Any) -> int:
+        return self._charged_km(_unit(_coordinate(latitude, "latitude", 90), _coordinate(longitude, "longitude", 180)))
+
+    def km_for(self, params: Mapping[str, Any]) -> Optional[int]:
+        """Charged km for a quote's 'latitude'/'longitude' or 'postcode'; None when it has neither or the postcode is unknown."""
+        if params.get("latitude") is not None or params.get("longitude") is not None:
+            return self.km_for_coordinates(params.get("latitude"), params.get("longitude"))
+        if params.get("postcode") is not None:
+            return self.km_for_postcode(params["postcode"])
+        return None
+
+
+def load_centroids(path: Path) -> Dict[str, Tuple[float, float]]:
+    """The postcode-centroid table at `path`; raises ValueError when it is missing or empty."""
+    centroids: Dict[str, Tuple[float, float]] = {}
+    try:
+        handle = path.open(newline="", encoding="utf-8")
+    except OSError as exc:
+        raise ValueError(
+            f"Unable to read the postcode centroid table {path} ({exc.strerror}); "
+            "set RATE_ENGINE_POSTCODE_CENTROIDS to a postcode,latitude,longitude CSV"
+        ) from exc
+    with handle:
+        for row in csv.DictReader(handle):
+            try:
+                centroids[normalize_postcode(row["postcode"])] = (
+                    _coordinate(row["latitude"], "latitude", 90),
+                    _coordinate(row["longitude"], "longitude", 180),
+                )
+            except (KeyError, ValueError) as exc:
+                raise ValueError(f"Invalid postcode centroid row {row!r} in {path}: {exc}") from None
+    if not centroids:
+        raise ValueError(f"The postcode centroid table {path} has no rows")
+    return centroids
+
+
+def load(bases_path: Path, centroids_path: Path) -> TravelIndex:
+    try:
+        payload = json.loads(bases_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        raise ValueError(f"Unable to read inspector bases {bases_path}: {exc}") from exc
+    if not isinstance(payload, dict) or not isinstance(payload.get("bases"), list):
+        raise ValueError("Inspector bases file must be an object with a 'bases' list")
+    centroids = load_centroids(centroids_path)
+    bases: List[Tuple[str, float, float]] = []
+    for item in payload["bases"]:
+        if not isinstance(item, Mapping) or not isinstance(item.get("name"), str):
+            raise ValueError("Each inspector base needs a 'name'")
+        if item.get("postcode") is not None:
+            point = centroids.get(normalize_postcode(item["postcode"]))
+            if point is None:
+                raise ValueError(f"Inspector base '{item['name']}' has a postcode missing from {centroids_path}")
+            bases.append((item["name"], *point))
+        else:
+            bases.append(
+                (
+                    item["name"],
+                    _coordinate(item.get("latitude"), "latitude", 90),
+                    _coordinate(item.get("longitude"), "longitude", 180),
+                )
+            )
+    included_km = payload.get("included_km", 0)
+    if isinstance(included_km, bool) or not isinstance(included_km, (int, float)) or included_km < 0:
+        raise ValueError("'included_km' must be a non-negative number")
+    return TravelIndex(bases, centroids, float(included_km))
+
+
+@lru_cache(maxsize=1)
+def current() -> Optional[TravelIndex]:
+    """The index configured by RATE_ENGINE_INSPECTOR_BASES (loaded once), or None when it is unset.
+
+    Apps call this at startup, so a bad bases file or centroid table fails there.
+    """
+    from .rules import read_env_value
+
+    bases_path = read_env_value("RATE_ENGINE_INSPECTOR_BASES")
+    if not bases_path:
+        return None
+    centroids_path = read_env_value("RATE_ENGINE_POSTCODE_CENTROIDS")
+    return load(Path(bases_path), Path(centroids_path) if centroids_path else DEFAULT_CENTROIDS)
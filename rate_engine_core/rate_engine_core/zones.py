@@ -0,0 +1,160 @@
+"""Regional pricing zones resolved from the property's postcode.
+
+A zones file (`RATE_ENGINE_PRICING_ZONES`) maps postcodes to zones, and each
+zone to per-service pricing overlays:
+
+    {"zones": [
+      {"id": "sydney_metro",
+       "ranges": [["2000", "2234"], ["2555", "2574"]],
+       "postcodes": ["2745"],
+       "services": {"pre_purchase": {"base_price": 480}}},
+      {"id": "regional_nsw", "ranges": [["2250", "2899"]],
+       "services": {"pre_purchase": {"base_price": 420}}}
+    ]}
+
+`ranges` are inclusive postcode ranges and `postcodes` list single ones. A
+listed postcode takes precedence over the ranges, so one suburb can be carved
+out of a wider zone. Ranges must not overlap, and no postcode may be listed
+twice. A zone's `services` override keys of that service's pricing config,
+like a schedule window does (see `pricing.ConfigOverrides`). A zone without an
+entry for a service leaves that service's prices flat.
+
+Ranges are kept sorted by their first postcode, so a quote's zone is one dict
+probe and at most one bisect. Each overlay builds its config once per base
+config, so a zone's evaluators are compiled once and then served like flat
+pricing.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from bisect import bisect_right
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from . import pricing
+from .reloading import ReloadingFile
+
+
+class ZoneError(ValueError):
+    """Raised for malformed zone files and overlapping postcode ranges."""
+
+
+def normalize_postcode(value: Any) -> str:
+    """Postcodes as 4-digit strings (Australian postcodes may start with 0)."""
+    if isinstance(value, bool):
+        raise ValueError("'postcode' must be a string or integer")
+    code = f"{value:04d}" if isinstance(value, int) else str(value).strip()
+    return code.zfill(4) if code.isdigit() else code.upper()
+
+
+class Zone:
+    def __init__(self, zone_id: str, services: Mapping[str, Mapping[str, Any]]) -> None:
+        self.id = zone_id
+        self.overlays = {service: pricing.ConfigOverrides(service, fields) for service, fields in services.items()}
+
+    def overrides_for(self, service: str) -> Optional[pricing.ConfigOverrides]:
+        return self.overlays.get(service)
+
+
+class ZoneIndex:
+    """Single postcodes by code plus a sorted index of non-overlapping numeric ranges."""
+
+    def __init__(self, postcodes: Mapping[str, Zone], ranges: Sequence[Tuple[int, int, Zone]]) -> None:
+        self._postcodes = dict(postcodes)
+        ordered = sorted(ranges, key=lambda item: item[0])
+        for (_, previous_end, previous), (start, _, zone) in zip(ordered, ordered[1:]):
+            if start <= previous_end:
+                raise ZoneError(f"Postcode ranges of '{previous.id}' and '{zone.id}' overlap at {start:04d}")
+        self._starts = [start for start, _, _ in ordered]
+        self._ranges = ordered
+
+    def zone_for(self, postcode: Any) -> Optional[Zone]:
+        """The zone containing `postcode`, if any."""
+        try:
+            code = normalize_postcode(postcode)
+        except ValueError:
+            return None
+        zone = self._postcodes.get(code)
+        if zone is not None or not code.isdigit():
+            return zone
+        number = int(code)
+        position = bisect_right(self._starts, number) - 1
+        if position < 0:
+            return None
+        _, end, zone = self._ranges[position]
+        return zone if number <= end else None
+
+    def overlay_count(self, service: str) -> int:
+        """Number of zones with an overlay for `service`."""
+        zones = {id(zone): zone for zone in self._postcodes.values()}
+        zones.update((id(zone), zone) for _, _, zone in self._ranges)
+        return sum(1 for zone in zones.values() if zone.overrides_for(service) is not None)
+
+
+def _postcode_number(value: Any, zone_id: str) -> int:
+    code = normalize_postcode(value)
+    if not code.isdigit():
+        raise ZoneError(f"Zone '{zone_id}' has a non-numeric range bound '{code}'")
+    return int(code)
+
+
+def load(path: Path) -> ZoneIndex:
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        raise ZoneError(f"Unable to read pricing zones {path}: {exc}") from exc
+    items = payload.get("zones") if isinstance(payload, dict) else None
+    if not isinstance(items, list):
+        raise ZoneError("Pricing zones file must be an object with a 'zones' list")
+
+    postcodes: Dict[str, Zone] = {}
+    ranges: List[Tuple[int, int, Zone]] = []
+    seen = set()
+    for item in items:
+        zone_id = item.get("id") if isinstance(item, Mapping) else None
+        if not isinstance(zone_id, str) or not zone_id or zone_id in seen:
+            raise ZoneError("Each pricing zone needs a unique 'id'")
+        seen.add(zone_id)
+        services = item.get("services", {})
+        if not isinstance(services, Mapping) or not all(isinstance(fields, Mapping) for fields in services.values()):
+            raise ZoneError(f"Zone '{zone_id}': 'services' must map service names to pricing fields")
+        zone = Zone(zone_id, services)
+        try:
+            for code in item.get("postcodes", ()):
+                code = normalize_postcode(code)
+                if code in postcodes:
+                    raise ZoneError(f"Postcode {code} is listed by both '{postcodes[code].id}' and '{zone_id}'")
+                postcodes[code] = zone
+            for bounds in item.get("ranges", ()):
+                if not isinstance(bounds, list) or len(bounds) != 2:
+                    raise ZoneError(f"Zone '{zone_id}': each range must be [first, last]")
+                start, end = (_postcode_number(bound, zone_id) for bound in bounds)
+                if end < start:
+                    raise ZoneError(f"Zone '{zone_id}' has a range that ends before it starts")
+                ranges.append((start, end, zone))
+        except ZoneError:
+            raise
+        except (TypeError, ValueError) as exc:
+            raise ZoneError(f"Zone '{zone_id}': {exc}") from None
+    return ZoneIndex(postcodes, ranges)
+
+
+class ZonesFile(ReloadingFile[ZoneIndex]):
+    """A zones file, reloaded when it changes."""
+
+    def __init__(self, path: Path, interval: float = 5.0) -> None:
+        super().__init__(path, load, ZoneIndex({}, []), interval)
+
+    def zone_for(self, postcode: Any) -> Optional[Zone]:
+        return self.current().zone_for(postcode)
+
+    def overlay_count(self, service: str) -> int:
+        return self.current().overlay_count(service)
+
+
+def from_env() -> Optional[ZonesFile]:
+    """The zones named by RATE_ENGINE_PRICING_ZONES, or None when it is unset."""
+    path = os.getenv("RATE_ENGINE_PRICING_ZONES")
+    return ZonesFile(Path(path)) if path else None
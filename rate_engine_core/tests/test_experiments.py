@@ -0,0 +1,89 @@
+"""Experiment subjects are bucketed deterministically, in proportion to the variant weights."""
+
+import json
+import types
+from collections import Counter
+
+import pytest
+
+from rate_engine_core import experiments, pricing
+from rate_engine_core.experiments import ExperimentError
+
+EXPERIMENT = {
+    "id": "pp-base-2026q4",
+    "service": "pre_purchase",
+    "variants": [
+        {"id": "control", "weight": 3},
+        {"id": "base_480", "weight": 1, "fields": {"base_price": 480}},
+    ],
+}
+
+
+def _load(tmp_path, *items):
+    path = tmp_path / "experiments.json"
+    path.write_text(json.dumps({"experiments": list(items)}))
+    return experiments.load(path)
+
+
+def test_assignment_is_stable_across_loads(tmp_path):
+    first, second = _load(tmp_path, EXPERIMENT), _load(tmp_path, EXPERIMENT)
+    for subject in (f"customer-{n}" for n in range(200)):
+        assert first.assign("pre_purchase", subject).id == second.assign("pre_purchase", subject).id
+
+
+def test_assignment_follows_the_weights(tmp_path):
+    index = _load(tmp_path, EXPERIMENT)
+    counts = Counter(index.assign("pre_purchase", f"customer-{n}").id for n in range(8000))
+    assert counts.keys() == {"control", "base_480"}
+    assert 0.22 < counts["base_480"] / 8000 < 0.28
+
+
+def test_changing_the_experiment_id_reshuffles_subjects(tmp_path):
+    renamed = _load(tmp_path, {**EXPERIMENT, "id": "pp-base-2027q1"})
+    original = _load(tmp_path, EXPERIMENT)
+    subjects = [f"customer-{n}" for n in range(500)]
+    moved = sum(
+        original.assign("pre_purchase", subject).id != renamed.assign("pre_purchase", subject).id
+        for subject in subjects
+    )
+    assert moved > 0
+
+
+def test_services_without_an_experiment_are_not_enrolled(tmp_path):
+    index = _load(tmp_path, EXPERIMENT)
+    assert index.assign("pre_sales", "customer-1") is None
+    assert index.overlay_count("pre_purchase") == 1
+    assert index.overlay_count("pre_sales") == 0
+
+
+@pytest.mark.parametrize(
+    "item,message",
+    [
+        ({**EXPERIMENT, "variants": EXPERIMENT["variants"][:1]}, "at least two variants"),
+        ({**EXPERIMENT, "variants": [{"id": "a"}, {"id": "a"}]}, "duplicate variant ids"),
+        ({**EXPERIMENT, "variants": [{"id": "a", "weight": 0}, {"id": "b"}]}, "positive integer 'weight'"),
+    ],
+)
+def test_malformed_experiments_are_rejected(tmp_path, item, message):
+    with pytest.raises(ExperimentError, match=message):
+        _load(tmp_path, item)
+
+
+def test_one_experiment_per_service(tmp_path):
+    with pytest.raises(ExperimentError, match="more than one experiment"):
+        _load(tmp_path, EXPERIMENT, {**EXPERIMENT, "id": "pp-other"})
+
+
+def test_bound_fetcher_prices_the_subjects_variant(tmp_path, monkeypatch):
+    module = types.ModuleType("fake_service")
+    module._fetch_pricing_config = lambda: {"base_price": 400}
+    pricing.bind_module("pre_purchase", module)
+    index = _load(tmp_path, EXPERIMENT)
+    monkeypatch.setattr(pricing, "_EXPERIMENTS", index)
+
+    for subject in (f"customer-{n}" for n in range(50)):
+        expected = 480 if index.assign("pre_purchase", subject).id == "base_480" else 400
+        with pricing.using(None, subject=subject):
+            assert module._fetch_pricing_config()["base_price"] == expected
+    with pricing.using(None):
+        assert module._fetch_pricing_config()["base_price"] == 400
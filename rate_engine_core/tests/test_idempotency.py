@@ -0,0 +1,55 @@
+"""The in-process idempotency store replays stored responses until they expire or are evicted."""
+
+import pytest
+
+from rate_engine_core import idempotency
+from rate_engine_core.idempotency import MemoryIdempotencyStore, StoredResponse
+
+
+def _response(body: bytes) -> StoredResponse:
+    return StoredResponse(fingerprint=idempotency.fingerprint(body), body=body)
+
+
+def test_stored_response_is_replayed_byte_for_byte():
+    store = MemoryIdempotencyStore()
+    stored = _response(b'{"quote_price":550}')
+    store.put("key-1", stored)
+    assert store.get("key-1") == stored
+    assert store.get("key-2") is None
+
+
+def test_fingerprint_tells_a_different_body_apart():
+    assert idempotency.fingerprint(b'{"bedrooms":3}') == idempotency.fingerprint(b'{"bedrooms":3}')
+    assert idempotency.fingerprint(b'{"bedrooms":3}') != idempotency.fingerprint(b'{"bedrooms":4}')
+
+
+def test_expired_responses_are_not_replayed():
+    store = MemoryIdempotencyStore(ttl=0)
+    store.put("key-1", _response(b"{}"))
+    assert store.get("key-1") is None
+
+
+def test_least_recently_used_keys_are_evicted():
+    store = MemoryIdempotencyStore(max_entries=2)
+    store.put("a", _response(b"a"))
+    store.put("b", _response(b"b"))
+    store.get("a")
+    store.put("c", _response(b"c"))
+    assert store.get("b") is None
+    assert store.get("a").body == b"a"
+    assert store.get("c").body == b"c"
+
+
+@pytest.mark.parametrize("key", ["", "   ", "k" * (idempotency.MAX_KEY_LENGTH + 1)])
+def test_invalid_keys_are_rejected(key):
+    with pytest.raises(ValueError):
+        idempotency.validate_key(key)
+
+
+def test_keys_are_stripped():
+    assert idempotency.validate_key("  retry-1 ") == "retry-1"
+
+
+def test_store_from_env_defaults_to_memory(monkeypatch):
+    monkeypatch.delenv("RATE_ENGINE_IDEMPOTENCY_REDIS_URL", raising=False)
+    assert isinstance(idempotency.store_from_env(), MemoryIdempotencyStore)
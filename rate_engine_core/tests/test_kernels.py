@@ -0,0 +1,117 @@
+"""Vectorized kernels must price exactly like the scalar `calculate()`.
+
+Every service spec of both engines is priced over a random parameter sweep
+through `calculate_batch` and `calculate`, against the spec defaults and
+against random configs; results (or the errors raised) must be identical.
+"""
+
+import inspect
+import json
+import random
+from pathlib import Path
+from typing import Any, Dict
+
+import pytest
+
+from rate_engine_core import addons, money, pricing, rules, tax
+from rate_engine_core.registry import ServiceRegistry
+
+ROOT = Path(__file__).resolve().parents[2]
+ENGINES = ("rate_engine", "rate_engine_internal")
+ROWS_PER_CONFIG = 500
+
+# Non-round cents so addon totals and GST exercise the integer-cent rounding
+ADDON_PRICES = {
+    "out_of_area_travel_surcharge_per_km": 1.35,
+    "pest_inspection": 120.5,
+    "drug_residue": 99.99,
+    "thermal_imaging_moisture_meter": None,
+    "drone_roof_inspection": 180.0,
+    "video": 45.0,
+}
+
+SERVICES = [
+    pytest.param(engine, path.stem, id=f"{engine}:{path.stem}")
+    for engine in ENGINES
+    for path in sorted((ROOT / engine / "services").glob("*.json"))
+]
+
+
+@pytest.fixture(scope="module", autouse=True)
+def addon_prices():
+    with pytest.MonkeyPatch.context() as patch:
+        for name, price in ADDON_PRICES.items():
+            patch.setitem(addons.ADDON_PRICES, name, price)
+            patch.setitem(addons.ADDON_PRICE_CENTS, name, None if price is None else money.to_cents(price))
+        yield
+
+
+@pytest.fixture(scope="module")
+def registries():
+    return {engine: ServiceRegistry(ROOT / engine, {}) for engine in ENGINES}
+
+
+def _random_params(service: rules.ServiceRules, rng: random.Random) -> Dict[str, Any]:
+    checks = list(service.spec.get("checks", ()))
+    for case in service.spec.get("variants", {}).get("cases", {}).values():
+        checks.extend(case.get("checks", ()))
+    choices = {check["one_of"]: check["values"] for check in checks if "one_of" in check}
+    stage_max = {check["stages"]: check["max"] for check in checks if "stages" in check}
+
+    params: Dict[str, Any] = {}
+    for name, param in service.signature.parameters.items():
+        if param.kind is inspect.Parameter.VAR_KEYWORD:
+            continue
+        if param.default is not param.empty and rng.random() < 0.3:
+            continue
+        if name in choices:
+            params[name] = rng.choice(choices[name])
+        elif name in stage_max:
+            params[name] = rng.sample(range(1, stage_max[name] + 1), rng.randint(1, stage_max[name]))
+        elif param.annotation is bool:
+            params[name] = rng.random() < 0.5
+        elif param.annotation is int:
+            params[name] = rng.choice((rng.randint(-1, 12), rng.randint(0, 80), rng.randint(0, 500000)))
+    return params
+
+
+def _random_config(service: rules.ServiceRules, rng: random.Random, defaults: bool) -> Dict[str, Any]:
+    cfg: Dict[str, Any] = {}
+    for name, field in service.spec["pricing"]["fields"].items():
+        kind = field.get("type", "int")
+        default = field.get("default", 0)
+        if kind == "str":
+            cfg[name] = str(default or "") if defaults else rng.choice(("", "Call us to confirm"))
+        elif kind == "float":
+            cfg[name] = float(default) if defaults else round(rng.uniform(0, 2000), 2)
+        else:
+            cfg[name] = default if defaults else rng.randint(0, 2000)
+    if service.spec.get("gst"):
+        cfg["tax"] = tax.current() if defaults else tax._parse("12.5")
+    return cfg
+
+
+def _outcome(value: Any) -> str:
+    if isinstance(value, Exception):
+        return f"{type(value).__name__}: {value}"
+    return json.dumps(value, sort_keys=True)
+
+
+@pytest.mark.parametrize("engine,name", SERVICES)
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_batch_matches_calculate(registries, engine, name, seed):
+    entry = registries[engine].get(name)
+    service = entry.module.RULES
+    rng = random.Random(f"{engine}:{name}:{seed}")
+    cfg = _random_config(service, rng, defaults=seed == 0)
+    rows = [_random_params(service, rng) for _ in range(ROWS_PER_CONFIG)]
+
+    snapshot = pricing.PricingSnapshot(configs={name: cfg}, version="test")
+    with pricing.using(snapshot):
+        batch = entry.module.calculate_batch(rows)
+        for params, got in zip(rows, batch):
+            try:
+                expected = entry.calculate(**params)
+            except Exception as exc:
+                expected = exc
+            assert _outcome(got) == _outcome(expected), params
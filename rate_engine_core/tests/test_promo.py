@@ -0,0 +1,108 @@
+"""Promo codes: Bloom-filtered lookup, service limits, and uses claimed only at acceptance."""
+
+import json
+
+import pytest
+
+from rate_engine_core import promo
+from rate_engine_core.promo import PromoError
+
+ALIASES = {"pre-purchase": "pre_purchase", "pre_purchase": "pre_purchase", "pre_sales": "pre_sales"}
+
+CODES = [
+    {"code": "Spring10", "percent_off": 10, "services": ["pre-purchase"], "max_uses": 2},
+    {"code": "WELCOME50", "amount_off": 50},
+    {"code": "OLD", "amount_off": 5, "expires": "2020-01-01"},
+]
+
+
+def _canonical_name(name):
+    try:
+        return ALIASES[name]
+    except KeyError:
+        raise LookupError(name) from None
+
+
+def _write(tmp_path, codes):
+    path = tmp_path / "promos.json"
+    path.write_text(json.dumps({"codes": codes}))
+    return path
+
+
+@pytest.fixture
+def codes(tmp_path):
+    return promo.PromoCodes(_write(tmp_path, CODES), promo.MemoryUsageCounter(), _canonical_name)
+
+
+def test_bloom_filter_has_no_false_negatives_and_few_false_positives():
+    members = [f"CODE{n}" for n in range(1000)]
+    bloom = promo.BloomFilter(len(members), error_rate=0.01)
+    for member in members:
+        bloom.add(member)
+    assert all(member in bloom for member in members)
+    false_positives = sum(f"GUESS{n}" in bloom for n in range(10000))
+    assert false_positives < 300
+
+
+def test_lookup_normalizes_codes(codes):
+    assert codes.lookup(" spring10 ").code == "SPRING10"
+    assert codes.lookup("welcome50").amount_off == 50
+
+
+@pytest.mark.parametrize(
+    "code,message",
+    [("NOPE", "Unknown promo code"), ("OLD", "expired"), ("", "non-empty string"), (5, "non-empty string")],
+)
+def test_lookup_rejects(codes, code, message):
+    with pytest.raises(PromoError, match=message):
+        codes.lookup(code)
+
+
+def test_service_limits_are_resolved_through_aliases(codes):
+    spring = codes.lookup("SPRING10")
+    assert spring.services == frozenset({"pre_purchase"})
+    codes.check(spring, "pre_purchase")
+    with pytest.raises(PromoError, match="does not apply"):
+        codes.check(spring, "pre_sales")
+
+
+def test_unknown_service_fails_the_load(tmp_path):
+    path = _write(tmp_path, [{"code": "X", "amount_off": 5, "services": ["nope"]}])
+    with pytest.raises(PromoError, match="unknown service 'nope'"):
+        promo.load(path, _canonical_name)
+
+
+def test_uses_are_counted_at_acceptance_once_per_claimant(codes):
+    spring = codes.lookup("SPRING10")
+    # Quoting only checks; any number of estimates leaves every use available
+    for _ in range(5):
+        codes.check(spring, "pre_purchase")
+
+    codes.claim(spring, "token-a")
+    codes.claim(spring, "token-a")  # a retried acceptance
+    codes.check(spring, "pre_purchase")
+    codes.claim(spring, "token-b")
+
+    with pytest.raises(PromoError, match="usage limit"):
+        codes.check(spring, "pre_purchase")
+    with pytest.raises(PromoError, match="usage limit"):
+        codes.claim(spring, "token-c")
+    # Claimants already counted can still accept
+    codes.claim(spring, "token-b")
+
+
+def test_uncapped_codes_are_never_counted(codes):
+    welcome = codes.lookup("WELCOME50")
+    for n in range(100):
+        codes.claim(welcome, f"token-{n}")
+    codes.check(welcome, "pre_sales")
+
+
+def test_apply_discounts_the_price_including_gst():
+    result = {"quote_price": 500, "price_including_gst": 550, "payable_price": 500}
+    promo.apply(promo.PromoCode("SPRING10", percent_off=10), result)
+    assert (result["promo_discount"], result["payable_price"]) == (55, 445)
+
+    result = {"quote_price": 30}
+    promo.apply(promo.PromoCode("WELCOME50", amount_off=50), result)
+    assert (result["promo_discount"], result["payable_price"]) == (30, 0)
@@ -0,0 +1,59 @@
+"""Quote tokens verify only when untouched, unexpired and signed with the same secret."""
+
+import pytest
+
+from rate_engine_core import quote_token
+from rate_engine_core.quote_token import InvalidQuoteToken, QuoteTokenSigner
+
+SIGNER = QuoteTokenSigner(secret=b"test-secret")
+PARAMS = {"property_category": "residential", "bedrooms": 3, "bathrooms": 2}
+RESULT = {"quote_price": 550, "gst": 55}
+
+
+def _token(signer=SIGNER):
+    return signer.sign("pre_purchase", PARAMS, RESULT, "04b140a1821eeab4")
+
+
+def test_round_trip():
+    claims = SIGNER.verify(_token())
+    assert claims["service"] == "pre_purchase"
+    assert claims["params"] == PARAMS
+    assert claims["result"] == RESULT
+    assert claims["pricing_version"] == "04b140a1821eeab4"
+    assert claims["exp"] - claims["iat"] == 86400
+
+
+def test_tampered_claims_are_rejected():
+    body, _, signature = _token().partition(".")
+    other, _, _ = SIGNER.sign("pre_purchase", PARAMS, {"quote_price": 1}, None).partition(".")
+    with pytest.raises(InvalidQuoteToken, match="signature mismatch"):
+        SIGNER.verify(f"{other}.{signature}")
+    flipped = signature[:-1] + ("B" if signature.endswith("A") else "A")
+    with pytest.raises(InvalidQuoteToken, match="signature mismatch"):
+        SIGNER.verify(f"{body}.{flipped}")
+
+
+def test_other_secrets_are_rejected():
+    with pytest.raises(InvalidQuoteToken, match="signature mismatch"):
+        SIGNER.verify(_token(QuoteTokenSigner(secret=b"another-secret")))
+
+
+def test_expired_tokens_are_rejected():
+    with pytest.raises(InvalidQuoteToken, match="expired"):
+        SIGNER.verify(_token(QuoteTokenSigner(secret=b"test-secret", ttl=-1)))
+
+
+@pytest.mark.parametrize("token", ["", "no-separator", ".sig", "body.", "bødy.sig", "body.sïg"])
+def test_malformed_tokens_are_rejected(token):
+    with pytest.raises(InvalidQuoteToken, match="Malformed"):
+        SIGNER.verify(token)
+
+
+def test_signer_from_env(monkeypatch):
+    monkeypatch.delenv("RATE_ENGINE_QUOTE_TOKEN_SECRET", raising=False)
+    assert quote_token.signer_from_env() is None
+    monkeypatch.setenv("RATE_ENGINE_QUOTE_TOKEN_SECRET", "test-secret")
+    monkeypatch.setenv("RATE_ENGINE_QUOTE_TOKEN_TTL", "60")
+    signer = quote_token.signer_from_env()
+    assert signer.ttl == 60
+    assert SIGNER.verify(_token(signer))["params"] == PARAMS
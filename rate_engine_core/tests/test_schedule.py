@@ -0,0 +1,96 @@
+"""Effective-dated pricing windows are found by bisect, start inclusive and end exclusive."""
+
+import json
+import types
+
+import pytest
+
+from rate_engine_core import pricing, schedule
+from rate_engine_core.schedule import PricingSchedule, PricingWindow, ScheduleError
+
+NOV = schedule.parse_time("2026-11-01")
+JAN = schedule.parse_time("2027-01-01")
+JUL = schedule.parse_time("2027-07-01")
+
+
+def _windows():
+    return PricingSchedule(
+        [
+            # Listed out of order: the index sorts each service's windows by start
+            PricingWindow("pre_purchase", JAN, None, {"base_price": 520}),
+            PricingWindow("pre_purchase", NOV, JAN, {"base_price": 480}),
+            PricingWindow("pre_sales", NOV, JUL, {"base_price": 300}),
+        ]
+    )
+
+
+@pytest.mark.parametrize(
+    "when,expected",
+    [
+        (NOV - 1, None),
+        (NOV, 480),
+        (JAN - 1, 480),
+        # Adjacent windows: the next one takes over exactly at the boundary
+        (JAN, 520),
+        (JUL + 10**9, 520),
+    ],
+)
+def test_window_for_boundaries(when, expected):
+    window = _windows().window_for("pre_purchase", when)
+    assert (window and window.overrides.fields["base_price"]) == expected
+
+
+def test_window_for_after_a_closed_window_ends():
+    index = _windows()
+    assert index.window_for("pre_sales", JUL - 1) is not None
+    assert index.window_for("pre_sales", JUL) is None
+    assert index.window_for("dilapidation", JAN) is None
+
+
+def test_overlapping_windows_are_rejected():
+    with pytest.raises(ScheduleError, match="overlap"):
+        PricingSchedule(
+            [
+                PricingWindow("pre_purchase", NOV, JUL, {"base_price": 480}),
+                PricingWindow("pre_purchase", JAN, None, {"base_price": 520}),
+            ]
+        )
+
+
+def test_parse_time_reads_naive_times_as_utc():
+    assert schedule.parse_time("2026-11-01") == schedule.parse_time("2026-11-01T00:00:00+00:00")
+    assert schedule.parse_time("2026-11-01T00:00:00+10:00") == NOV - 10 * 3600
+    with pytest.raises(ValueError):
+        schedule.parse_time("1 Nov 2026")
+
+
+def test_load_rejects_a_window_ending_before_it_starts(tmp_path):
+    path = tmp_path / "schedule.json"
+    path.write_text(
+        json.dumps(
+            {
+                "windows": [
+                    {
+                        "service": "pre_purchase",
+                        "effective_from": "2027-01-01",
+                        "effective_to": "2026-11-01",
+                        "fields": {"base_price": 480},
+                    }
+                ]
+            }
+        )
+    )
+    with pytest.raises(ScheduleError, match="ends before it starts"):
+        schedule.load(path)
+
+
+def test_bound_fetcher_applies_the_window_at_the_pricing_date(monkeypatch):
+    module = types.ModuleType("fake_service")
+    module._fetch_pricing_config = lambda: {"base_price": 400, "bedroom_price": 50}
+    pricing.bind_module("pre_purchase", module)
+    monkeypatch.setattr(pricing, "_SCHEDULE", _windows())
+
+    for when, base_price in [(NOV - 1, 400), (NOV, 480), (JAN, 520)]:
+        with pricing.using(None, at=when):
+            cfg = module._fetch_pricing_config()
+        assert cfg == {"base_price": base_price, "bedroom_price": 50}
@@ -0,0 +1,105 @@
+"""The travel KD-tree finds the same nearest inspector base as a brute-force search."""
+
+import json
+import math
+import random
+
+import pytest
+
+from rate_engine_core import travel
+
+BASES = [
+    ("Parramatta", -33.8150, 151.0011),
+    ("Newcastle", -32.9267, 151.7789),
+    ("Wollongong", -34.4278, 150.8931),
+    ("Dubbo", -32.2569, 148.6011),
+]
+
+
+def _haversine_km(a, b):
+    (lat1, lon1), (lat2, lon2) = (map(math.radians, point) for point in (a, b))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * travel.EARTH_RADIUS_KM * math.asin(math.sqrt(h))
+
+
+def _random_point(rng):
+    return rng.uniform(-90, 90), rng.uniform(-180, 180)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_kd_tree_nearest_matches_brute_force(seed):
+    rng = random.Random(seed)
+    points = [travel._unit(*_random_point(rng)) for _ in range(300)]
+    tree = travel._KDTree(points)
+    for _ in range(500):
+        query = travel._unit(*_random_point(rng))
+        distances = [sum((p - q) ** 2 for p, q in zip(point, query)) for point in points]
+        distance, index = tree.nearest(query)
+        assert distances[index] == pytest.approx(min(distances))
+        assert distance == pytest.approx(distances[index])
+
+
+def test_charged_km_is_the_distance_to_the_nearest_base_less_included_km():
+    rng = random.Random(7)
+    index = travel.TravelIndex(BASES, {}, included_km=30)
+    for _ in range(200):
+        point = (rng.uniform(-37, -28), rng.uniform(141, 154))
+        nearest = min(_haversine_km(point, (lat, lon)) for _, lat, lon in BASES)
+        assert abs(index.km_for_coordinates(*point) - max(0, math.ceil(nearest - 30))) <= 1
+    assert index.km_for_coordinates(-33.8150, 151.0011) == 0
+
+
+def test_postcodes_use_their_precomputed_distance():
+    centroids = {"2000": (-33.8688, 151.2093), "2830": (-32.2569, 148.6011), "0800": (-12.4634, 130.8456)}
+    index = travel.TravelIndex(BASES, centroids)
+    assert index.km_for_postcode("2000") == index.km_for_coordinates(-33.8688, 151.2093)
+    assert index.km_for_postcode(2830) == 0
+    assert index.km_for_postcode(800) == index.km_for_coordinates(-12.4634, 130.8456)
+    # Postcodes the table does not list carry no surcharge
+    assert index.km_for_postcode("9999") is None
+    assert index.km_for({"postcode": "9999"}) is None
+    assert index.km_for({}) is None
+    # Coordinates take precedence over the postcode
+    sydney = {"postcode": "9999", "latitude": -33.8688, "longitude": 151.2093}
+    assert index.km_for(sydney) == index.km_for_postcode("2000")
+
+
+@pytest.mark.parametrize("latitude,longitude", [(91, 0), (0, -181), ("north", 0), (True, 0), (None, 151)])
+def test_invalid_coordinates_are_rejected(latitude, longitude):
+    index = travel.TravelIndex(BASES, {})
+    with pytest.raises(ValueError):
+        index.km_for_coordinates(latitude, longitude)
+
+
+def test_missing_or_empty_centroid_table_fails_to_load(tmp_path):
+    with pytest.raises(ValueError, match="RATE_ENGINE_POSTCODE_CENTROIDS"):
+        travel.load_centroids(tmp_path / "missing.csv")
+    empty = tmp_path / "empty.csv"
+    empty.write_text("postcode,latitude,longitude\n")
+    with pytest.raises(ValueError, match="no rows"):
+        travel.load_centroids(empty)
+
+
+def test_load_locates_bases_by_postcode(tmp_path):
+    centroids = tmp_path / "centroids.csv"
+    centroids.write_text("postcode,latitude,longitude\n2150,-33.8150,151.0011\n800,-12.4634,130.8456\n")
+    bases = tmp_path / "bases.json"
+    bases.write_text(
+        json.dumps(
+            {
+                "included_km": 10,
+                "bases": [
+                    {"name": "Parramatta", "postcode": "2150"},
+                    {"name": "Newcastle", "latitude": -32.9267, "longitude": 151.7789},
+                ],
+            }
+        )
+    )
+    index = travel.load(bases, centroids)
+    assert index.base_names == ["Parramatta", "Newcastle"]
+    assert index.km_for_postcode("2150") == 0
+    assert index.km_for_postcode("0800") > 2000
+
+    bases.write_text(json.dumps({"bases": [{"name": "Hobart", "postcode": "7000"}]}))
+    with pytest.raises(ValueError, match="postcode missing"):
+        travel.load(bases, centroids)
@@ -0,0 +1,92 @@
+"""Postcodes resolve to their pricing zone by exact listing first, then by range."""
+
+import json
+import types
+
+import pytest
+
+from rate_engine_core import pricing, zones
+from rate_engine_core.zones import ZoneError
+
+ZONES = [
+    {
+        "id": "sydney_metro",
+        "ranges": [["2000", "2234"], ["2555", "2574"]],
+        "postcodes": ["2745"],
+        "services": {"pre_purchase": {"base_price": 480}},
+    },
+    {"id": "regional_nsw", "ranges": [["2250", "2899"]], "services": {"pre_purchase": {"base_price": 420}}},
+    {"id": "hobart", "ranges": [["0700", "0799"]]},
+]
+
+
+def _load(tmp_path, items):
+    path = tmp_path / "zones.json"
+    path.write_text(json.dumps({"zones": items}))
+    return zones.load(path)
+
+
+@pytest.fixture
+def index(tmp_path):
+    # sydney_metro's second range sits inside regional_nsw's, so carve regional_nsw around it
+    regional = {**ZONES[1], "ranges": [["2250", "2554"], ["2575", "2899"]]}
+    return _load(tmp_path, [ZONES[0], regional, ZONES[2]])
+
+
+@pytest.mark.parametrize(
+    "postcode,expected",
+    [
+        ("2000", "sydney_metro"),
+        ("2234", "sydney_metro"),
+        (2100, "sydney_metro"),
+        ("2235", None),
+        ("2250", "regional_nsw"),
+        ("2554", "regional_nsw"),
+        ("2555", "sydney_metro"),
+        ("2574", "sydney_metro"),
+        ("2575", "regional_nsw"),
+        # Listed postcodes win over the range containing them
+        ("2745", "sydney_metro"),
+        ("2899", "regional_nsw"),
+        ("2900", None),
+        ("0999", None),
+        # Leading zeros survive integer postcodes
+        (700, "hobart"),
+        ("0799", "hobart"),
+    ],
+)
+def test_zone_for(index, postcode, expected):
+    zone = index.zone_for(postcode)
+    assert (zone and zone.id) == expected
+
+
+@pytest.mark.parametrize("postcode", ["1", "ABCD", "", True, None, 12.5])
+def test_unknown_or_malformed_postcodes_have_no_zone(index, postcode):
+    assert index.zone_for(postcode) is None
+
+
+def test_overlapping_ranges_are_rejected(tmp_path):
+    with pytest.raises(ZoneError, match="overlap at 2555"):
+        _load(tmp_path, ZONES)
+
+
+def test_postcode_listed_twice_is_rejected(tmp_path):
+    with pytest.raises(ZoneError, match="listed by both"):
+        _load(tmp_path, [{"id": "a", "postcodes": ["2745"]}, {"id": "b", "postcodes": [2745]}])
+
+
+def test_overlay_count_counts_zones_pricing_the_service(index):
+    assert index.overlay_count("pre_purchase") == 2
+    assert index.overlay_count("pre_sales") == 0
+
+
+def test_bound_fetcher_applies_the_zone_overlay(index, monkeypatch):
+    module = types.ModuleType("fake_service")
+    module._fetch_pricing_config = lambda: {"base_price": 400}
+    pricing.bind_module("pre_purchase", module)
+    monkeypatch.setattr(pricing, "_ZONES", index)
+
+    # A zone without an overlay for the service, an unknown postcode, and no postcode all price flat
+    for postcode, base_price in [("2000", 480), ("2600", 420), ("0700", 400), ("9999", 400), (None, 400)]:
+        with pricing.using(None, postcode=postcode):
+            assert module._fetch_pricing_config()["base_price"] == base_price
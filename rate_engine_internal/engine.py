@@ -0,0 +1,133 @@
+"""Headless pricing for this engine's services, usable without the web app.
+
+Scripts, cron jobs and batch tools can price quotes directly:
+
+    import engine
+
+    snapshot = engine.capture(["pre_purchase"])
+    params = {"property_category": "residential", "bedrooms": 3, "bathrooms": 2}
+    result = engine.quote("pre_purchase", params, snapshot)
+
+`quote` returns the same response dict the estimate API sends, minus the quote
+token. Failures raise `QuoteError`, whose `status` follows the API's HTTP
+status codes. This module holds the engine's service aliases and notes; the
+quoting itself is `rate_engine_core.engine`, which imports neither FastAPI nor
+Pydantic. `app.py` prices through the same `Engine`, so both paths price
+identically.
+
+Run `python engine.py SERVICE '{"param": value, ...}'` to price one quote from
+the shell.
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import Dict
+
+# Re-exported for the app and scripts
+from rate_engine_core.engine import (
+    PARAM_ALIASES,
+    Engine,
+    QuoteError,
+    calculation_error,
+    coerce_params,
+    configure_from_env,
+    normalize_params,
+    run_calculation,
+    service_response,
+)
+
+__all__ = [
+    "PARAM_ALIASES",
+    "QuoteError",
+    "SERVICE_ALIASES",
+    "SERVICE_NOTES",
+    "calculation_error",
+    "capture",
+    "coerce_params",
+    "configure_from_env",
+    "get_service",
+    "normalize_params",
+    "quote",
+    "quote_batch",
+    "quote_rows",
+    "registry",
+    "resolve",
+    "run_calculation",
+    "service_response",
+    "with_note",
+]
+
+
+SERVICE_ALIASES = {
+    "oi-950-1": "pre_purchase",
+    # Backward-compatible alias: old service key points to new module name
+    "oi-950-3": "new_construction_stages",
+    "prepurchase": "pre_purchase",
+    "pre-purchase": "pre_purchase",
+    "pre_purchase": "pre_purchase",
+    "pre-sales": "pre_sales",
+    "presales": "pre_sales",
+    "pre_sales": "pre_sales",
+    "dilapidation": "dilapidation",
+    "construction_stages": "new_construction_stages",
+    "new_construction_stages": "new_construction_stages",
+    # Apartment pre-settlement aliases
+    "apartment-pre-settlement": "apartment_pre_settlement",
+    "apartment_pre_settlement": "apartment_pre_settlement",
+    # Insurance Report aliases
+    "insurance_report": "insurance_report",
+    "insurance-report": "insurance_report",
+    # Defects Investigation aliases
+    "defects_investigation": "defects_investigation",
+    "defects-investigation": "defects_investigation",
+    # Expert Witness Report aliases
+    "expert_witness_report": "expert_witness_report",
+    "expert-witness-report": "expert_witness_report",
+    # Pre-Handover aliases
+    "pre_handover": "pre_handover",
+    "pre-handover": "pre_handover",
+    "prehandover": "pre_handover",
+    # Drug Resistance aliases
+    "drug_resistance": "drug_resistance",
+    "drug-resistance": "drug_resistance",
+    "drugresistance": "drug_resistance",
+    # Building and Pest aliases
+    "building_and_pest": "building_and_pest",
+    "building-and-pest": "building_and_pest",
+    "buildingandpest": "building_and_pest",
+    "building_pest": "building_and_pest",
+    "building-pest": "building_and_pest",
+}
+
+# Per-service notes for API responses
+SERVICE_NOTES: Dict[str, str] = {
+    "pre_purchase": "this is a test note for pre_purchase",
+    "pre_sales": "this is a test note for pre_sales",
+    "dilapidation": "this is a test note for dilapidation",
+    "new_construction_stages": "this is a test note for new construction stages",
+    "apartment_pre_settlement": "this is a test note for apartment pre-settlement",
+    "insurance_report": "this is a test note for insurance report",
+    "defects_investigation": "this is a test note for defects investigation",
+    "expert_witness_report": "this is a test note for expert witness report",
+    "pre_handover": "this is a test note for pre-handover",
+    "drug_resistance": "this is a test note for drug resistance",
+    "building_and_pest": "this is a test note for building and pest inspection",
+}
+
+
+_ENGINE = Engine(Path(__file__).parent, SERVICE_ALIASES, SERVICE_NOTES)
+
+registry = _ENGINE.registry
+get_service = _ENGINE.get_service
+with_note = _ENGINE.with_note
+capture = _ENGINE.capture
+quote = _ENGINE.quote
+quote_batch = _ENGINE.quote_batch
+resolve = _ENGINE.resolve
+quote_rows = _ENGINE.quote_rows
+
+
+if __name__ == "__main__":
+    sys.exit(_ENGINE.main())